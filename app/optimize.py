@@ -0,0 +1,81 @@
+"""
+Headless wing console design optimization.
+
+Searches chord, span, shell thickness and box material that minimize console mass 
+(or maximize excess lift) with safety factor, tip deflection and lift-to-weight 
+within the limits. Other parameters are taken from the JSON file (app defaults if omitted):
+
+    {"airfoil_type": "NACA 2412", "velocity": 30.0, "foam_density": 25.0}
+
+Usage:
+
+    python app/optimize.py design.json --objective mass --materials "Carbon Fiber" Fiberglass --generate
+
+Only the best design is built as the full CAD model (with `--generate`).
+"""
+
+import sys
+import json
+import argparse
+
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog, get_default_geom_params
+from wingmodel.optimizer import OBJECTIVES, optimize_design, design_params, get_excess_lift
+from wingmodel.wing_model import WingModelManager, MODEL_ARTIFACTS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimize wing console design")
+    parser.add_argument("design", nargs="?", help="JSON file with fixed design parameters")
+    parser.add_argument("--objective", choices=list(OBJECTIVES), default="mass")
+    parser.add_argument("--materials", nargs="+", choices=list(BOX_MATERIALS), default=["Default"],
+                        help="box material candidates")
+    parser.add_argument("--samples", type=int, default=OPTIMIZER_SAMPLES, help="candidates per round")
+    parser.add_argument("--rounds", type=int, default=OPTIMIZER_ROUNDS)
+    parser.add_argument("--workers", type=int, default=CAD_WORKERS, help="number of worker processes")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--generate", action="store_true", help="generate CAD model artifacts of the best design")
+    args = parser.parse_args(argv)
+
+    airfoil_catalog = get_airfoil_catalog()
+    base_design = {**get_default_geom_params(airfoil_catalog), **PHYS_PARAMS_DEFAULT, **DYN_PARAMS_DEFAULT}
+    if args.design:
+        with open(args.design) as design_file:
+            base_design.update(json.load(design_file))
+
+    def progress(round_ind, n_rounds, evaluated, best):
+        best_mass = f"{best['total_mass']:.3f} kg" if best else "no feasible design yet"
+        print(f"Round {round_ind}/{n_rounds}: {evaluated} designs evaluated, best: {best_mass}")
+
+    result = optimize_design(
+        airfoil_catalog, base_design, objective=args.objective,
+        box_materials=[BOX_MATERIALS[name] for name in args.materials],
+        n_samples=args.samples, n_rounds=args.rounds, workers=args.workers, seed=args.seed, progress=progress
+    )
+
+    best = result["best"]
+    if best is None:
+        print("No feasible design found")
+        return 1
+
+    print("\nPareto front (mass [kg], excess lift [N], chord, span, shell thickness, box density):")
+    for design in result["pareto"]:
+        print(
+            f"  {design['total_mass']:.3f}  {get_excess_lift(design):.2f}  {design['chord']:.0f}  "
+            f"{design['span']:.0f}  {design['shell_thickness']:.0f}  {design['box_density']:.0f}"
+        )
+
+    geom_params, phys_params, dyn_params = design_params(best)
+    print(f"\nBest design: {json.dumps({**geom_params, **phys_params, **dyn_params})}")
+
+    if args.generate:
+        render_type = {part: "shaded" for part in MODEL_COLORS}
+        colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+        wing_console = WingModelManager(
+            airfoil_catalog, geom_params, phys_params, dyn_params, render_type, colors, artifacts=MODEL_ARTIFACTS
+        )
+        print(f"Generated wing-console-{wing_console.model_hash}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
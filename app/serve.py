@@ -0,0 +1,56 @@
+"""
+Local HTTP API for wing console generation outside the Streamlit app.
+
+Designs are submitted as JSON objects of parameters in the same format as for `sweep.py`
+(app defaults if omitted), properties, STL models and STEP model are generated in the
+worker pool. Requests with the same design share one job, new jobs are rejected with
+503 and Retry-After while the queue is full.
+
+Usage:
+
+    python app/serve.py --port 8502 --workers 4
+
+    curl -X POST localhost:8502/jobs -d '{"chord": 260, "span": 1200}'
+    curl localhost:8502/jobs/<job_id>
+    curl localhost:8502/jobs/<job_id>/result
+    curl -OJ localhost:8502/jobs/<job_id>/step
+"""
+
+import sys
+import argparse
+
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog, get_default_geom_params
+from wingmodel.cache_manager import start_eviction_service
+from wingmodel.jobs import set_max_workers
+from wingmodel.service import ModelService, make_server
+from wingmodel.wing_model import get_model_hash
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve wing console generation over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=CAD_WORKERS, help="number of worker processes")
+    parser.add_argument(
+        "--max-queue", type=int, default=SERVICE_MAX_QUEUE, help="unfinished jobs accepted before rejecting new ones"
+    )
+    args = parser.parse_args(argv)
+
+    set_max_workers(args.workers)
+    airfoil_catalog = get_airfoil_catalog()
+    start_eviction_service(pinned_models=[get_model_hash(get_default_geom_params(airfoil_catalog))])
+
+    server = make_server(ModelService(airfoil_catalog, max_queue=args.max_queue), args.host, args.port)
+    print(f"Serving wing console API on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Headless parametric sweep of wing console designs.
+
+Designs are read from the JSON file, either as a grid (parameter name -> list of values,
+all combinations are evaluated) or as a list of designs (parameter name -> value).
+Parameters missing in the designs take the app defaults. Example grid:
+
+    {"airfoil_type": ["NACA 2412"], "chord": [200, 260], "span": [900, 1200], "velocity": [25.0, 35.0]}
+
+Usage:
+
+    python app/sweep.py designs.json --out app/sweeps/family-a --workers 4
+
+Results are written as Parquet part files into the output directory. 
+Re-running the same command resumes the interrupted sweep and retries the failed designs.
+Exits with non-zero status when any design failed.
+"""
+
+import sys
+import argparse
+
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog
+from wingmodel.sweep import load_designs, run_sweep
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate wing console designs in batch")
+    parser.add_argument("designs", help="JSON file with a grid or a list of designs")
+    parser.add_argument("--out", default=SWEEP_RESULTS_DIR, help="output directory for Parquet part files")
+    parser.add_argument("--workers", type=int, default=CAD_WORKERS, help="number of worker processes")
+    parser.add_argument(
+        "--fast", action="store_true", help="derive geometry from the cross-section instead of full CAD models"
+    )
+    args = parser.parse_args(argv)
+
+    designs = load_designs(args.designs)
+    print(f"Evaluating {len(designs)} designs into {args.out}")
+
+    def progress(evaluated, group_hash):
+        print(f"{evaluated} designs evaluated ({group_hash})")
+
+    evaluated, failed = run_sweep(
+        get_airfoil_catalog(), designs, out_dir=args.out, workers=args.workers, fast=args.fast, progress=progress
+    )
+    print(f"Done, {evaluated} new designs evaluated, {len(failed)} failed")
+    for design_hash, error in failed.items():
+        print(f"  {design_hash}: {error}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 from .cadmodel import build_model_view
 from .aerodynamics import build_aerodynamics_view
 from .structmech import  build_structmech_view
-from .layout import  build_toolbar, build_dashboard
+from .layout import  build_toolbar, build_dashboard, get_default_geom_params
 
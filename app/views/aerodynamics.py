@@ -1,45 +1,31 @@
-import json
-
 import streamlit as st
-import streamlit.components.v1 as components
-from yattag import Doc
 import pandas as pd
-import numpy as np
 import altair as alt
 
 from wingmodel.constants import *
+from .viewer import model_viewer
 
 
 def build_aerodynamics_view(wing_console):
     st.text("")
     alpha = wing_console.model_props["alpha"]
     _profile_graphs(wing_console)
-    _profile_preview(wing_console.models_data, alpha)
+    _profile_preview(wing_console.section_data, alpha)
     _profile_stats(wing_console)
 
 
 def _profile_graphs(wing_console):
-    airfoil = wing_console.airfoil
-
     alpha_const = float(wing_console.model_props["alpha"])
     reynolds = float(wing_console.model_props["reynolds"])
-    cl_const = float(airfoil.eval_cl(alpha_const, reynolds))
-    cd_const = float(airfoil.eval_cd(alpha_const, reynolds))
+    cl_const = float(wing_console.model_props["cl"])
+    cd_const = float(wing_console.model_props["cd"])
     cl_to_cd_const = cl_const/cd_const
 
-    alpha_vals = []
-    cl_vals = []
-    cd_vals = []
-    cl_to_cd_vals = []
-
-    for alpha in np.linspace(-20, 20, 161):
-        cl = airfoil.eval_cl(alpha, reynolds)
-        cd = airfoil.eval_cd(alpha, reynolds)
-        if not all([np.isnan(cl), np.isnan(cd)]):
-            alpha_vals.append(alpha)
-            cl_vals.append(float(cl))
-            cd_vals.append(float(cd))
-            cl_to_cd_vals.append(float(cl)/float(cd))
+    polar = wing_console.get_polar(reynolds)
+    alpha_vals = polar.alpha
+    cl_vals = polar.cl
+    cd_vals = polar.cd
+    cl_to_cd_vals = polar.cl_to_cd
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -85,36 +71,9 @@ def _profile_graphs(wing_console):
         st.altair_chart(chart_cl_to_cd, use_container_width=True)
 
 
-def _profile_preview(models_data, alpha=0):
-    doc, tag, text, line = ttl = Doc().ttl()
-
-    # Load and embed the JavaScript file
-    with open("js/three.min.js", "r") as js_file:
-        three_js = js_file.read()
-
-    with open("js/stl-loader.js", "r") as js_file:
-        stl_loader = js_file.read()
-
-    with open("js/orbit-controls.js", "r") as js_file:
-        orbital_controls = js_file.read()
-
-    with open("js/model-2D-viewer.js", "r") as js_file:
-        airfoil_data  = [m for m in models_data if m["part"] == "airfoil"]
-        stl_viewer_component = (
-            js_file.read()
-            .replace('{__MODELS__}', json.dumps(airfoil_data))
-            .replace('{__ALPHA__}', str(float(alpha)))
-        )
-
-    all_scripts = three_js + "\n" + stl_loader + "\n" + orbital_controls + "\n" + stl_viewer_component
-
-    with tag("div", style="height:280px"):
-        with tag('script'):
-            doc.asis(all_scripts)
-        with tag('stl-viewer'):
-            pass
-
-    components.html(doc.getvalue(), height=280)
+def _profile_preview(section_data, alpha=0):
+    airfoil_data = [part for part in section_data if part["part"] == "airfoil"]
+    model_viewer(airfoil_data, viewer="2D", alpha=alpha, height=280, key="profile_preview")
 
 
 def _profile_stats(wing_console):
@@ -1,76 +1,219 @@
 import os
 import time
-import json
 
 import streamlit as st
-import streamlit.components.v1 as components
-import cadquery as cq
-from yattag import Doc
 
 from wingmodel.constants import *
-from wingmodel import WingModelManager
+from wingmodel.telemetry import span
+from wingmodel import WingModelManager, CadModelRequired, PREVIEW_ARTIFACTS, VIEW_ARTIFACTS, DOWNLOAD_ARTIFACTS
+from wingmodel.jobs import JOB_STAGES, JobCancelled, submit_model_job, get_job_stage, release_job
+from .viewer import model_viewer
 
 
-def build_model_view(airfoils_data, geom_params, phys_params, dyn_params):
+## download files are served by the static file handler, so they are streamed from disk
+## when the link is clicked instead of being read into the session on every rerun
+DOWNLOADS = {
+    "step": "STEP Model",
+    "stl": "STL Models",
+}
+## same look as the streamlit buttons
+DOWNLOAD_LINK_STYLE = (
+    "display: inline-block; padding: 0.25rem 0.75rem; border: 1px solid rgba(49, 51, 63, 0.2); "
+    "border-radius: 0.5rem; color: inherit; text-decoration: none; line-height: 1.6;"
+)
+
+
+def build_model_view(airfoil_catalog, geom_params, phys_params, dyn_params):
     render_type, colors = _model_display_options()
 
-    start = time.time()
-    with st.spinner('Generating Model..'):
-        wing_console = WingModelManager(airfoils_data, geom_params, phys_params, dyn_params, render_type, colors)
-        model_props = wing_console.model_props
-        end = time.time()
+    with span("view.load_model"):
+        wing_console = _load_wing_console(airfoil_catalog, geom_params, phys_params, dyn_params, render_type, colors)
+    model_props = wing_console.model_props
 
-        console_mass = model_props["total_mass"]
-        shell_rel_mass = 100 * model_props["shell_mass"] / console_mass
-        foam_rel_mass = 100 * model_props["foam_mass"] / console_mass
-        box_rel_mass = 100 * model_props["box_mass"] / console_mass
-        area = model_props["area"]
-        aspect_ratio = model_props["aspect_ratio"]
-        alpha = model_props["alpha"]
-        lift = model_props["lift_force"]
-        lift_to_weight = model_props["lift_to_weight"]
+    console_mass = model_props["total_mass"]
+    shell_rel_mass = 100 * model_props["shell_mass"] / console_mass
+    foam_rel_mass = 100 * model_props["foam_mass"] / console_mass
+    box_rel_mass = 100 * model_props["box_mass"] / console_mass
+    area = model_props["area"]
+    aspect_ratio = model_props["aspect_ratio"]
+    alpha = model_props["alpha"]
+    lift = model_props["lift_force"]
+    lift_to_weight = model_props["lift_to_weight"]
 
-        ltw_icon = FAIL_ICON if lift_to_weight<=1 else OK_ICON
+    ltw_icon = FAIL_ICON if lift_to_weight<=1 else OK_ICON
 
-        _models_preview(wing_console.models_data)
-        col1, col2 = st.columns([8,4])
+    _models_preview(wing_console.models_data)
+    col1, col2 = st.columns([8,4])
 
-        with col1:
-            st.text(
-                f"Aspect ratio: {aspect_ratio:.2f} \n"
-                f"Excess lift force: {lift:.2f} [N] \n"
-                f"Console mass: {console_mass:.2f} [kg] \n"
-                f"    shell: {shell_rel_mass:.2f}%, frame: {foam_rel_mass:.2f}%, box: {box_rel_mass:.2f}% \n"
-                f"{ltw_icon} Lift to weight ratio: {lift_to_weight:.2f}"
+    with col1:
+        st.text(
+            f"Aspect ratio: {aspect_ratio:.2f} \n"
+            f"Excess lift force: {lift:.2f} [N] \n"
+            f"Console mass: {console_mass:.2f} [kg] \n"
+            f"    shell: {shell_rel_mass:.2f}%, frame: {foam_rel_mass:.2f}%, box: {box_rel_mass:.2f}% \n"
+            f"{ltw_icon} Lift to weight ratio: {lift_to_weight:.2f}"
+        )
+        ## properties CSV is written on request, like the other download files
+        if wing_console.check_cached_props_csv():
+            _download_link(
+                "Download Full Data", wing_console.props_csv_path,
+                f"wing-console-{wing_console.model_hash}-{wing_console.props_hash}.csv"
             )
-            with open(wing_console.props_path, "rb") as file:
-                st.download_button(
-                    label="Download Full Data",
-                    data=file,
-                    file_name=f"wing-console-{wing_console.model_hash}-{wing_console.props_hash}.csv",
-                    mime="application/zip"
-                )
+        else:
+            st.button("Prepare Full Data", key="prepare_csv", on_click=wing_console.cache_props_csv)
 
-        with col2:
-            with open(wing_console.step_path, "rb") as file:
-                st.download_button(
-                    label=f"Download STEP Model",
-                    data=file,
-                    file_name=f'wing-console-{wing_console.model_hash}.step',
-                    mime=f"model/step"
-                )
+    with col2:
+        wing_console.download_placeholders = {kind: st.empty() for kind in DOWNLOADS}
+        _switch_download_jobs(wing_console.model_hash)
 
-            with open(wing_console.stl_zip_path, "rb") as file:
-                st.download_button(
-                    label=f"Download STL Models",
-                    data=file,
-                    file_name=f'wing-console-{wing_console.model_hash}-stl.zip',
-                    mime="application/zip"
+        for kind, placeholder in wing_console.download_placeholders.items():
+            if wing_console.check_cached_download(kind):
+                _download_button(wing_console, kind)
+            elif _download_requested(wing_console.model_hash, kind):
+                placeholder.button(f"Preparing {DOWNLOADS[kind]}..", disabled=True, key=f"preparing_{kind}")
+            else:
+                placeholder.button(
+                    f"Prepare {DOWNLOADS[kind]}", key=f"prepare_{kind}",
+                    on_click=_request_download, args=(wing_console.model_hash, kind)
                 )
-            
+        
     return wing_console
 
 
+def finalize_model_view(wing_console, airfoil_catalog, geom_params, phys_params, dyn_params):
+    """
+    Generate the requested download files once the rest of the dashboard is rendered.
+    Finer preview meshes are picked up by the viewer itself as soon as they are exported.
+    """
+    for kind, placeholder in wing_console.download_placeholders.items():
+        if wing_console.check_cached_download(kind) or not _download_requested(wing_console.model_hash, kind):
+            continue
+
+        job = submit_model_job(
+            f"{wing_console.model_hash}-{kind}", st.session_state["session_id"],
+            airfoil_catalog, geom_params, phys_params, dyn_params, artifacts=DOWNLOAD_ARTIFACTS[kind]
+        )
+        _wait_for_model_job(job, placeholder)
+        job.future.result()
+        _download_button(wing_console, kind)
+
+
+def _download_link(label, path, file_name, container=st):
+    url = path.replace(os.sep, "/")
+    container.markdown(
+        f'<a href="{url}" download="{file_name}" target="_self" style="{DOWNLOAD_LINK_STYLE}">{label}</a>',
+        unsafe_allow_html=True
+    )
+
+
+def _download_button(wing_console, kind):
+    path = wing_console.get_download_path(kind)
+    _download_link(
+        f"Download {DOWNLOADS[kind]}", path, os.path.basename(path),
+        container=wing_console.download_placeholders[kind]
+    )
+
+
+def _request_download(model_hash, kind):
+    st.session_state.setdefault("requested_downloads", set()).add((model_hash, kind))
+
+
+def _download_requested(model_hash, kind):
+    return (model_hash, kind) in st.session_state.get("requested_downloads", set())
+
+
+def _switch_download_jobs(model_hash):
+    """Release download jobs requested for the previous model, so that they get cancelled if nobody else waits"""
+    requested = st.session_state.get("requested_downloads", set())
+    for prev_hash, kind in requested - {(model_hash, kind) for kind in DOWNLOADS}:
+        release_job(f"{prev_hash}-{kind}", st.session_state["session_id"])
+
+    st.session_state["requested_downloads"] = {(prev_hash, kind) for prev_hash, kind in requested
+                                               if prev_hash == model_hash}
+
+
+def _load_wing_console(airfoil_catalog, geom_params, phys_params, dyn_params, render_type, colors):
+    model_args = (airfoil_catalog, geom_params, phys_params, dyn_params, render_type, colors)
+    job = None
+
+    try:
+        wing_console = WingModelManager(*model_args, generate_cad=False, artifacts=PREVIEW_ARTIFACTS)
+    except CadModelRequired as exc:
+        job = _submit_model_job(exc.model_hash, exc.props_hash, airfoil_catalog, geom_params, phys_params, dyn_params)
+        ## preview is shown as soon as the coarse meshes are exported
+        _wait_for_model_job(job, st, until_stage="meshes")
+        wing_console = _load_generated_wing_console(job, model_args)
+
+        if wing_console is None:
+            ## preview was evicted or the job cancelled meanwhile, wait for a new job to finish
+            job = _submit_model_job(
+                exc.model_hash, exc.props_hash, airfoil_catalog, geom_params, phys_params, dyn_params
+            )
+            _wait_for_model_job(job, st)
+            job.future.result()
+            wing_console = WingModelManager(*model_args, generate_cad=False, artifacts=PREVIEW_ARTIFACTS)
+
+    if wing_console.check_cached_fine_meshes():
+        _switch_model_job(None)
+    elif job is None:
+        _submit_model_job(
+            wing_console.model_hash, wing_console.props_hash, airfoil_catalog, geom_params, phys_params, dyn_params
+        )
+
+    return wing_console
+
+
+def _load_generated_wing_console(job, model_args):
+    """Model with the preview generated by the job, None if the preview is missing in cache"""
+    if job.future.done() and not job.future.cancelled() and not isinstance(job.future.exception(), JobCancelled):
+        job.future.result()
+
+    try:
+        return WingModelManager(*model_args, generate_cad=False, artifacts=PREVIEW_ARTIFACTS)
+    except CadModelRequired:
+        return None
+
+
+def _submit_model_job(model_hash, props_hash, airfoil_catalog, geom_params, phys_params, dyn_params):
+    job_key = f"{model_hash}-{props_hash}"
+    _switch_model_job(job_key)
+
+    return submit_model_job(
+        job_key, st.session_state["session_id"], airfoil_catalog, geom_params, phys_params, dyn_params,
+        artifacts=VIEW_ARTIFACTS
+    )
+
+
+def _switch_model_job(job_key):
+    """Release the job of previous parameters, so that it gets cancelled if nobody else waits for it"""
+    current_job_key = st.session_state.get("model_job")
+    if current_job_key and current_job_key != job_key:
+        release_job(current_job_key, st.session_state["session_id"])
+
+    st.session_state["model_job"] = job_key
+
+
+def _wait_for_model_job(job, container, until_stage=None):
+    ## progress bar updates also let streamlit interrupt the wait when widgets change
+    progress_bar = container.progress(0, text="Generating Model..")
+
+    while not job.future.done():
+        stage = get_job_stage(job.key)
+        if stage in JOB_STAGES:
+            if until_stage and JOB_STAGES.index(stage) >= JOB_STAGES.index(until_stage):
+                break
+
+            progress_bar.progress(
+                JOB_STAGES.index(stage) / len(JOB_STAGES), text=f"Generating Model: {stage}.."
+            )
+        else:
+            progress_bar.progress(0, text="Generating Model..")
+
+        time.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+    progress_bar.empty()
+
+
 def _model_display_options():
     render_type = {}
     colors = {}
@@ -120,31 +263,5 @@ def _model_display_options():
 
 
 def _models_preview(models_data):
-    doc, tag, text, line = ttl = Doc().ttl()
-
-    # Load and embed the JavaScript file
-    with open("js/three.min.js", "r") as js_file:
-        three_js = js_file.read()
-
-    with open("js/stl-loader.js", "r") as js_file:
-        stl_loader = js_file.read()
-
-    with open("js/orbit-controls.js", "r") as js_file:
-        orbital_controls = js_file.read()
-
-    with open("js/model-3D-viewer.js", "r") as js_file:
-        wing_console_data = [mdata for mdata in models_data if not mdata["part"] == "airfoil"]
-        stl_viewer_component = (
-            js_file.read().replace('{__MODELS__}', json.dumps(wing_console_data))
-        )
-
-    all_scripts = three_js + "\n" + stl_loader + "\n" + orbital_controls + "\n" + stl_viewer_component
-
-    with tag("div", style="height:500px;"):
-        with tag('script'):
-            doc.asis(all_scripts)
-        line("stl-viewer", "")
-
-    components.html(doc.getvalue(), height=500)
-
-    
+    wing_console_data = [mdata for mdata in models_data if not mdata["part"] == "airfoil"]
+    model_viewer(wing_console_data, viewer="3D", height=500, key="models_preview")
@@ -0,0 +1,25 @@
+import streamlit as st
+import pandas as pd
+
+
+def is_debug_enabled():
+    ## debug panel is shown with `?debug=1` in the app URL
+    return st.experimental_get_query_params().get("debug", ["0"])[0] == "1"
+
+
+def build_debug_panel(spans):
+    with st.sidebar.expander("Debug: Pipeline Timings", expanded=True):
+        if not spans:
+            st.text("No spans recorded in this run")
+            return
+
+        data = pd.DataFrame([
+            {
+                "stage": record["name"],
+                "duration [ms]": 1e3 * record["duration"],
+                "cache": record.get("cache", ""),
+                "model_hash": record.get("model_hash", ""),
+            }
+            for record in spans
+        ])
+        st.dataframe(data, use_container_width=True, hide_index=True)
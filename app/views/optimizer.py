@@ -0,0 +1,126 @@
+import time
+
+import streamlit as st
+import pandas as pd
+import altair as alt
+
+from wingmodel.constants import *
+from wingmodel.optimizer import OBJECTIVES, submit_optimizer_job, design_params, get_excess_lift, is_feasible
+
+
+def build_optimizer_view(airfoil_catalog, geom_params, phys_params, dyn_params):
+    st.text("")
+    base_design = {**geom_params, **phys_params, **dyn_params}
+
+    with st.form("optimizer_form"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            objective = st.radio("Objective", list(OBJECTIVES), format_func=lambda o: OBJECTIVES[o])
+        with col2:
+            materials = st.multiselect("Box Materials", list(BOX_MATERIALS), default=["Default"])
+        with col3:
+            n_samples = st.number_input("Candidates per round", min_value=8, max_value=512, value=OPTIMIZER_SAMPLES)
+            n_rounds = st.number_input("Rounds", min_value=1, max_value=10, value=OPTIMIZER_ROUNDS)
+
+        st.caption(
+            f"Chord, span, shell thickness and box material are optimized for the selected airfoil, "
+            f"frame, foam and shell materials and flight conditions, subject to safety factor ≥ {MIN_SAFETY_FACTOR}, "
+            f"tip deflection ≤ {100*DELTA_MAX:.0f}% and lift to weight ratio > 1."
+        )
+        run_button = st.form_submit_button("Run Optimizer")
+
+    if run_button:
+        box_materials = [BOX_MATERIALS[name] for name in materials]
+        st.session_state["optimizer_job"] = submit_optimizer_job(
+            airfoil_catalog, base_design, objective=objective, box_materials=box_materials,
+            n_samples=int(n_samples), n_rounds=int(n_rounds)
+        )
+
+    results_container = st.container()
+    result = st.session_state.get("optimizer_result")
+    if result is not None and "optimizer_job" not in st.session_state:
+        with results_container:
+            _optimizer_results(result)
+
+    return results_container
+
+
+def finalize_optimizer_view(results_container):
+    """
+    Wait for the optimizer job once the rest of the dashboard is rendered. 
+    The job runs in the background, so it continues when the wait is interrupted by a rerun.
+    """
+    job = st.session_state.get("optimizer_job")
+    if job is None:
+        return
+
+    progress_bar = results_container.progress(0, text="Optimizing..")
+    while not job.future.done():
+        round_ind, n_rounds, evaluated, _ = job.progress
+        progress_bar.progress(round_ind / n_rounds, text=f"Optimizing: {evaluated} designs evaluated..")
+        time.sleep(JOB_POLL_INTERVAL_SECONDS)
+    progress_bar.empty()
+
+    del st.session_state["optimizer_job"]
+    st.session_state["optimizer_result"] = job.future.result()
+    with results_container:
+        _optimizer_results(st.session_state["optimizer_result"])
+
+
+def _optimizer_results(result):
+    best = result["best"]
+    if best is None:
+        st.warning(f"{FAIL_ICON} No feasible design found among {len(result['evaluated'])} evaluated candidates")
+        return
+
+    evaluated = pd.DataFrame([
+        {
+            "mass": design["total_mass"],
+            "excess_lift": get_excess_lift(design),
+            "feasible": is_feasible(design),
+        }
+        for design in result["evaluated"]
+    ])
+    pareto = pd.DataFrame([
+        {
+            "mass": design["total_mass"],
+            "excess_lift": get_excess_lift(design),
+            "chord": design["chord"],
+            "span": design["span"],
+            "shell_thickness": design["shell_thickness"],
+            "box_density": design["box_density"],
+        }
+        for design in result["pareto"]
+    ])
+
+    col1, col2 = st.columns([6, 6])
+    with col1:
+        chart_evaluated = (alt.Chart(evaluated).mark_point(opacity=0.4).encode(
+            x=alt.X("mass", title="Console mass [kg]"),
+            y=alt.Y("excess_lift", title="Excess lift [N]"),
+            color=alt.condition("datum.feasible", alt.value("#37abc8ff"), alt.value("#A9A9A9"))
+        ))
+        chart_pareto = (alt.Chart(pareto).mark_line(point=True).encode(
+            x="mass", y="excess_lift", color=alt.value("#04BA71")
+        ))
+        chart = (alt.layer(chart_evaluated, chart_pareto)
+                    .properties(height=300, title="Evaluated Designs and Pareto Front")
+                    .configure_title(anchor='middle')
+                )
+
+        st.altair_chart(chart, use_container_width=True)
+
+    with col2:
+        st.dataframe(pareto, use_container_width=True, hide_index=True)
+
+        geom_params, phys_params, _ = design_params(best)
+        st.text(
+            f"{OK_ICON} Best design: chord {geom_params['chord']} [mm], span {geom_params['span']} [mm], "
+            f"shell {geom_params['shell_thickness']} [mm] \n"
+            f"    Console mass: {best['total_mass']:.2f} [kg], excess lift: {get_excess_lift(best):.2f} [N]"
+        )
+
+        if st.button("Apply Best Design"):
+            ## full CAD model is generated for the applied design only
+            st.session_state["design_overrides"] = {**geom_params, **phys_params}
+            st.rerun()
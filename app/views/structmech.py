@@ -1,33 +1,25 @@
-import json
-
 import streamlit as st
-import streamlit.components.v1 as components
-from yattag import Doc
 import pandas as pd
 import numpy as np
 import altair as alt
 
 from wingmodel.constants import *
+from .viewer import model_viewer
 
 
 def build_structmech_view(wing_console):
     st.text("")
     _bend_graphs(wing_console)
-    _section_preview(wing_console.models_data)
+    _section_preview(wing_console.section_data)
     _static_stats(wing_console)
 
 
 def _bend_graphs(wing_console):
     span = wing_console.model_props["span"]
 
-    dists = np.linspace(0, span, 100)
-    nu_abs = []
-    nu_rel = []
-
-    for dist in dists:
-        nu = wing_console.get_bend_displacement(dist)
-        nu_abs.append(nu)
-        nu_rel.append(100*nu/span)
+    dists = np.linspace(0, span, BEND_STATIONS)
+    nu_abs = wing_console.get_bend_distribution(dists)["displacement"]
+    nu_rel = 100*nu_abs/span
 
     if nu_rel[-1] > 15:
         color = "#ff9f42"
@@ -39,7 +31,7 @@ def _bend_graphs(wing_console):
     col1, col2, col3 = st.columns([5,1,6])
 
     with col1:
-        data = pd.DataFrame({"dist": dists, "nu": np.array(nu_rel)})
+        data = pd.DataFrame({"dist": dists, "nu": nu_rel})
         chart_nu = (
             alt.Chart(data, title="Relative Bend Deflection")
                 .mark_line()
@@ -114,33 +106,6 @@ def _static_stats(wing_console):
             f"{safety_icon} Safety factor: {safety:.2f}"
         )
 
-def _section_preview(models_data, alpha=0):
-    doc, tag, text, line = ttl = Doc().ttl()
-
-    # Load and embed the JavaScript file
-    with open("js/three.min.js", "r") as js_file:
-        three_js = js_file.read()
-
-    with open("js/stl-loader.js", "r") as js_file:
-        stl_loader = js_file.read()
-
-    with open("js/orbit-controls.js", "r") as js_file:
-        orbital_controls = js_file.read()
-
-    with open("js/model-2D-viewer.js", "r") as js_file:
-        wing_console_data = [mdata for mdata in models_data if not mdata["part"] == "airfoil"]
-        stl_viewer_component = (
-            js_file.read()
-            .replace('{__MODELS__}', json.dumps(wing_console_data))
-            .replace('{__ALPHA__}', "0")
-        )
-
-    all_scripts = three_js + "\n" + stl_loader + "\n" + orbital_controls + "\n" + stl_viewer_component
-
-    with tag("div", style="height:250px"):
-        with tag('script'):
-            doc.asis(all_scripts)
-        with tag('stl-viewer'):
-            pass
-
-    components.html(doc.getvalue(), height=250)
+def _section_preview(section_data, alpha=0):
+    wing_console_data = [part for part in section_data if not part["part"] == "airfoil"]
+    model_viewer(wing_console_data, viewer="2D", alpha=alpha, height=250, key="section_preview")
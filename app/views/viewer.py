@@ -0,0 +1,13 @@
+import os
+
+import streamlit.components.v1 as components
+
+
+## three.js and viewer scripts are served once as component assets (see js/index.html)
+_viewer_component = components.declare_component("model_viewer", path=os.path.abspath("js"))
+
+
+def model_viewer(models_data, viewer="3D", alpha=0, height=500, key=None):
+    _viewer_component(
+        models=models_data, viewer=viewer, alpha=float(alpha), height=height, key=key, default=None
+    )
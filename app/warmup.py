@@ -0,0 +1,60 @@
+"""
+Cache warm-up of the default, listed and most requested wing console designs.
+
+Geometry, STL, STEP and properties are generated in parallel and the models are pinned in cache,
+so that the first requests after a deploy are cache hits. Designs are read from the optional
+JSON file in the same format as for `sweep.py` (a grid or a list of designs), the most requested
+models are taken from the cache index. The default design is always warmed up.
+
+Usage (at container start or on a schedule):
+
+    python app/warmup.py --top 20
+    python app/warmup.py designs.json --workers 4 --unpin-stale
+"""
+
+import sys
+import argparse
+
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog, get_default_geom_params
+from wingmodel.cache_manager import get_cache_manager
+from wingmodel.sweep import load_designs
+from wingmodel.warmup import popular_designs, warm_up
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate and pin wing console models in cache")
+    parser.add_argument("designs", nargs="?", help="JSON file with a grid or a list of designs")
+    parser.add_argument("--top", type=int, default=0, help="number of the most requested models to warm up")
+    parser.add_argument("--workers", type=int, default=CAD_WORKERS, help="number of worker processes")
+    parser.add_argument("--no-pin", action="store_true", help="don't pin the warmed up models in cache")
+    parser.add_argument(
+        "--unpin-stale", action="store_true", help="unpin models pinned before but not warmed up this time"
+    )
+    args = parser.parse_args(argv)
+
+    airfoil_catalog = get_airfoil_catalog()
+    designs = [get_default_geom_params(airfoil_catalog)]
+    if args.designs:
+        designs += load_designs(args.designs)
+    if args.top:
+        designs += popular_designs(args.top)
+
+    print(f"Warming up {len(designs)} designs")
+
+    def progress(warmed, total, model_hash):
+        print(f"{warmed}/{total} models warmed up ({model_hash})")
+
+    warmed = warm_up(airfoil_catalog, designs, workers=args.workers, pin=not args.no_pin, progress=progress)
+
+    if args.unpin_stale and not args.no_pin:
+        cache_manager = get_cache_manager()
+        for model_hash in set(cache_manager.pinned()) - set(warmed):
+            cache_manager.pin(model_hash, pinned=False)
+            print(f"Unpinned {model_hash}")
+
+    print(f"Done, {len(warmed)} models warmed up")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
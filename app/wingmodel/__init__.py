@@ -1 +1,3 @@
-from .wing_model import WingModelManager
\ No newline at end of file
+from .wing_model import (
+    WingModelManager, CadModelRequired, MODEL_ARTIFACTS, PREVIEW_ARTIFACTS, VIEW_ARTIFACTS, DOWNLOAD_ARTIFACTS
+)
@@ -0,0 +1,57 @@
+from contextlib import nullcontext
+
+
+class ArtifactNode:
+    """
+    Cached artifact of the wing model pipeline.
+
+    `load` returns the cached artifact (or a falsy value if it is missing),
+    `build` produces it from the resolved values of `inputs` (names of other nodes).
+    Nodes without `load` are never cached (e.g. CAD model itself).
+    """
+
+    def __init__(self, build, load=None, inputs=()):
+        self.build = build
+        self.load = load
+        self.inputs = list(inputs)
+
+
+def resolve_artifacts(nodes, targets, use_cache=True, lock=None, on_build=None):
+    """
+    Load target artifacts from cache, building only the missing ones.
+    Every node is loaded or built at most once per call, and only when
+    some missing node depends on it.
+
+    Missing artifacts are built while holding `lock`, and the cache is checked
+    again once it is acquired, so concurrent callers wait for a single builder.
+    `on_build` is called with the node name before the node is built.
+    """
+    if use_cache and all(nodes[name].load for name in targets):
+        cached = {name: nodes[name].load() for name in targets}
+        if all(cached.values()):
+            return cached
+
+    with lock or nullcontext():
+        return _resolve(nodes, targets, use_cache, on_build)
+
+
+def _resolve(nodes, targets, use_cache, on_build):
+    resolved = {}
+
+    def resolve(name):
+        if name in resolved:
+            return resolved[name]
+
+        node = nodes[name]
+        value = node.load() if node.load and use_cache else None
+
+        if not value:
+            inputs = [resolve(input_name) for input_name in node.inputs]
+            if on_build:
+                on_build(name)
+            value = node.build(*inputs)
+
+        resolved[name] = value
+        return value
+
+    return {name: resolve(name) for name in targets}
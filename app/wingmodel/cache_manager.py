@@ -0,0 +1,347 @@
+import re
+import glob
+import time
+import shutil
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+
+from filelock import Timeout
+
+from .constants import *
+from .storage import model_lock
+from .props_store import get_props_store
+from .design_cache import forget_model
+
+
+## STL models and preview meshes of every level of detail
+MODEL_DIR_PATTERN = re.compile(r"^wing-console-(?P<model_hash>[^.]+?)(-lod\d+)?$")
+## per-design CSV files are props downloads (or left from the versions before the props store)
+MODEL_FILE_PATTERN = re.compile(
+    r"^wing-console-(?P<model_hash>[^.]+?)(\.step|-stl\.zip|-geom\.json|-section\.json|-[0-9a-f]{64}\.csv)$"
+)
+## cross-section records of the fast mode are indexed by their file name (see `_model_paths`)
+SECTION_FILE_PATTERN = re.compile(r"^(?P<model_hash>wing-section-[^.]+?)\.json$")
+MODEL_FILE_SUFFIXES = [".step", "-stl.zip", "-geom.json", "-section.json"]
+
+logger = logging.getLogger(__name__)
+
+
+def _path_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            size += os.path.getsize(os.path.join(dirpath, filename))
+
+    return size
+
+
+def _scan_model_paths():
+    """Group cached files and STL model directories by model hash"""
+    model_paths = {}
+
+    ## download files are kept next to the served model meshes, older versions kept them in cache dir
+    for dir_path, patterns in [
+        (STL_MODELS_DIR, [MODEL_DIR_PATTERN, MODEL_FILE_PATTERN]),
+        (CACHE_DIR, [MODEL_FILE_PATTERN, SECTION_FILE_PATTERN]),
+    ]:
+        if not os.path.isdir(dir_path):
+            continue
+
+        for name in os.listdir(dir_path):
+            for pattern in patterns:
+                match = pattern.match(name)
+                if match:
+                    model_paths.setdefault(match["model_hash"], []).append(os.path.join(dir_path, name))
+                    break
+
+    return model_paths
+
+
+def _model_paths(model_hash):
+    """Cached files and directories of a single model (see `_scan_model_paths`), without listing the cache"""
+    if SECTION_FILE_PATTERN.match(f"{model_hash}.json"):
+        candidates = [os.path.join(CACHE_DIR, f"{model_hash}.json")]
+    else:
+        prefix = f"wing-console-{model_hash}"
+        candidates = [os.path.join(STL_MODELS_DIR, prefix)]
+        candidates += [os.path.join(STL_MODELS_DIR, f"{prefix}-lod{lod}") for lod in range(len(MESH_LODS))]
+        for dir_path in [STL_MODELS_DIR, CACHE_DIR]:
+            candidates += [os.path.join(dir_path, f"{prefix}{suffix}") for suffix in MODEL_FILE_SUFFIXES]
+            for path in glob.glob(os.path.join(dir_path, f"{glob.escape(prefix)}-*.csv")):
+                match = MODEL_FILE_PATTERN.match(os.path.basename(path))
+                if match and match["model_hash"] == model_hash:
+                    candidates.append(path)
+
+    return [path for path in candidates if os.path.exists(path)]
+
+
+def _remove_stale_temp_files():
+    ## temporary files are renamed or removed by writers within the lock timeout
+    threshold = time.time() - MODEL_LOCK_TIMEOUT_SECONDS
+
+    for dir_path in [STL_MODELS_DIR, CACHE_DIR]:
+        if not os.path.isdir(dir_path):
+            continue
+
+        for name in os.listdir(dir_path):
+            path = os.path.join(dir_path, name)
+            if ".tmp-" not in name or os.stat(path).st_mtime > threshold:
+                continue
+
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+
+
+class CacheManager:
+    """
+    Index of cached model artifacts with least recently used eviction
+    under the byte budget. Pinned models are never evicted.
+    """
+
+    def __init__(self, index_path=CACHE_INDEX_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        ## accesses of designs served from memory, written to the index in batches (see `flush_accesses`)
+        self._memory_hits = {}
+        self._memory_hits_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with self._connect() as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS models ("
+                "model_hash TEXT PRIMARY KEY, size_bytes INTEGER NOT NULL DEFAULT 0, "
+                "last_access REAL NOT NULL DEFAULT 0, pinned INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+            ## request counts were added after the index was created
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(models)")}
+            if "access_count" not in columns:
+                conn.execute("ALTER TABLE models ADD COLUMN access_count INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        return closing(conn)
+
+    def _increment(self, conn, name, value=1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, value)
+        )
+
+    def record_access(self, model_hash, hit):
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT INTO models (model_hash, last_access, access_count) VALUES (?, ?, 1) "
+                "ON CONFLICT(model_hash) DO UPDATE SET last_access = excluded.last_access, "
+                "access_count = access_count + 1",
+                (model_hash, time.time())
+            )
+            self._increment(conn, "hits" if hit else "misses")
+
+    def record_memory_hit(self, model_hash):
+        with self._memory_hits_lock:
+            count, _ = self._memory_hits.get(model_hash, (0, 0))
+            self._memory_hits[model_hash] = (count + 1, time.time())
+
+    def flush_accesses(self):
+        with self._memory_hits_lock:
+            memory_hits, self._memory_hits = self._memory_hits, {}
+
+        if not memory_hits:
+            return
+
+        with self._connect() as conn, conn:
+            conn.executemany(
+                "INSERT INTO models (model_hash, last_access, access_count) VALUES (?, ?, ?) "
+                "ON CONFLICT(model_hash) DO UPDATE SET last_access = MAX(last_access, excluded.last_access), "
+                "access_count = access_count + excluded.access_count",
+                [(model_hash, last_access, count) for model_hash, (count, last_access) in memory_hits.items()]
+            )
+            self._increment(conn, "hits", sum(count for count, _ in memory_hits.values()))
+
+    def record_size(self, model_hash):
+        size = sum(_path_size(path) for path in _model_paths(model_hash))
+
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT INTO models (model_hash, size_bytes, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(model_hash) DO UPDATE SET size_bytes = excluded.size_bytes",
+                (model_hash, size, time.time())
+            )
+
+    def pin(self, model_hash, pinned=True):
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT INTO models (model_hash, pinned) VALUES (?, ?) "
+                "ON CONFLICT(model_hash) DO UPDATE SET pinned = excluded.pinned",
+                (model_hash, int(pinned))
+            )
+
+    def pinned(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT model_hash FROM models WHERE pinned = 1")]
+
+    def most_requested(self, limit):
+        """Hashes of the `limit` models requested most often, recently requested first among equals"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT model_hash FROM models WHERE access_count > 0 "
+                "ORDER BY access_count DESC, last_access DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def stats(self):
+        self.flush_accesses()
+
+        with self._connect() as conn:
+            stats = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            ## rows of removed models are kept for their request counts
+            models, total_bytes, pinned = conn.execute(
+                "SELECT COALESCE(SUM(size_bytes > 0), 0), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(pinned), 0) "
+                "FROM models"
+            ).fetchone()
+
+        return {
+            "hits": stats.get("hits", 0),
+            "misses": stats.get("misses", 0),
+            "evictions": stats.get("evictions", 0),
+            "models": models,
+            "pinned": pinned,
+            "total_bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def evict(self):
+        """Remove least recently used models until the cache fits into the byte budget"""
+        _remove_stale_temp_files()
+        self.flush_accesses()
+        model_paths = self._reconcile()
+
+        with self._connect() as conn:
+            total_bytes = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM models").fetchone()[0]
+            candidates = conn.execute(
+                "SELECT model_hash, size_bytes FROM models WHERE pinned = 0 AND size_bytes > 0 ORDER BY last_access"
+            ).fetchall()
+
+        for model_hash, size_bytes in candidates:
+            if total_bytes <= self.max_bytes:
+                break
+
+            if self._remove_model(model_hash, model_paths.get(model_hash, [])):
+                total_bytes -= size_bytes
+                logger.info("Evicted cached model %s (%d bytes)", model_hash, size_bytes)
+
+    def _reconcile(self):
+        """
+        Index models cached before the index existed and reset the size of models removed from disk.
+        Rows of removed models are kept, so that their request counts survive (see `most_requested`).
+        """
+        model_paths = _scan_model_paths()
+
+        with self._connect() as conn, conn:
+            indexed = dict(conn.execute("SELECT model_hash, size_bytes FROM models").fetchall())
+
+            for model_hash, paths in model_paths.items():
+                if indexed.get(model_hash):
+                    continue
+
+                ## unknown size of models pinned or accessed before being generated
+                size = sum(_path_size(path) for path in paths)
+                last_access = max(os.stat(path).st_mtime for path in paths)
+                conn.execute(
+                    "INSERT INTO models (model_hash, size_bytes, last_access) VALUES (?, ?, ?) "
+                    "ON CONFLICT(model_hash) DO UPDATE SET size_bytes = excluded.size_bytes",
+                    (model_hash, size, last_access)
+                )
+
+            removed = {model_hash for model_hash, size in indexed.items() if size and model_hash not in model_paths}
+            conn.executemany(
+                "UPDATE models SET size_bytes = 0 WHERE model_hash = ?", [(model_hash,) for model_hash in removed]
+            )
+
+        for model_hash in removed:
+            forget_model(model_hash)
+
+        return model_paths
+
+    def _remove_model(self, model_hash, paths):
+        lock = model_lock(f"wing-console-{model_hash}")
+        try:
+            ## skip models that are being generated or updated right now
+            lock.acquire(timeout=0)
+        except Timeout:
+            return False
+
+        try:
+            for path in paths:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                elif os.path.isfile(path):
+                    os.remove(path)
+            get_props_store().delete(model_hash)
+            forget_model(model_hash)
+
+            with self._connect() as conn, conn:
+                conn.execute("UPDATE models SET size_bytes = 0 WHERE model_hash = ?", (model_hash,))
+                self._increment(conn, "evictions")
+        finally:
+            lock.release()
+
+        return True
+
+
+_cache_manager = None
+_eviction_thread = None
+_service_lock = threading.Lock()
+
+
+def get_cache_manager():
+    global _cache_manager
+
+    with _service_lock:
+        if _cache_manager is None:
+            _cache_manager = CacheManager()
+
+    return _cache_manager
+
+
+def _eviction_loop(cache_manager):
+    ## cache stats are exported with the metrics (see `telemetry`)
+    while True:
+        try:
+            cache_manager.evict()
+        except Exception:
+            logger.exception("Cache eviction failed")
+
+        time.sleep(CACHE_EVICTION_INTERVAL_SECONDS)
+
+
+def start_eviction_service(pinned_models=()):
+    """Start periodic cache eviction in the background thread (once per process)"""
+    global _eviction_thread
+
+    cache_manager = get_cache_manager()
+
+    with _service_lock:
+        if _eviction_thread is not None:
+            return
+
+        for model_hash in pinned_models:
+            cache_manager.pin(model_hash)
+
+        _eviction_thread = threading.Thread(
+            target=_eviction_loop, args=(cache_manager,), name="cache-eviction", daemon=True
+        )
+        _eviction_thread.start()
@@ -0,0 +1,109 @@
+"""
+CAD model construction and STEP export. The module loads CadQuery and OCC, 
+so it is imported only when some of the model artifacts are missing in cache.
+"""
+
+import cadquery as cq
+from cquav.wing.profile import AirfoilSection
+from cquav.wing.rect_console import  RectangularWingConsole
+from cquav.materials import IsotropicMaterial
+
+from .constants import *
+from .exports import as_shape
+
+
+def hex_to_rgb(hex_color):
+    h = hex_color.lstrip('#')
+    return [int(h[i:i+2], 16)/255 for i in (0, 2, 4)]
+
+
+def build_wing_console(airfoil, geom_params):
+    airfoil_section = AirfoilSection(airfoil, chord=geom_params["chord"])
+    cad_model = RectangularWingConsole(airfoil_section, length=geom_params["span"],
+        min_length=SPAN_MIN, max_length=SPAN_MAX, min_chord=CHORD_MIN, max_chord=CHORD_MAX,
+        shell_thickness=geom_params["shell_thickness"], make_lattice=geom_params["lattice"]
+    )
+
+    return cad_model
+
+
+def assign_unit_materials(cad_model):
+    unit_materials = {
+        "box": IsotropicMaterial(1.0),
+        "shell": IsotropicMaterial(1.0),
+        "foam": IsotropicMaterial(1.0)
+    }
+    cad_model.assign_materials(unit_materials)
+
+
+def assign_materials(cad_model, phys_params):
+    materials = {
+        "box": IsotropicMaterial(
+            phys_params["box_density"], 
+            phys_params["box_tensile_strength"]*1e6, 
+            phys_params["box_tensile_modulus"]*1e9
+        ),
+        "shell": IsotropicMaterial(phys_params["shell_density"]),
+        "foam": IsotropicMaterial(phys_params["foam_density"])
+    }
+    cad_model.assign_materials(materials)
+
+
+def _root_faces(shape):
+    """Faces of the part at the console root, normal to the span (extrusion) axis"""
+    z_min = shape.BoundingBox().zmin
+    return [
+        face for face in shape.Faces()
+        if abs(face.Center().z - z_min) < 1e-6 and abs(abs(face.normalAt().z) - 1) < 1e-6
+    ]
+
+
+def _triangulate(faces, tolerance):
+    """Planar faces triangulated into flat vertices [x0, y0, x1, ...] and triangle indices, coordinates in [mm]"""
+    vertices, triangles = [], []
+
+    for face in faces:
+        face_vertices, face_triangles = face.tessellate(tolerance, MESH_ANGULAR_TOLERANCE)
+        offset = len(vertices) // 2
+        for vertex in face_vertices:
+            vertices += [round(vertex.x, SECTION_DIGITS), round(vertex.y, SECTION_DIGITS)]
+        for triangle in face_triangles:
+            triangles += [offset + index for index in triangle]
+
+    return {"vertices": vertices, "triangles": triangles}
+
+
+def extract_root_section(parts, chord):
+    """
+    2D cross-section of the console at the root: triangulated faces of every part 
+    (see `WingModelManager.get_stl_parts`) and of the airfoil outline, i.e. the outer shell contour.
+    """
+    tolerance = SECTION_TOLERANCE * chord
+    section = []
+
+    for part in parts:
+        faces = _root_faces(as_shape(part["model"]))
+        section.append({"name": part["name"], "part": part["part"], **_triangulate(faces, tolerance)})
+
+        if part["part"] == "shell":
+            shell_face = max(faces, key=lambda face: face.Area())
+            airfoil_face = cq.Face.makeFromWires(shell_face.outerWire())
+            section.append({
+                "name": part["name"].replace("shell", "airfoil", 1),
+                "part": "airfoil",
+                **_triangulate([airfoil_face], tolerance)
+            })
+
+    return section
+
+
+def save_step_model(cad_model, path):
+    cq_color = lambda part: cq.Color(*hex_to_rgb(MODEL_COLORS[part]), 1)
+
+    assy = cq.Assembly()
+    assy.add(cad_model.foam, name="foam", color=cq_color("foam"))
+    assy.add(cad_model.front_box, name="left_box", color=cq_color("box"))
+    assy.add(cad_model.central_box, name="central_box", color=cq_color("box"))
+    assy.add(cad_model.rear_box, name="right_box", color=cq_color("box"))
+    assy.add(cad_model.shell, name="shell", color=cq_color("shell"))
+    assy.save(path)
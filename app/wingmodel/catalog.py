@@ -0,0 +1,91 @@
+import json
+import threading
+import importlib.util
+
+from .constants import *
+from .lru import LRUCache
+from .telemetry import span
+
+
+class AirfoilCatalog:
+    """
+    Index of airfoils by group and type. Airfoil objects are built 
+    from the catalog data on first use and memoized in the bounded cache.
+    """
+
+    def __init__(self, airfoils_data, cache_size=AIRFOIL_CACHE_SIZE):
+        self._airfoils_data = airfoils_data
+        self._groups = sorted(airfoils_data.keys())
+        self._types = {group: sorted(airfoils.keys()) for group, airfoils in airfoils_data.items()}
+        self._airfoils = LRUCache(cache_size)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as ac:
+            return cls(json.load(ac))
+
+    def groups(self):
+        return self._groups
+
+    def types(self, airfoil_group):
+        return self._types[airfoil_group]
+
+    def get_airfoil(self, airfoil_group, airfoil_type):
+        key = (airfoil_group, airfoil_type)
+        airfoil = self._airfoils.get(key)
+        if airfoil is None:
+            from cquav.wing.airfoil import Airfoil
+
+            with span("airfoil", airfoil_type=airfoil_type, cache="miss"):
+                airfoil = Airfoil(self._airfoils_data[airfoil_group][airfoil_type])
+            self._airfoils.put(key, airfoil)
+
+        return airfoil
+
+    def subset(self, airfoil_group, airfoil_type):
+        """Catalog data of a single airfoil, e.g. to be passed to worker processes"""
+        return {airfoil_group: {airfoil_type: self._airfoils_data[airfoil_group][airfoil_type]}}
+
+
+def default_airfoil_index(airfoil_types):
+    airfoil_ind = [i for i, airfoil_name in enumerate(airfoil_types) if "2412" in airfoil_name]
+    return 0 if not airfoil_ind else airfoil_ind[0]
+
+
+def get_default_geom_params(airfoil_catalog):
+    airfoil_repos = airfoil_catalog.groups()
+
+    naca_repo_ind = [i for i, repo_name in enumerate(airfoil_repos) if "NACA" in repo_name]
+    naca_repo_ind = 0 if not naca_repo_ind else naca_repo_ind[0]
+    airfoil_group = airfoil_repos[naca_repo_ind]
+
+    airfoil_types = airfoil_catalog.types(airfoil_group)
+    airfoil_type = airfoil_types[default_airfoil_index(airfoil_types)]
+
+    return {
+        "airfoil_group": airfoil_group,
+        "airfoil_type": airfoil_type,
+        "chord": CHORD_DEFAULT,
+        "span": SPAN_DEFAULT,
+        "shell_thickness": 1,
+        "lattice": False,
+    }
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_airfoil_catalog():
+    """Catalog of the airfoils collection shipped with cquav, loaded once per process"""
+    global _catalog
+
+    with _catalog_lock:
+        if _catalog is None:
+            ## located without importing cquav (and CadQuery with it), unlike pkg_resources
+            package_dir = importlib.util.find_spec('cquav').submodule_search_locations[0]
+            path = os.path.join(package_dir, 'wing', 'airfoil', 'airfoils_collection.json')
+            with span("catalog"):
+                _catalog = AirfoilCatalog.from_file(path)
+
+    return _catalog
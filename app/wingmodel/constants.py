@@ -11,6 +11,9 @@ G = 9.81 ## [m/s**2]
 
 DELTA_MAX = 0.1 ## maximal relative wing tip displacement
 LOAD_FACTOR = 1.0
+## format of the cached geometry and cross-section records, older records are rebuilt
+GEOM_RECORD_VERSION = 2
+BEND_STATIONS = 100 ## span stations of the bend deflection graph
 MIN_SAFETY_FACTOR = 1.5
 
 WARNING_ICON = "⚠️"
@@ -28,10 +31,69 @@ SPAN_MIN = 50
 SPAN_MAX = 5000
 SPAN_DEFAULT = 900
 
+## Default materials and flight conditions
+
+PHYS_PARAMS_DEFAULT = {
+    "box_density": 1500.0, # [kg/m^3]
+    "box_tensile_strength": 450.0, # [MPa]
+    "box_tensile_modulus": 35.0, # [GPa]
+    "foam_density": 30.0, # [kg/m^3]
+    "shell_density": 1800.0, # [kg/m^3]
+}
+
+DYN_PARAMS_DEFAULT = {
+    "velocity": 35.0, # [m/s]
+    "aoa_type": "Max Quality",
+}
+
+AOA_TYPES = ["Max Quality", "Max Lift", "Min Drag"]
+
+## box materials available to the optimizer
+BOX_MATERIALS = {
+    "Default": {"box_density": 1500.0, "box_tensile_strength": 450.0, "box_tensile_modulus": 35.0},
+    "Fiberglass": {"box_density": 1900.0, "box_tensile_strength": 350.0, "box_tensile_modulus": 25.0},
+    "Carbon Fiber": {"box_density": 1550.0, "box_tensile_strength": 600.0, "box_tensile_modulus": 70.0},
+    "Aluminium 6061-T6": {"box_density": 2700.0, "box_tensile_strength": 310.0, "box_tensile_modulus": 69.0},
+}
+
+## Aerodynamics
+
+POLAR_ALPHAS = [-20 + 0.25*i for i in range(161)] ## [deg]
+POLAR_REYNOLDS_DIGITS = 3 ## significant digits of Reynolds number the polars are cached for
+POLAR_CACHE_SIZE = 256
+AIRFOIL_CACHE_SIZE = 64
+
+## Fast evaluation mode
+
+## spans [mm] of the reference models the cross-section record is fitted to
+SECTION_REFERENCE_SPANS = (2*SPAN_MIN, 4*SPAN_MIN)
+## relative tolerance of the fast mode properties against the full CAD evaluation
+FAST_MODE_RTOL = 0.01
+
+## relative tolerance of the geometry record properties against the CAD model evaluation
+GEOM_RECORD_RTOL = 1e-9
+
+## Parametric sweeps
+
+SWEEP_RESULTS_DIR = os.path.join("app", "sweeps")
+
+## Design optimization
+
+OPTIMIZER_RESULTS_DIR = os.path.join("app", "cache", "optimizer")
+OPTIMIZER_SAMPLES = 64 ## candidates per round
+OPTIMIZER_ROUNDS = 3
+OPTIMIZER_SHRINK = 0.5 ## search box shrink factor between rounds
+SHELL_THICKNESS_CHOICES = [1, 2, 3]
+## candidate chords are snapped to the grid, so that candidates share cross-section records (see fast mode)
+OPTIMIZER_CHORD_STEP = 25 # [mm]
+
 ## App settings
 
 STL_MODELS_DIR = os.path.join("app", "static")
 CACHE_DIR = os.path.join("app", "cache")
+LOCKS_DIR = os.path.join(CACHE_DIR, "locks")
+POLARS_DIR = os.path.join(CACHE_DIR, "polars") ## airfoil polars shared by all models, not evicted
+COMPLETE_MARKER = ".complete"
 
 MODEL_COLORS = {
     "box" : "#FFFF00",
@@ -40,5 +102,47 @@ MODEL_COLORS = {
 }
 
 USE_CACHED_RESULTS = True
-CACHE_LIFETIME_SECONDS = 3600*2
-DEFAULT_MODEL_CACHE_LIFETIME_SECONDS = 3600*12
+CACHE_INDEX_PATH = os.path.join(CACHE_DIR, "index.sqlite3")
+PROPS_DB_PATH = os.path.join(CACHE_DIR, "props.sqlite3")
+CACHE_MAX_BYTES = 2 * 1024**3
+CACHE_EVICTION_INTERVAL_SECONDS = 300
+## in-process tier of evaluated designs shared by all sessions (see `design_cache`)
+DESIGN_CACHE_SIZE = 512
+DESIGN_CACHE_MAX_BYTES = 64 * 1024**2
+## files missing from the designs kept in memory (e.g. downloads) are checked again at most this often
+MISSING_FILE_RECHECK_SECONDS = 10
+MISSING_FILES_CACHE_SIZE = 4096
+MODEL_LOCK_TIMEOUT_SECONDS = 600
+CAD_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+JOB_POLL_INTERVAL_SECONDS = 0.25
+## export pools are nested in the CAD workers, together they take up all the CPUs
+EXPORT_WORKERS = max(1, (os.cpu_count() or 1) // CAD_WORKERS)
+STL_EXPORT_TOLERANCE = 1e-4 ## downloaded STL models
+MESH_ANGULAR_TOLERANCE = 0.1
+## preview mesh levels of detail from coarse to fine: linear tolerance relative to 
+## the geometric mean of chord and span and angular tolerance [rad] (see `get_mesh_lod_tolerances`)
+MESH_LODS = [(2e-3, 0.5), (2.5e-4, MESH_ANGULAR_TOLERANCE)]
+SECTION_TOLERANCE = 5e-4 ## root section triangulation tolerance relative to the chord
+SECTION_DIGITS = 2 ## root section coordinates precision [mm]
+MESH_FORMAT_MAGIC = b"WMSH"
+MESH_FORMAT_VERSION = 1
+MESH_FILE_EXT = ".wmsh.gz"
+
+## HTTP API (see `service`)
+
+SERVICE_PORT = 8502
+SERVICE_MAX_QUEUE = 4 * CAD_WORKERS ## unfinished jobs accepted before requests are rejected
+SERVICE_RETRY_AFTER_SECONDS = 10
+SERVICE_JOB_HISTORY = 1024 ## finished jobs kept for status requests
+SERVICE_CHUNK_SIZE = 1024**2 ## streamed artifacts chunk [bytes]
+
+## Telemetry
+
+TELEMETRY_ENABLED = os.environ.get("WINGMODEL_TELEMETRY", "1") != "0"
+METRICS_DIR = os.path.join(CACHE_DIR, "metrics")
+SPANS_LOG_PATH = os.path.join(METRICS_DIR, "spans.jsonl")
+SPANS_LOG_MAX_BYTES = 50 * 1024**2
+SPANS_FLUSH_INTERVAL_SECONDS = 1
+SPANS_BUFFER_MAX = 10000 ## spans kept in memory while the log is not writable
+METRICS_PATH = os.path.join(METRICS_DIR, "metrics.prom")
+METRICS_INTERVAL_SECONDS = 15
@@ -0,0 +1,51 @@
+import time
+
+from .constants import *
+from .lru import LRUCache
+
+
+## evaluated designs (properties and model manifest) keyed on the canonical parameters,
+## shared by all sessions of the process in front of the disk cache
+_design_cache = LRUCache(DESIGN_CACHE_SIZE, max_bytes=DESIGN_CACHE_MAX_BYTES)
+
+
+## files found missing by the designs served from memory (path -> time of the check)
+_missing_files = LRUCache(MISSING_FILES_CACHE_SIZE)
+
+
+def get_design_cache():
+    return _design_cache
+
+
+def get_design_key(params, render_type, colors, artifacts):
+    """Canonical key of the design, cheaper than the parameters hash"""
+    return (
+        tuple(sorted(params.items())),
+        tuple(sorted(render_type.items())),
+        tuple(sorted(colors.items())),
+        tuple(artifacts),
+    )
+
+
+def forget_model(model_hash):
+    """Drop designs of the model, e.g. once its files are evicted from disk"""
+    _design_cache.discard_if(lambda key, entry: entry["model_hash"] == model_hash)
+
+
+def check_missing_file(path, check):
+    """Check the file missing from the cached design, at most once per MISSING_FILE_RECHECK_SECONDS"""
+    checked = _missing_files.get(path)
+    if checked is not None and time.monotonic() - checked < MISSING_FILE_RECHECK_SECONDS:
+        return False
+
+    if check(path):
+        _missing_files.discard_if(lambda key, _: key == path)
+        return True
+
+    _missing_files.put(path, time.monotonic())
+    return False
+
+
+def forget_missing_files(model_hash):
+    """Check files of the model again on the next request, e.g. once a job has generated them"""
+    _missing_files.discard_if(lambda path, _: f"-{model_hash}" in os.path.basename(path))
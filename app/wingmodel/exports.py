@@ -0,0 +1,99 @@
+import gzip
+import struct
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+import numpy as np
+import cadquery as cq
+
+from .constants import *
+from .telemetry import span
+
+
+_executor = None
+
+
+class InProcessExecutor(Executor):
+    """Runs the submitted calls right away in the calling process"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+
+        return future
+
+
+def get_export_executor():
+    """
+    Process pool shared by the model exports, so that parts are tessellated in parallel.
+    The pool is sized to the CPUs left to each CAD worker (see EXPORT_WORKERS), 
+    with a single one parts are exported in process.
+    """
+    global _executor
+
+    if _executor is None:
+        if EXPORT_WORKERS > 1:
+            mp_context = multiprocessing.get_context("spawn")
+            _executor = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=mp_context)
+        else:
+            _executor = InProcessExecutor()
+
+    return _executor
+
+
+def as_shape(model):
+    """Convert workplane to a single (picklable) shape"""
+    if isinstance(model, cq.Shape):
+        return model
+
+    return cq.Compound.makeCompound(model.vals())
+
+
+def export_stl(shape, path, tolerance=STL_EXPORT_TOLERANCE):
+    cq.exporters.export(shape, path, tolerance=tolerance)
+    return path
+
+
+def export_mesh(shape, path, tolerance=STL_EXPORT_TOLERANCE, angular_tolerance=MESH_ANGULAR_TOLERANCE):
+    """
+    Export shape as compact binary mesh for the model viewers (see js/mesh-loader.js):
+    indexed vertices with positions quantized to 16 bits within the bounding box, gzip-compressed.
+    Normals are not stored, since viewers recompute them.
+    """
+    vertices, triangles = shape.tessellate(tolerance, angular_tolerance)
+    positions = np.array([vertex.toTuple() for vertex in vertices], dtype=np.float64).reshape(-1, 3)
+    indices = np.array(triangles, dtype=np.uint32).reshape(-1)
+
+    pos_min, pos_max = positions.min(axis=0), positions.max(axis=0)
+    pos_range = np.where(pos_max > pos_min, pos_max - pos_min, 1.0)
+    quantized = np.round((positions - pos_min) / pos_range * 0xFFFF).astype("<u2")
+    index_type = "<u2" if len(positions) <= 0xFFFF else "<u4"
+
+    header = struct.pack(
+        "<4sIII6f", MESH_FORMAT_MAGIC, MESH_FORMAT_VERSION, len(positions), len(indices), *pos_min, *pos_max
+    )
+    positions_data = quantized.tobytes()
+    ## keep indices aligned to 4 bytes for typed arrays
+    padding = b"\0" * (-len(positions_data) % 4)
+
+    with gzip.open(path, "wb", compresslevel=9) as mesh_file:
+        mesh_file.write(header + positions_data + padding + indices.astype(index_type).tobytes())
+
+    return path
+
+
+def export_part_stl(shape, stl_path, tolerance=STL_EXPORT_TOLERANCE, model_hash=None):
+    part = os.path.basename(stl_path).split("__")[0]
+
+    with span("export.stl", model_hash=model_hash, part=part):
+        return export_stl(shape, stl_path, tolerance)
+
+
+def export_part_mesh(shape, mesh_path, tolerance, angular_tolerance, lod=0, model_hash=None):
+    part = os.path.basename(mesh_path).split("__")[0]
+
+    with span("export.mesh", model_hash=model_hash, part=part, lod=lod):
+        return export_mesh(shape, mesh_path, tolerance, angular_tolerance)
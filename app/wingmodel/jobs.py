@@ -0,0 +1,154 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .constants import *
+from .wing_model import WingModelManager, MODEL_ARTIFACTS, get_model_hash
+from .design_cache import forget_missing_files
+from .catalog import AirfoilCatalog
+
+
+JOB_STAGES = ["geometry", "props", "preview", "meshes", "stl", "step"]
+JOB_QUEUED = "queued"
+JOB_CANCELLED = "cancelled"
+
+_NODE_STAGES = {
+    "cad": "geometry",
+    "geom": "geometry",
+    "props": "props",
+    "section_2d": "preview",
+    "mesh": "preview",
+    "mesh_fine": "meshes",
+    "stl": "stl",
+    "stl_zip": "stl",
+    "step": "step",
+}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class ModelJob:
+    def __init__(self, key, future):
+        self.key = key
+        self.future = future
+        self.subscribers = set()
+
+
+_jobs = {}
+_jobs_lock = threading.RLock()
+_executor = None
+_job_states = None
+_max_workers = CAD_WORKERS
+
+
+def set_max_workers(workers):
+    """Size of the process pool, has to be set before the first job is submitted"""
+    global _max_workers
+
+    with _jobs_lock:
+        if _executor is not None:
+            raise RuntimeError("Model jobs executor is already started")
+        _max_workers = workers
+
+
+def get_max_workers():
+    return _max_workers
+
+
+def _get_executor():
+    global _executor, _job_states
+
+    if _executor is None:
+        ## spawned workers don't inherit OCC state and threads of the streamlit server
+        mp_context = multiprocessing.get_context("spawn")
+        _job_states = mp_context.Manager().dict()
+        _executor = ProcessPoolExecutor(max_workers=_max_workers, mp_context=mp_context)
+
+    return _executor
+
+
+def _generate_model(key, airfoil_data, geom_params, phys_params, dyn_params, artifacts, job_states):
+    def progress(node_name):
+        if job_states.get(key) == JOB_CANCELLED:
+            raise JobCancelled(key)
+        job_states[key] = _NODE_STAGES[node_name]
+
+    render_type = {part: "shaded" for part in MODEL_COLORS}
+    colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+    WingModelManager(AirfoilCatalog(airfoil_data), geom_params, phys_params, dyn_params, render_type, colors,
+                     progress=progress, artifacts=artifacts, track_access=False)
+
+
+def submit_model_job(key, subscriber, airfoil_catalog, geom_params, phys_params, dyn_params,
+                     artifacts=MODEL_ARTIFACTS):
+    """
+    Submit generation of the model `artifacts` to the process pool.
+    Unfinished jobs with the same key are shared by all subscribers (sessions), 
+    finished ones are replaced with a new job, e.g. after a failure or once the artifacts are evicted.
+    """
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None or job.future.done():
+            executor = _get_executor()
+            ## pass only the required airfoil to the worker
+            airfoil_data = airfoil_catalog.subset(geom_params["airfoil_group"], geom_params["airfoil_type"])
+
+            _job_states[key] = JOB_QUEUED
+            future = executor.submit(
+                _generate_model, key, airfoil_data, geom_params, phys_params, dyn_params, artifacts, _job_states
+            )
+            job = _jobs[key] = ModelJob(key, future)
+            model_hash = get_model_hash(geom_params)
+            future.add_done_callback(lambda _: _forget_job_state(key))
+            ## files generated by the job are picked up by the designs kept in memory right away
+            future.add_done_callback(lambda _: forget_missing_files(model_hash))
+
+        job.subscribers.add(subscriber)
+
+    return job
+
+
+def get_job_stage(key):
+    if _job_states is None:
+        return
+    return _job_states.get(key)
+
+
+def release_job(key, subscriber):
+    """
+    Unsubscribe from the job, cancelling it when nobody waits for its result.
+    Running jobs are stopped before the next pipeline stage.
+    """
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None:
+            return
+
+        job.subscribers.discard(subscriber)
+        if job.subscribers:
+            return
+
+        del _jobs[key]
+        if job.future.done():
+            _forget_job_state(key)
+        elif not job.future.cancel():
+            _job_states[key] = JOB_CANCELLED
+
+
+def _forget_job_state(key):
+    with _jobs_lock:
+        if key not in _jobs:
+            _job_states.pop(key, None)
+
+
+def shutdown_jobs():
+    """Stop the worker processes once all jobs are done, e.g. at the end of a benchmark"""
+    global _executor
+
+    with _jobs_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=True)
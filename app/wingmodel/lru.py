@@ -0,0 +1,89 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def deep_sizeof(value):
+    """Approximate memory usage of nested dicts, lists, tuples and sets of plain values [bytes]"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(key) + deep_sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item) for item in value)
+
+    return size
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that keeps up to `maxsize` most recently used items.
+    With `max_bytes`, items are also evicted until their total size (see `sizeof`) fits into it.
+    """
+
+    def __init__(self, maxsize, max_bytes=None, sizeof=deep_sizeof):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            self._remove(key)
+            self._items[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+
+            while len(self._items) > self.maxsize or (self.max_bytes is not None and self.nbytes > self.max_bytes):
+                self._remove(next(iter(self._items)))
+
+    def _remove(self, key):
+        if key in self._items:
+            del self._items[key]
+            self.nbytes -= self._sizes.pop(key)
+
+    def discard_if(self, predicate):
+        """Remove items for which `predicate(key, value)` is true"""
+        with self._lock:
+            for key in [key for key, value in self._items.items() if predicate(key, value)]:
+                self._remove(key)
+
+    def get_or_create(self, key, create):
+        """
+        Return cached value or create and cache it. 
+        Values are created outside of the lock, so concurrent callers may create it twice.
+        """
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.put(key, value)
+
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes or 0,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def __len__(self):
+        return len(self._items)
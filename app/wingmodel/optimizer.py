@@ -0,0 +1,197 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .constants import *
+from .catalog import get_default_geom_params
+from .wing_model import get_tip_deflection, get_safety_factor, get_params_hash
+
+
+OBJECTIVES = {
+    "mass": "Minimal Console Mass",
+    "excess_lift": "Maximal Excess Lift",
+}
+
+
+def get_excess_lift(model_props):
+    return model_props["lift_force"] - G * model_props["total_mass"] # [N]
+
+
+def is_feasible(model_props):
+    """Same constraints as the structural mechanics stats icons"""
+    tip_deflection = get_tip_deflection(model_props)
+    return (
+        get_safety_factor(model_props) >= MIN_SAFETY_FACTOR
+        and 0 <= tip_deflection <= DELTA_MAX
+        and model_props["lift_to_weight"] > 1
+    )
+
+
+def _objective_value(model_props, objective):
+    ## objectives are minimized
+    if objective == "mass":
+        return model_props["total_mass"]
+    return -get_excess_lift(model_props)
+
+
+def pareto_front(designs):
+    """Designs not dominated in both console mass (minimized) and excess lift (maximized), sorted by mass"""
+    front = []
+    best_lift = -math.inf
+
+    for design in sorted(designs, key=lambda d: (d["total_mass"], -get_excess_lift(d))):
+        excess_lift = get_excess_lift(design)
+        if excess_lift > best_lift:
+            front.append(design)
+            best_lift = excess_lift
+
+    return front
+
+
+def _sample_designs(base_design, box_materials, bounds, n_samples, rng):
+    """Latin hypercube samples of chord, span, shell thickness and box material"""
+    from scipy.stats import qmc
+
+    sampler = qmc.LatinHypercube(d=4, seed=rng)
+    samples = sampler.random(n_samples)
+    designs = []
+
+    for chord_s, span_s, shell_s, material_s in samples:
+        chord = bounds["chord"][0] + chord_s * (bounds["chord"][1] - bounds["chord"][0])
+        span = bounds["span"][0] + span_s * (bounds["span"][1] - bounds["span"][0])
+        shell_thickness = SHELL_THICKNESS_CHOICES[int(shell_s * len(SHELL_THICKNESS_CHOICES))]
+        material = box_materials[int(material_s * len(box_materials))]
+
+        designs.append({
+            **base_design,
+            **material,
+            ## span on the same grid as the toolbar sliders, so that evaluated points are reused
+            "chord": int(OPTIMIZER_CHORD_STEP * round(chord / OPTIMIZER_CHORD_STEP)),
+            "span": int(5 * round(span / 5)),
+            "shell_thickness": shell_thickness,
+        })
+
+    return designs
+
+
+def _shrink_bounds(best_design, round_ind):
+    bounds = {}
+    for key, (low, high) in [("chord", (CHORD_MIN, CHORD_MAX)), ("span", (SPAN_MIN, SPAN_MAX))]:
+        half_width = 0.5 * (high - low) * OPTIMIZER_SHRINK**round_ind
+        bounds[key] = (max(low, best_design[key] - half_width), min(high, best_design[key] + half_width))
+
+    return bounds
+
+
+def optimize_design(airfoil_catalog, base_design, objective="mass", box_materials=None,
+                    n_samples=OPTIMIZER_SAMPLES, n_rounds=OPTIMIZER_ROUNDS, workers=CAD_WORKERS,
+                    out_dir=OPTIMIZER_RESULTS_DIR, seed=None, progress=None):
+    """
+    Search chord, span, shell thickness and box material of the design minimizing `objective`
+    under the safety factor, tip deflection and lift-to-weight constraints.
+
+    Every round evaluates a Latin hypercube sample of candidates in the fast mode (in parallel,
+    see `run_sweep`, with the same process pool for all rounds), with the search box shrinking 
+    around the best feasible design.
+    Evaluated points are kept in `out_dir`, so repeated runs evaluate only new candidates.
+    Returns the best feasible design (or None), the Pareto front and all evaluated designs.
+    """
+    ## sweep engine loads pyarrow, which the app doesn't need until the optimizer runs
+    from .sweep import run_sweep, get_sweep_executor, load_sweep_results, split_design, get_design_hash
+
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+
+    box_materials = box_materials or [{key: base_design[key] for key in BOX_MATERIALS["Default"]}]
+    default_geom_params = get_default_geom_params(airfoil_catalog)
+    rng = np.random.default_rng(seed)
+    bounds = {"chord": (CHORD_MIN, CHORD_MAX), "span": (SPAN_MIN, SPAN_MAX)}
+
+    evaluated = {}
+    best = None
+
+    with get_sweep_executor(workers) as executor:
+        for round_ind in range(n_rounds):
+            candidates = _sample_designs(base_design, box_materials, bounds, n_samples, rng)
+            run_sweep(airfoil_catalog, candidates, out_dir=out_dir, fast=True, executor=executor)
+
+            results = {
+                row["design_hash"]: row for row in load_sweep_results(out_dir).to_pylist() if row.get("fast")
+            }
+            for candidate in candidates:
+                design_hash = get_design_hash(*split_design(candidate, default_geom_params))
+                if design_hash in results:
+                    evaluated[design_hash] = results[design_hash]
+
+            feasible = [design for design in evaluated.values() if is_feasible(design)]
+            if feasible:
+                best = min(feasible, key=lambda design: _objective_value(design, objective))
+                bounds = _shrink_bounds(best, round_ind + 1)
+
+            if progress:
+                progress(round_ind + 1, n_rounds, len(evaluated), best)
+
+    feasible = [design for design in evaluated.values() if is_feasible(design)]
+
+    return {
+        "best": best,
+        "pareto": pareto_front(feasible),
+        "evaluated": list(evaluated.values()),
+    }
+
+
+class OptimizerJob:
+    """Optimization running in the background, shared by the sessions requesting the same search"""
+
+    def __init__(self, key, n_rounds):
+        self.key = key
+        self.future = None
+        self.progress = (0, n_rounds, 0, None) ## round, rounds, evaluated designs, best design
+
+
+_optimizer_jobs = {}
+_optimizer_jobs_lock = threading.RLock()
+## optimizations run one at a time, each keeps all the sweep worker processes busy
+_optimizer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="optimizer")
+
+
+def submit_optimizer_job(airfoil_catalog, base_design, **kwargs):
+    """
+    Run `optimize_design` with `kwargs` in the background thread, so that it continues across reruns.
+    Unfinished jobs with the same parameters are shared, the job progress is updated after every round.
+    """
+    key = get_params_hash({**base_design, **kwargs})
+
+    with _optimizer_jobs_lock:
+        job = _optimizer_jobs.get(key)
+        if job is None:
+            job = _optimizer_jobs[key] = OptimizerJob(key, kwargs.get("n_rounds", OPTIMIZER_ROUNDS))
+
+            def progress(*state):
+                job.progress = state
+
+            job.future = _optimizer_executor.submit(
+                optimize_design, airfoil_catalog, base_design, progress=progress, **kwargs
+            )
+            job.future.add_done_callback(lambda _: _forget_optimizer_job(key))
+
+    return job
+
+
+def _forget_optimizer_job(key):
+    ## subscribers keep the job itself until they pick up the result
+    with _optimizer_jobs_lock:
+        _optimizer_jobs.pop(key, None)
+
+
+def design_params(design):
+    """Split the design (sweep result or props store row) into model manager parameters"""
+    geom_params = {key: design[key] for key in ["airfoil_group", "airfoil_type", "shell_thickness", "lattice"]}
+    geom_params["chord"] = int(design["chord"])
+    geom_params["span"] = int(design["span"])
+    geom_params["shell_thickness"] = int(design["shell_thickness"])
+    phys_params = {key: design[key] for key in PHYS_PARAMS_DEFAULT}
+    dyn_params = {key: design[key] for key in DYN_PARAMS_DEFAULT}
+
+    return geom_params, phys_params, dyn_params
@@ -0,0 +1,99 @@
+import numpy as np
+from slugify import slugify
+
+from .constants import *
+from .lru import LRUCache
+from .storage import atomic_path
+
+
+_polars_cache = LRUCache(POLAR_CACHE_SIZE)
+
+
+def eval_polar(airfoil, alphas, reynolds):
+    """Evaluate lift, drag and moment coefficients over the array of angles of attack"""
+    alphas = np.asarray(alphas, dtype=float)
+    coefs = []
+
+    for eval_coef in [airfoil.eval_cl, airfoil.eval_cd, airfoil.eval_cm]:
+        try:
+            values = np.asarray(eval_coef(alphas, reynolds), dtype=float)
+        except (TypeError, ValueError):
+            values = None
+
+        if values is None or values.shape != alphas.shape:
+            ## airfoil curves evaluated only at scalar angles
+            values = np.array([eval_coef(alpha, reynolds) for alpha in alphas], dtype=float)
+
+        coefs.append(values)
+
+    return coefs
+
+
+class AirfoilPolar:
+    """Airfoil aerodynamic coefficients tabulated over angles of attack at the fixed Reynolds number"""
+
+    def __init__(self, airfoil, reynolds, alphas=POLAR_ALPHAS):
+        cl, cd, cm = eval_polar(airfoil, alphas, reynolds)
+
+        ## keep angles at which airfoil has any data
+        valid = ~(np.isnan(cl) & np.isnan(cd))
+        self._set_table(reynolds, np.asarray(alphas, dtype=float)[valid], cl[valid], cd[valid], cm[valid])
+
+    def _set_table(self, reynolds, alpha, cl, cd, cm):
+        self.reynolds = reynolds
+        self.alpha = alpha
+        self.cl = cl
+        self.cd = cd
+        self.cm = cm
+        self.cl_to_cd = self.cl / self.cd
+
+        for values in [self.alpha, self.cl, self.cd, self.cm, self.cl_to_cd]:
+            values.flags.writeable = False
+
+    @classmethod
+    def load(cls, path):
+        """Polar saved with `save`, without loading the airfoil"""
+        with np.load(path) as table:
+            polar = cls.__new__(cls)
+            polar._set_table(float(table["reynolds"]), table["alpha"], table["cl"], table["cd"], table["cm"])
+
+        return polar
+
+    def save(self, path):
+        with atomic_path(path) as polar_path:
+            np.savez(polar_path, reynolds=self.reynolds, alpha=self.alpha, cl=self.cl, cd=self.cd, cm=self.cm)
+
+    def alpha_optimal(self):
+        return float(self.alpha[np.nanargmax(self.cl_to_cd)])
+
+    def alpha_max_lift(self):
+        return float(self.alpha[np.nanargmax(self.cl)])
+
+    def alpha_min_drag(self):
+        return float(self.alpha[np.nanargmin(self.cd)])
+
+
+def _load_or_eval_polar(airfoil_catalog, airfoil_group, airfoil_type, reynolds):
+    path = os.path.join(POLARS_DIR, f"{slugify(airfoil_group)}-{slugify(airfoil_type)}-{reynolds:g}.npz")
+    if USE_CACHED_RESULTS and os.path.isfile(path):
+        return AirfoilPolar.load(path)
+
+    polar = AirfoilPolar(airfoil_catalog.get_airfoil(airfoil_group, airfoil_type), reynolds)
+    os.makedirs(POLARS_DIR, exist_ok=True)
+    polar.save(path)
+
+    return polar
+
+
+def get_airfoil_polar(airfoil_catalog, airfoil_group, airfoil_type, reynolds):
+    """
+    Polar of the airfoil shared across models with the close Reynolds numbers.
+    Polars are kept in memory and on disk (see POLARS_DIR), so the airfoil itself 
+    is loaded from the catalog only when the polar was never evaluated before.
+    """
+    reynolds = float(f"{reynolds:.{POLAR_REYNOLDS_DIGITS}g}")
+    key = (airfoil_group, airfoil_type, reynolds)
+
+    return _polars_cache.get_or_create(
+        key, lambda: _load_or_eval_polar(airfoil_catalog, airfoil_group, airfoil_type, reynolds)
+    )
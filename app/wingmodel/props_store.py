@@ -0,0 +1,193 @@
+import io
+import csv
+import json
+import sqlite3
+import threading
+from contextlib import closing
+
+from .constants import *
+
+
+## typed columns of the model properties, POINT is stored as two REAL columns
+PROPS_COLUMNS = {
+    "airfoil_group": "TEXT",
+    "airfoil_type": "TEXT",
+    "chord": "INTEGER",
+    "span": "INTEGER",
+    "shell_thickness": "INTEGER",
+    "lattice": "BOOLEAN",
+    "box_density": "REAL",
+    "box_tensile_strength": "REAL",
+    "box_tensile_modulus": "REAL",
+    "foam_density": "REAL",
+    "shell_density": "REAL",
+    "velocity": "REAL",
+    "aoa_type": "TEXT",
+    "area": "REAL",
+    "aspect_ratio": "REAL",
+    "box_thickness": "REAL",
+    "profile_height": "REAL",
+    "box_Ixx": "REAL",
+    "box_Iyy": "REAL",
+    "box_mass": "REAL",
+    "foam_mass": "REAL",
+    "shell_mass": "REAL",
+    "total_mass": "REAL",
+    "alpha": "REAL",
+    "cl": "REAL",
+    "cd": "REAL",
+    "cm": "REAL",
+    "lift_force": "REAL",
+    "drag_force": "REAL",
+    "lift_to_weight": "REAL",
+    "center_of_pressure": "POINT",
+    "dyn_airpressure": "REAL",
+    "specific_load": "REAL",
+    "bend_force": "REAL",
+    "reynolds": "REAL",
+    "bend_stress": "REAL",
+    "shear_stress": "REAL",
+    "von_mises_stress": "REAL",
+}
+
+
+def _sql_columns():
+    for name, col_type in PROPS_COLUMNS.items():
+        if col_type == "POINT":
+            yield f"{name}_x", "REAL"
+            yield f"{name}_y", "REAL"
+        elif col_type == "BOOLEAN":
+            yield name, "INTEGER"
+        else:
+            yield name, col_type
+
+
+def _coerce(value, col_type):
+    """Python value of the column type, e.g. from numpy scalars and 0-d arrays"""
+    if value is None:
+        return None
+    if col_type == "INTEGER":
+        return int(value)
+    if col_type == "REAL":
+        return float(value)
+    if col_type == "BOOLEAN":
+        return bool(value)
+
+    return value
+
+
+class PropsStore:
+    """
+    Model properties indexed by model and props hashes, one typed row per design.
+    Properties missing in PROPS_COLUMNS are kept in the JSON `extra` column.
+    """
+
+    def __init__(self, db_path=PROPS_DB_PATH):
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS props ("
+                "model_hash TEXT NOT NULL, props_hash TEXT NOT NULL, extra TEXT, "
+                "PRIMARY KEY (model_hash, props_hash))"
+            )
+
+            ## add columns introduced after the table was created
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(props)")}
+            for name, col_type in _sql_columns():
+                if name not in existing:
+                    conn.execute(f'ALTER TABLE props ADD COLUMN "{name}" {col_type}')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return closing(conn)
+
+    def put(self, model_hash, props_hash, model_props):
+        row = {"model_hash": model_hash, "props_hash": props_hash}
+        extra = {}
+
+        for name, value in model_props.items():
+            col_type = PROPS_COLUMNS.get(name)
+            if col_type == "POINT":
+                row[f"{name}_x"], row[f"{name}_y"] = (_coerce(coord, "REAL") for coord in value)
+            elif col_type == "BOOLEAN":
+                row[name] = int(_coerce(value, col_type))
+            elif col_type:
+                row[name] = _coerce(value, col_type)
+            else:
+                extra[name] = value
+
+        row["extra"] = json.dumps(extra) if extra else None
+        columns = ", ".join(f'"{name}"' for name in row)
+        placeholders = ", ".join("?" for _ in row)
+
+        with self._connect() as conn, conn:
+            conn.execute(f"INSERT OR REPLACE INTO props ({columns}) VALUES ({placeholders})", list(row.values()))
+
+    def _to_props(self, row):
+        model_props = {}
+        for name, col_type in PROPS_COLUMNS.items():
+            if col_type == "POINT":
+                x, y = row[f"{name}_x"], row[f"{name}_y"]
+                model_props[name] = None if x is None else (x, y)
+            else:
+                ## columns created with an older type keep their stored values
+                model_props[name] = _coerce(row[name], col_type)
+
+        if row["extra"]:
+            model_props.update(json.loads(row["extra"]))
+
+        return model_props
+
+    def get(self, model_hash, props_hash):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM props WHERE model_hash = ? AND props_hash = ?", (model_hash, props_hash)
+            ).fetchone()
+
+        return self._to_props(row) if row else None
+
+    def query(self, **filters):
+        """Properties of all designs matching the column values in `filters`, e.g. `airfoil_type="NACA 2412"`"""
+        names = {"model_hash", "props_hash"} | {name for name, _ in _sql_columns()}
+        unknown = set(filters) - names
+        if unknown:
+            raise ValueError(f"Unknown props columns: {', '.join(sorted(unknown))}")
+
+        where = " AND ".join(f'"{name}" = ?' for name in filters) or "1"
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM props WHERE {where}", list(filters.values())).fetchall()
+
+        return [{"model_hash": row["model_hash"], "props_hash": row["props_hash"], **self._to_props(row)}
+                for row in rows]
+
+    def delete(self, model_hash):
+        with self._connect() as conn, conn:
+            conn.execute("DELETE FROM props WHERE model_hash = ?", (model_hash,))
+
+
+def props_to_csv(rows):
+    """CSV text with a header and a row per design"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(rows[0].keys()))
+    writer.writeheader()
+    writer.writerows(rows)
+
+    return output.getvalue()
+
+
+_props_store = None
+_props_store_lock = threading.Lock()
+
+
+def get_props_store():
+    global _props_store
+
+    with _props_store_lock:
+        if _props_store is None:
+            _props_store = PropsStore()
+
+    return _props_store
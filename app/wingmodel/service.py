@@ -0,0 +1,383 @@
+import re
+import json
+import math
+import time
+import shutil
+import threading
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .constants import *
+from .catalog import get_default_geom_params
+from .lru import LRUCache
+from .sweep import split_design
+from .wing_model import WingModelManager, CadModelRequired, DOWNLOAD_ARTIFACTS, get_model_hash, get_params_hash
+from .jobs import JOB_STAGES, JobCancelled, submit_model_job, get_job_stage, release_job, get_max_workers
+
+
+## properties and download files, preview meshes are generated by the app only
+API_ARTIFACTS = ["geom", "props", "stl", "stl_zip", "step"]
+API_SUBSCRIBER = "api"
+MAX_REQUEST_BYTES = 64 * 1024
+
+## same limits as the toolbar inputs
+GEOM_LIMITS = {"chord": (CHORD_MIN, CHORD_MAX), "span": (SPAN_MIN, SPAN_MAX), "shell_thickness": (1, 3)}
+NUMBER_LIMITS = {
+    "velocity": (1.0, 100.0), # [m/s]
+    "box_density": (1.0, 20e3), # [kg/m^3]
+    "box_tensile_strength": (1.0, 100e3), # [MPa]
+    "box_tensile_modulus": (1.0, 1e3), # [GPa]
+    "foam_density": (1.0, 20e3), # [kg/m^3]
+    "shell_density": (1.0, 20e3), # [kg/m^3]
+}
+
+DOWNLOAD_CONTENT_TYPES = {
+    "stl": "application/zip",
+    "step": "model/step",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiJob:
+    def __init__(self, job_id, model_hash, geom_params, phys_params, dyn_params):
+        self.job_id = job_id
+        self.model_hash = model_hash
+        self.geom_params = geom_params
+        self.phys_params = phys_params
+        self.dyn_params = dyn_params
+        self.submitted = time.time()
+        ## None when the design was found in cache
+        self.model_job = None
+        self.wing_console = None
+        self.cancelled = False
+
+
+class ModelService:
+    """
+    Job queue around the model jobs process pool (see `jobs`) for the HTTP API.
+    Requests with the same design share one job, new jobs are rejected
+    while `max_queue` jobs are unfinished.
+    """
+
+    def __init__(self, airfoil_catalog, max_queue=SERVICE_MAX_QUEUE):
+        self.airfoil_catalog = airfoil_catalog
+        self.max_queue = max_queue
+        self.default_geom_params = get_default_geom_params(airfoil_catalog)
+        self._active = {}
+        self._finished = LRUCache(SERVICE_JOB_HISTORY)
+        self._lock = threading.Lock()
+
+    def _parse_design(self, design):
+        if not isinstance(design, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Design must be a JSON object of parameters")
+
+        try:
+            geom_params, phys_params, dyn_params = split_design(design, self.default_geom_params)
+        except ValueError as exc:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(exc))
+
+        airfoil_group = geom_params["airfoil_group"]
+        if airfoil_group not in self.airfoil_catalog.groups():
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown airfoil group: {airfoil_group}")
+        if geom_params["airfoil_type"] not in self.airfoil_catalog.types(airfoil_group):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown airfoil: {geom_params['airfoil_type']}")
+
+        for key, (low, high) in GEOM_LIMITS.items():
+            value = geom_params[key]
+            if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"{key} must be an integer in [{low}, {high}]")
+
+        if not isinstance(geom_params["lattice"], bool):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "lattice must be true or false")
+        if dyn_params["aoa_type"] not in AOA_TYPES:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"aoa_type must be one of: {', '.join(AOA_TYPES)}")
+
+        for params in (phys_params, dyn_params):
+            for key in set(params) & set(NUMBER_LIMITS):
+                low, high = NUMBER_LIMITS[key]
+                value = params[key]
+                if (not isinstance(value, (int, float)) or isinstance(value, bool)
+                        or not math.isfinite(value) or not low <= value <= high):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, f"{key} must be a number in [{low}, {high}]")
+                ## same hash as the design entered in the app
+                params[key] = float(value)
+
+        return geom_params, phys_params, dyn_params
+
+    def _load_cached(self, api_job):
+        render_type = {part: "shaded" for part in MODEL_COLORS}
+        colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+
+        return WingModelManager(
+            self.airfoil_catalog, api_job.geom_params, api_job.phys_params, api_job.dyn_params, render_type, colors,
+            generate_cad=False, artifacts=API_ARTIFACTS
+        )
+
+    def submit(self, design):
+        """Job of the design, coalesced with the unfinished job of the same design if any"""
+        geom_params, phys_params, dyn_params = self._parse_design(design)
+        model_hash = get_model_hash(geom_params)
+        job_id = f"{model_hash}-{get_params_hash({**geom_params, **phys_params, **dyn_params})}"
+
+        with self._lock:
+            api_job = self._active.get(job_id)
+        if api_job:
+            return api_job
+
+        api_job = ApiJob(job_id, model_hash, geom_params, phys_params, dyn_params)
+        try:
+            api_job.wing_console = self._load_cached(api_job)
+            self._finished.put(job_id, api_job)
+            return api_job
+        except CadModelRequired:
+            pass
+
+        with self._lock:
+            if job_id in self._active:
+                return self._active[job_id]
+            if len(self._active) >= self.max_queue:
+                raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "Job queue is full, retry later")
+
+            api_job.model_job = submit_model_job(
+                job_id, API_SUBSCRIBER, self.airfoil_catalog, geom_params, phys_params, dyn_params,
+                artifacts=API_ARTIFACTS
+            )
+            self._active[job_id] = api_job
+
+        api_job.model_job.future.add_done_callback(lambda _: self._finish(api_job))
+        return api_job
+
+    def _finish(self, api_job):
+        with self._lock:
+            if self._active.get(api_job.job_id) is not api_job:
+                return ## cancelled and released already, the key may belong to a new job
+            del self._active[api_job.job_id]
+            self._finished.put(api_job.job_id, api_job)
+
+        ## unsubscribe, so that the next job of the design is submitted anew
+        release_job(api_job.job_id, API_SUBSCRIBER)
+
+    def get(self, job_id):
+        with self._lock:
+            api_job = self._active.get(job_id) or self._finished.get(job_id)
+        if api_job is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Unknown job: {job_id}")
+
+        return api_job
+
+    def cancel(self, job_id):
+        """Cancel the unfinished job, new requests of the design are submitted as a new job"""
+        api_job = self.get(job_id)
+
+        with self._lock:
+            cancelled = self._active.get(job_id) is api_job and not api_job.model_job.future.done()
+            if cancelled:
+                api_job.cancelled = True
+                del self._active[job_id]
+                self._finished.put(job_id, api_job)
+
+        if cancelled:
+            ## running job is stopped by the worker before its next stage
+            release_job(job_id, API_SUBSCRIBER)
+
+        return api_job
+
+    def status(self, api_job):
+        status = {"job_id": api_job.job_id, "model_hash": api_job.model_hash, "submitted": api_job.submitted}
+        future = api_job.model_job.future if api_job.model_job else None
+
+        if future is None:
+            status["status"] = "done"
+        elif future.cancelled() or api_job.cancelled:
+            status["status"] = "cancelled"
+        elif not future.done():
+            stage = get_job_stage(api_job.job_id)
+            status["status"] = "running" if stage in JOB_STAGES else "queued"
+            status["stage"] = stage if stage in JOB_STAGES else None
+        elif isinstance(future.exception(), JobCancelled):
+            status["status"] = "cancelled"
+        elif future.exception():
+            status["status"] = "failed"
+            status["error"] = str(future.exception())
+        else:
+            status["status"] = "done"
+
+        return status
+
+    def result(self, api_job):
+        status = self.status(api_job)
+        if status["status"] != "done":
+            raise ApiError(HTTPStatus.CONFLICT, f"Job is {status['status']}")
+
+        if api_job.wing_console is None:
+            try:
+                api_job.wing_console = self._load_cached(api_job)
+            except CadModelRequired:
+                raise ApiError(HTTPStatus.GONE, "Job artifacts were evicted from cache, submit the design again")
+
+        return api_job.wing_console
+
+    def stats(self):
+        with self._lock:
+            active = len(self._active)
+
+        return {"active_jobs": active, "max_queue": self.max_queue, "workers": get_max_workers()}
+
+
+def _json_default(value):
+    ## numpy scalars
+    return value.item()
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                submit the design (JSON object of parameters, app defaults if omitted)
+    GET /jobs/<id>            job status
+    GET /jobs/<id>/result     model properties and download links
+    GET /jobs/<id>/stl|step   download files streamed from cache
+    DELETE /jobs/<id>         cancel the job
+    GET /health               queue stats
+    """
+
+    protocol_version = "HTTP/1.1"
+    routes = [
+        ("POST", re.compile(r"^/jobs$"), "_submit"),
+        ("GET", re.compile(r"^/jobs/(?P<job_id>[^/]+)$"), "_status"),
+        ("GET", re.compile(r"^/jobs/(?P<job_id>[^/]+)/result$"), "_result"),
+        ("GET", re.compile(r"^/jobs/(?P<job_id>[^/]+)/(?P<kind>stl|step)$"), "_download"),
+        ("DELETE", re.compile(r"^/jobs/(?P<job_id>[^/]+)$"), "_cancel"),
+        ("GET", re.compile(r"^/health$"), "_health"),
+    ]
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        path = urlsplit(self.path).path.rstrip("/")
+
+        try:
+            for route_method, pattern, handler_name in self.routes:
+                match = pattern.match(path)
+                if match and route_method == method:
+                    return getattr(self, handler_name)(**match.groupdict())
+
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Not found: {method} {path}")
+        except ApiError as exc:
+            headers = {}
+            if exc.status == HTTPStatus.SERVICE_UNAVAILABLE:
+                headers["Retry-After"] = str(SERVICE_RETRY_AFTER_SECONDS)
+            self._send_json({"error": str(exc)}, status=exc.status, headers=headers)
+        except Exception as exc:
+            self.log_error("Request failed: %s", exc)
+            self._send_json({"error": "Internal server error"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    def _send_json(self, data, status=HTTPStatus.OK, headers=None):
+        body = json.dumps(data, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large")
+
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be JSON")
+
+    def _job_links(self, job_id):
+        return {
+            "status": f"/jobs/{job_id}",
+            "result": f"/jobs/{job_id}/result",
+            **{kind: f"/jobs/{job_id}/{kind}" for kind in DOWNLOAD_ARTIFACTS},
+        }
+
+    def _submit(self):
+        api_job = self.service.submit(self._read_json())
+        status = self.service.status(api_job)
+        status["links"] = self._job_links(api_job.job_id)
+
+        self._send_json(
+            status, status=HTTPStatus.OK if status["status"] == "done" else HTTPStatus.ACCEPTED,
+            headers={"Location": status["links"]["status"]}
+        )
+
+    def _status(self, job_id):
+        status = self.service.status(self.service.get(job_id))
+        status["links"] = self._job_links(job_id)
+        self._send_json(status)
+
+    def _result(self, job_id):
+        wing_console = self.service.result(self.service.get(job_id))
+        self._send_json({
+            "job_id": job_id,
+            "model_hash": wing_console.model_hash,
+            "model_props": wing_console.model_props,
+            "links": self._job_links(job_id),
+        })
+
+    def _cancel(self, job_id):
+        api_job = self.service.cancel(job_id)
+        self._send_json(self.service.status(api_job))
+
+    def _health(self):
+        self._send_json({"status": "ok", **self.service.stats()})
+
+    def _download(self, job_id, kind):
+        wing_console = self.service.result(self.service.get(job_id))
+        path = wing_console.get_download_path(kind)
+        if not os.path.isfile(path):
+            raise ApiError(HTTPStatus.GONE, "Job artifacts were evicted from cache, submit the design again")
+
+        file_stat = os.stat(path)
+        etag = f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+        headers = {"ETag": etag, "Last-Modified": formatdate(file_stat.st_mtime, usegmt=True)}
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with open(path, "rb") as artifact_file:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", DOWNLOAD_CONTENT_TYPES[kind])
+            self.send_header("Content-Length", str(file_stat.st_size))
+            self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            shutil.copyfileobj(artifact_file, self.wfile, SERVICE_CHUNK_SIZE)
+
+
+def make_server(service, host="127.0.0.1", port=SERVICE_PORT):
+    server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+
+    return server
@@ -0,0 +1,76 @@
+import shutil
+from uuid import uuid4
+from contextlib import contextmanager
+
+from filelock import FileLock
+
+from .constants import *
+
+
+def _temp_path(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp-{uuid4().hex}{ext}"
+
+
+def model_lock(key):
+    """
+    Inter-process lock guarding generation of the model artifacts,
+    so that only one session builds them while others wait for the result.
+    """
+    os.makedirs(LOCKS_DIR, exist_ok=True)
+    return FileLock(os.path.join(LOCKS_DIR, f"{key}.lock"), timeout=MODEL_LOCK_TIMEOUT_SECONDS)
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yield temporary path (with the same extension) to write the file into,
+    which is atomically renamed to `path` when writing succeeds.
+    """
+    temp_path = _temp_path(path)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    finally:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+
+@contextmanager
+def atomic_dir(path):
+    """
+    Yield temporary directory to write files into, which is marked as complete
+    and renamed to `path` when writing succeeds. A directory already at `path`
+    is renamed aside first and removed afterwards, so readers never see it partially 
+    removed: `path` is either complete or missing (see `list_complete_dir`).
+    """
+    temp_dir = _temp_path(path)
+    os.makedirs(temp_dir)
+    old_dir = None
+    try:
+        yield temp_dir
+        open(os.path.join(temp_dir, COMPLETE_MARKER), "w").close()
+        if os.path.isdir(path):
+            ## leftover of an interrupted or outdated write
+            old_dir = _temp_path(path)
+            os.replace(path, old_dir)
+        os.replace(temp_dir, path)
+    finally:
+        for dir_path in [temp_dir, old_dir]:
+            if dir_path and os.path.isdir(dir_path):
+                shutil.rmtree(dir_path)
+
+
+def is_complete_dir(path):
+    return os.path.isfile(os.path.join(path, COMPLETE_MARKER))
+
+
+def list_complete_dir(path):
+    """File names in the directory written by `atomic_dir`, empty if it's incomplete, missing or being replaced"""
+    try:
+        if is_complete_dir(path):
+            return [name for name in os.listdir(path) if name != COMPLETE_MARKER]
+    except FileNotFoundError:
+        pass
+
+    return []
@@ -0,0 +1,210 @@
+import glob
+import json
+import logging
+import itertools
+import multiprocessing
+from uuid import uuid4
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .constants import *
+from .catalog import AirfoilCatalog, get_default_geom_params
+from .storage import atomic_path
+from .wing_model import WingModelManager, get_model_hash, get_section_hash, get_params_hash
+
+
+GEOM_KEYS = ["airfoil_group", "airfoil_type", "chord", "span", "shell_thickness", "lattice"]
+INTEGER_GEOM_KEYS = ["chord", "span", "shell_thickness"]
+PHYS_KEYS = list(PHYS_PARAMS_DEFAULT.keys())
+DYN_KEYS = list(DYN_PARAMS_DEFAULT.keys())
+SWEEP_ARTIFACTS = ["geom", "props"]
+
+logger = logging.getLogger(__name__)
+
+
+def expand_grid(grid):
+    """List of designs for all combinations of the parameter values in `grid` (name -> list of values)"""
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def load_designs(path):
+    """Designs from the JSON file with either a grid or a list of designs"""
+    with open(path) as designs_file:
+        designs = json.load(designs_file)
+
+    if isinstance(designs, dict):
+        return expand_grid(designs)
+
+    return designs
+
+
+def split_design(design, default_geom_params):
+    """
+    Split flat design parameters into geometry, materials and flight conditions, filling in defaults.
+    Integer-valued chord, span and shell thickness are converted to int, other fractional ones are rejected.
+    """
+    design = {**default_geom_params, **PHYS_PARAMS_DEFAULT, **DYN_PARAMS_DEFAULT, **design}
+    unknown = set(design) - set(GEOM_KEYS + PHYS_KEYS + DYN_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown design parameters: {', '.join(sorted(unknown))}")
+
+    geom_params = {key: design[key] for key in GEOM_KEYS}
+    for key in INTEGER_GEOM_KEYS:
+        ## e.g. 260.0 from JSON, model hashes and cached file names are built of integers
+        if isinstance(geom_params[key], float):
+            if not geom_params[key].is_integer():
+                raise ValueError(f"{key} must be an integer, got {geom_params[key]}")
+            geom_params[key] = int(geom_params[key])
+    phys_params = {key: design[key] for key in PHYS_KEYS}
+    dyn_params = {key: design[key] for key in DYN_KEYS}
+
+    return geom_params, phys_params, dyn_params
+
+
+def get_design_hash(geom_params, phys_params, dyn_params):
+    """Same as props hash of the model manager"""
+    return get_params_hash({**geom_params, **phys_params, **dyn_params})
+
+
+def _design_row(wing_console):
+    row = {"model_hash": wing_console.model_hash, "design_hash": wing_console.props_hash, "fast": wing_console.fast}
+
+    for key, value in wing_console.model_props.items():
+        if key == "center_of_pressure":
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            ## keep column types the same across part files
+            value = float(value)
+        row[key] = value
+
+    row["lift_force_arm"] = float(wing_console.geom_record["lift_force_arm"])
+
+    return row
+
+
+def _evaluate_designs(airfoil_data, designs, fast=False):
+    """
+    Evaluate designs sharing the same geometry (cross-section in the fast mode), 
+    which is built (or loaded from cache) once
+    """
+    airfoil_catalog = AirfoilCatalog(airfoil_data)
+    rows = []
+
+    for geom_params, phys_params, dyn_params in designs:
+        wing_console = WingModelManager(
+            airfoil_catalog, geom_params, phys_params, dyn_params, render_type={}, colors={},
+            artifacts=SWEEP_ARTIFACTS, track_access=False, fast=fast
+        )
+        rows.append(_design_row(wing_console))
+
+    return rows
+
+
+def _part_paths(out_dir):
+    return sorted(
+        path for path in glob.glob(os.path.join(out_dir, "part-*.parquet")) if ".tmp-" not in path
+    )
+
+
+def completed_designs(out_dir, fast=False):
+    """Hashes of the designs already written to the sweep results in the same evaluation mode"""
+    design_hashes = set()
+    for path in _part_paths(out_dir):
+        if "fast" in pq.read_schema(path).names:
+            table = pq.read_table(path, columns=["design_hash", "fast"])
+            table = table.filter(pc.equal(table.column("fast"), fast))
+        elif fast:
+            continue
+        else:
+            table = pq.read_table(path, columns=["design_hash"])
+        design_hashes.update(table.column("design_hash").to_pylist())
+
+    return design_hashes
+
+
+def load_sweep_results(out_dir):
+    tables = [pq.read_table(path) for path in _part_paths(out_dir)]
+    if not tables:
+        return pa.table({})
+
+    return pa.concat_tables(tables, promote_options="default")
+
+
+def _write_part(out_dir, rows):
+    path = os.path.join(out_dir, f"part-{uuid4().hex}.parquet")
+    with atomic_path(path) as part_path:
+        pq.write_table(pa.Table.from_pylist(rows), part_path)
+
+    return path
+
+
+def get_sweep_executor(workers=CAD_WORKERS):
+    ## spawned workers don't inherit OCC state and threads of the caller
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def run_sweep(airfoil_catalog, designs, out_dir=SWEEP_RESULTS_DIR, workers=CAD_WORKERS, fast=False,
+              progress=None, executor=None):
+    """
+    Evaluate `designs` (flat parameter dicts) in the process pool and write results
+    to `out_dir` as Parquet part files, one per group of designs sharing the geometry.
+    In the `fast` mode designs are grouped by the cross-section instead.
+    Designs found in the existing part files are skipped, so interrupted sweeps can be resumed.
+    The pool of `workers` processes is started per sweep, unless the `executor` is passed
+    (see `get_sweep_executor`), e.g. to keep it across the optimizer rounds.
+    Returns the number of evaluated designs and errors of the failed ones (design hash -> message),
+    failed designs are not written, so they are retried by the next run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    done = completed_designs(out_dir, fast)
+    default_geom_params = get_default_geom_params(airfoil_catalog)
+
+    groups = {}
+    for design in designs:
+        geom_params, phys_params, dyn_params = split_design(design, default_geom_params)
+        design_hash = get_design_hash(geom_params, phys_params, dyn_params)
+        if design_hash in done:
+            continue
+
+        done.add(design_hash) ## duplicates within the sweep
+        group_hash = get_section_hash(geom_params) if fast else get_model_hash(geom_params)
+        groups.setdefault(group_hash, []).append((geom_params, phys_params, dyn_params))
+
+    if not groups:
+        return 0, {}
+
+    evaluated = 0
+    failed = {}
+
+    with nullcontext(executor) if executor is not None else get_sweep_executor(workers) as executor:
+        futures = {}
+        for group_hash, group in groups.items():
+            airfoil_data = {}
+            for geom_params, _, _ in group:
+                airfoil_group, airfoil_type = geom_params["airfoil_group"], geom_params["airfoil_type"]
+                airfoil_data.setdefault(airfoil_group, {}).update(
+                    airfoil_catalog.subset(airfoil_group, airfoil_type)[airfoil_group]
+                )
+            futures[executor.submit(_evaluate_designs, airfoil_data, group, fast)] = group_hash
+
+        for future in as_completed(futures):
+            group_hash = futures[future]
+            try:
+                rows = future.result()
+            except Exception as exc:
+                logger.error("Sweep of %s failed: %s", group_hash, exc)
+                for geom_params, phys_params, dyn_params in groups[group_hash]:
+                    failed[get_design_hash(geom_params, phys_params, dyn_params)] = f"{type(exc).__name__}: {exc}"
+                continue
+
+            _write_part(out_dir, rows)
+            evaluated += len(rows)
+            if progress:
+                progress(evaluated, group_hash)
+
+    return evaluated, failed
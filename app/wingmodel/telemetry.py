@@ -0,0 +1,237 @@
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .constants import *
+from .storage import atomic_path
+from .cache_manager import get_cache_manager
+from .design_cache import get_design_cache
+
+
+SPAN_BUCKETS = [0.001, 0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 120] ## [s]
+## monotonic cache stats, exported as counters (the rest are gauges)
+CACHE_COUNTERS = {"hits", "misses", "evictions", "memory_hits", "memory_misses"}
+
+_collected_spans = ContextVar("collected_spans", default=None)
+## spans are buffered (with the absolute log path, as the working directory may change until flush)
+## and appended to the log by the background thread of every process
+_pending_spans = []
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flush_thread = None
+
+logger = logging.getLogger(__name__)
+
+
+def _buffer_span(record):
+    global _flush_thread
+
+    log_path = os.path.abspath(SPANS_LOG_PATH)
+
+    with _pending_lock:
+        _pending_spans.append((log_path, record))
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(target=_flush_loop, name="spans-flush", daemon=True)
+            _flush_thread.start()
+            atexit.register(flush_spans)
+
+        if len(_pending_spans) > SPANS_BUFFER_MAX:
+            ## log is not writable, drop the oldest spans
+            del _pending_spans[:-SPANS_BUFFER_MAX]
+
+
+def flush_spans():
+    """Append the buffered spans to the log, rotating it once it exceeds SPANS_LOG_MAX_BYTES"""
+    with _flush_lock:
+        with _pending_lock:
+            pending = _pending_spans[:]
+
+        lines = {}
+        for log_path, record in pending:
+            lines.setdefault(log_path, []).append(json.dumps(record) + "\n")
+
+        for log_path, log_lines in lines.items():
+            _append_log(log_path, "".join(log_lines).encode())
+
+        with _pending_lock:
+            del _pending_spans[:len(pending)]
+
+
+def _append_log(log_path, data):
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+
+    ## single appends are not interleaved by concurrent writers (workers and sessions)
+    log_fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(log_fd, data)
+        log_stat = os.fstat(log_fd)
+    finally:
+        os.close(log_fd)
+
+    if log_stat.st_size > SPANS_LOG_MAX_BYTES:
+        try:
+            ## unless already rotated by another process
+            if os.stat(log_path).st_ino == log_stat.st_ino:
+                os.replace(log_path, f"{log_path}.1")
+        except FileNotFoundError:
+            pass
+
+
+def _flush_loop():
+    while True:
+        time.sleep(SPANS_FLUSH_INTERVAL_SECONDS)
+        try:
+            flush_spans()
+        except OSError:
+            logger.exception("Failed to log spans")
+
+
+@contextmanager
+def span(name, **tags):
+    """
+    Time the enclosed pipeline stage and log it as a JSON line (see `flush_spans`).
+    Yields tags dict, so that tags known only inside the stage (e.g. cache hit/miss) can be added.
+    """
+    if not TELEMETRY_ENABLED:
+        yield tags
+        return
+
+    start_time = time.time()
+    start = time.perf_counter()
+    try:
+        yield tags
+    except BaseException as exc:
+        tags["error"] = type(exc).__name__
+        raise
+    finally:
+        record = {
+            "ts": start_time,
+            "name": name,
+            "duration": time.perf_counter() - start,
+            "pid": os.getpid(),
+            **tags,
+        }
+
+        spans = _collected_spans.get()
+        if spans is not None:
+            spans.append(record)
+
+        _buffer_span(record)
+
+
+@contextmanager
+def collect_spans():
+    """Collect spans recorded in the current thread (e.g. during the app rerun)"""
+    spans = []
+    token = _collected_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _collected_spans.reset(token)
+
+
+class MetricsAggregator:
+    """
+    Aggregate spans logged by all processes into duration histograms
+    and write them in the Prometheus text format. The log is read incrementally,
+    the rest of the rotated log (see `flush_spans`) is read once the rotation is noticed.
+    """
+
+    def __init__(self, log_path=SPANS_LOG_PATH, metrics_path=METRICS_PATH):
+        self.log_path = log_path
+        self.metrics_path = metrics_path
+        self._offset = 0
+        self._histograms = {}
+
+    def update(self):
+        if not os.path.isfile(self.log_path):
+            return
+
+        if os.path.getsize(self.log_path) < self._offset:
+            rotated_path = f"{self.log_path}.1"
+            if os.path.isfile(rotated_path):
+                self._read_lines(rotated_path)
+            self._offset = 0
+
+        self._read_lines(self.log_path)
+
+    def _read_lines(self, log_path):
+        with open(log_path) as log_file:
+            log_file.seek(self._offset)
+            for line in log_file:
+                if not line.endswith("\n"):
+                    break ## incomplete line is read next time
+                self._offset += len(line.encode())
+                self._add(json.loads(line))
+
+    def _add(self, record):
+        key = (record["name"], record.get("cache", ""))
+        histogram = self._histograms.setdefault(key, {"buckets": [0]*len(SPAN_BUCKETS), "sum": 0.0, "count": 0})
+
+        for i, bucket in enumerate(SPAN_BUCKETS):
+            if record["duration"] <= bucket:
+                histogram["buckets"][i] += 1
+        histogram["sum"] += record["duration"]
+        histogram["count"] += 1
+
+    def render(self, cache_stats=None):
+        lines = [
+            "# HELP wingmodel_span_duration_seconds Duration of the wing model pipeline stages",
+            "# TYPE wingmodel_span_duration_seconds histogram",
+        ]
+        for (name, cache), histogram in sorted(self._histograms.items()):
+            labels = f'stage="{name}",cache="{cache}"'
+            for bucket, count in zip(SPAN_BUCKETS, histogram["buckets"]):
+                lines.append(f'wingmodel_span_duration_seconds_bucket{{{labels},le="{bucket}"}} {count}')
+            lines.append(f'wingmodel_span_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+            lines.append(f'wingmodel_span_duration_seconds_sum{{{labels}}} {histogram["sum"]}')
+            lines.append(f'wingmodel_span_duration_seconds_count{{{labels}}} {histogram["count"]}')
+
+        for name, value in (cache_stats or {}).items():
+            if name in CACHE_COUNTERS:
+                lines.append(f"# TYPE wingmodel_cache_{name}_total counter")
+                lines.append(f"wingmodel_cache_{name}_total {value}")
+            else:
+                lines.append(f"# TYPE wingmodel_cache_{name} gauge")
+                lines.append(f"wingmodel_cache_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, cache_stats=None):
+        os.makedirs(os.path.dirname(self.metrics_path), exist_ok=True)
+        with atomic_path(self.metrics_path) as metrics_path, open(metrics_path, "w") as metrics_file:
+            metrics_file.write(self.render(cache_stats))
+
+
+_metrics_thread = None
+_metrics_lock = threading.Lock()
+
+
+def _metrics_loop(aggregator):
+    while True:
+        try:
+            aggregator.update()
+            memory_stats = {f"memory_{name}": value for name, value in get_design_cache().stats().items()}
+            aggregator.write({**get_cache_manager().stats(), **memory_stats})
+        except Exception:
+            logger.exception("Metrics export failed")
+
+        time.sleep(METRICS_INTERVAL_SECONDS)
+
+
+def start_metrics_service():
+    """Start periodic export of the Prometheus metrics file in the background thread (once per process)"""
+    global _metrics_thread
+
+    with _metrics_lock:
+        if _metrics_thread is not None or not TELEMETRY_ENABLED:
+            return
+
+        _metrics_thread = threading.Thread(
+            target=_metrics_loop, args=(MetricsAggregator(),), name="metrics-export", daemon=True
+        )
+        _metrics_thread.start()
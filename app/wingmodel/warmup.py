@@ -0,0 +1,88 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .constants import *
+from .catalog import AirfoilCatalog, get_default_geom_params
+from .cache_manager import get_cache_manager
+from .props_store import get_props_store
+from .optimizer import design_params
+from .sweep import split_design
+from .wing_model import WingModelManager, get_model_hash
+
+logger = logging.getLogger(__name__)
+
+
+def popular_designs(limit):
+    """
+    One design per model of the `limit` most requested models, taken from the props store.
+    Other designs of the warmed up model are evaluated from its cached geometry on request.
+    """
+    props_store = get_props_store()
+    designs = []
+
+    for model_hash in get_cache_manager().most_requested(limit):
+        rows = props_store.query(model_hash=model_hash)
+        if not rows:
+            logger.warning("No properties of the requested model %s, skipping", model_hash)
+            continue
+
+        geom_params, phys_params, dyn_params = design_params(rows[0])
+        designs.append({**geom_params, **phys_params, **dyn_params})
+
+    return designs
+
+
+def _warm_model(airfoil_data, designs):
+    """Generate all artifacts of the model, then the properties of its other designs from the cached geometry"""
+    airfoil_catalog = AirfoilCatalog(airfoil_data)
+    render_type = {part: "shaded" for part in MODEL_COLORS}
+    colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+
+    for geom_params, phys_params, dyn_params in designs:
+        WingModelManager(
+            airfoil_catalog, geom_params, phys_params, dyn_params, render_type, colors, track_access=False
+        )
+
+    return len(designs)
+
+
+def warm_up(airfoil_catalog, designs, workers=CAD_WORKERS, pin=True, progress=None):
+    """
+    Generate geometry, STL, STEP and properties of `designs` (flat parameter dicts) in the process pool,
+    one task per model, and pin the models in cache so that they are never evicted.
+    Artifacts already in cache are not regenerated. Returns hashes of the warmed up models.
+    """
+    default_geom_params = get_default_geom_params(airfoil_catalog)
+    cache_manager = get_cache_manager()
+
+    models = {}
+    for design in designs:
+        geom_params, phys_params, dyn_params = split_design(design, default_geom_params)
+        models.setdefault(get_model_hash(geom_params), []).append((geom_params, phys_params, dyn_params))
+
+    warmed = []
+    mp_context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+        futures = {}
+        for model_hash, model_designs in models.items():
+            geom_params = model_designs[0][0]
+            airfoil_data = airfoil_catalog.subset(geom_params["airfoil_group"], geom_params["airfoil_type"])
+            futures[executor.submit(_warm_model, airfoil_data, model_designs)] = model_hash
+
+        for future in as_completed(futures):
+            model_hash = futures[future]
+            try:
+                future.result()
+            except Exception:
+                logger.exception("Warm-up of %s failed", model_hash)
+                continue
+
+            if pin:
+                cache_manager.pin(model_hash)
+            warmed.append(model_hash)
+            if progress:
+                progress(len(warmed), len(models), model_hash)
+
+    return warmed
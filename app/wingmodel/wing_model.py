@@ -1,95 +1,392 @@
+import re
 import math
-import csv
+import glob
 import json
-from dict_hash import sha256
+import hashlib
 from slugify import slugify
 
-import cadquery as cq
 import zipfile
-import pandas as pd
-
-from cquav.wing.airfoil import Airfoil
-from cquav.wing.profile import AirfoilSection
-from cquav.wing.rect_console import  RectangularWingConsole
-from cquav.materials import IsotropicMaterial, FluidProperties
+from concurrent.futures import as_completed
+import numpy as np
 
 from .constants import *
+from .artifacts import ArtifactNode, resolve_artifacts
+from .storage import model_lock, atomic_path, atomic_dir, is_complete_dir, list_complete_dir
+from .cache_manager import get_cache_manager
+from .design_cache import get_design_cache, get_design_key, check_missing_file
+from .props_store import get_props_store, props_to_csv
+from .polars import get_airfoil_polar
+from .telemetry import span
+
+
+MODEL_ARTIFACTS = ["geom", "props", "section_2d", "mesh", "mesh_fine", "stl", "stl_zip", "step"]
+## artifacts required to display the model, finer meshes are deferred
+PREVIEW_ARTIFACTS = ["geom", "props", "section_2d", "mesh"]
+VIEW_ARTIFACTS = PREVIEW_ARTIFACTS + ["mesh_fine"]
+## download files are produced on request only
+DOWNLOAD_ARTIFACTS = {
+    "stl": ["stl", "stl_zip"],
+    "step": ["step"],
+}
+
+
+def get_model_hash(geom_params):
+    hash_keys = [
+        slugify(geom_params["airfoil_type"]),
+        geom_params["chord"], 
+        geom_params["span"], 
+        geom_params["shell_thickness"],
+        str(int(geom_params["lattice"]))
+    ]
+
+    return "-".join(map(str, hash_keys))
+
+
+def get_params_hash(params):
+    """
+    SHA-256 of the flat parameters dict, equal to `dict_hash.sha256` used to key 
+    the existing cache. Unlike dict_hash, doesn't import pandas, scipy and pyarrow on first call.
+    """
+    data = {
+        f"str({key})": "None" if value is None else getattr(value, "item", lambda: value)()
+        for key, value in params.items()
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_mesh_lod_tolerances(chord, span):
+    """
+    Linear and angular tolerances of the preview mesh levels of detail (see MESH_LODS).
+    Linear tolerance scales with the console size, so that mesh size doesn't grow with chord and span.
+    """
+    size = math.sqrt(chord * span)
+    return [(rel_tolerance * size, angular_tolerance) for rel_tolerance, angular_tolerance in MESH_LODS]
+
+
+def get_section_hash(geom_params):
+    """Hash of the wing console cross-section, shared by models of any span"""
+    hash_keys = [
+        slugify(geom_params["airfoil_type"]),
+        geom_params["chord"], 
+        geom_params["shell_thickness"],
+        str(int(geom_params["lattice"]))
+    ]
+
+    return "-".join(map(str, hash_keys))
+
+
+def eval_bend_distribution(model_props, dists):
+    """
+    Cantilever beam under the uniform specific load, evaluated at span stations `dists` [mm]:
+    displacement [mm], slope [rad], bending moment [N*m] and shear force [N].
+    """
+    dists = np.asarray(dists, dtype=float)
+
+    Ixx = model_props["box_Ixx"] * (1e-3)**4 # [m^4]
+    span = model_props["span"] * 1e-3
+    load = model_props["specific_load"]
+    E = model_props["box_tensile_modulus"] * 1e9
+
+    d = dists * 1e-3 # [m]
+    nu = load * (2*span*d**3 - 3*(span**2)*(d**2) - (d**4)/2) / (12 * E * Ixx)
+    slope = load * d * (3*span**2 - 3*span*d + d**2) / (6 * E * Ixx)
+
+    return {
+        "dist": dists,
+        "displacement": -nu * 1e3, ## [mm]
+        "slope": slope,
+        "moment": load * (span - d)**2 / 2,
+        "shear": load * (span - d),
+    }
+
+
+def get_tip_deflection(model_props):
+    """Relative wing tip deflection"""
+    span = model_props["span"]
+    return float(eval_bend_distribution(model_props, [span])["displacement"][0]) / span
+
+
+def get_safety_factor(model_props):
+    return model_props["box_tensile_strength"] / (model_props["von_mises_stress"] * 1e-6)
+
+
+## bend force inputs and the angles of attack [deg] probing their cos and sin weights (see `eval_load_record`)
+BEND_FORCE_INPUTS = {"lift": (1.0, 0.0, 0.0), "drag": (0.0, 1.0, 0.0), "mass": (0.0, 0.0, 1.0)}
+BEND_COEFFICIENT_INPUTS = {"cl": (1.0, 0.0), "cd": (0.0, 1.0)}
+TRIG_PROBES = {"cos": 0.0, "sin": 90.0}
+
+
+def _eval_trig_weights(record, prefix, names, values, alpha):
+    """Sum of `record[prefix_offset_*]` and `values` weighted by `record[prefix_name_*]` cos and sin of `alpha` [deg]"""
+    alpha_rad = alpha * math.pi / 180
+    trig = {"cos": math.cos(alpha_rad), "sin": math.sin(alpha_rad)}
+
+    result = sum(record[f"{prefix}_offset_{basis}"] * trig[basis] for basis in trig)
+    for name, value in zip(names, values):
+        result += value * sum(record[f"{prefix}_{name}_{basis}"] * trig[basis] for basis in trig)
+
+    return result
+
+
+class RecordAirfoilSection:
+    def __init__(self, geom_record):
+        self.profile_max_height = geom_record["profile_height"]
+        self.reynolds_per_velocity = geom_record["reynolds_per_velocity"]
+
+    def eval_reynolds(self, fluid_props):
+        return self.reynolds_per_velocity * fluid_props.velocity
+
+
+class GeomRecordConsole:
+    """
+    Stand-in for the CAD model in the property evaluation, reproducing the console loads 
+    from the factors probed on the CAD model itself (see `WingModelManager.eval_load_record`):
+    lift and drag are proportional to dynamic pressure and the airfoil coefficients, 
+    bend force and coefficient are linear in their inputs with cos and sin of the angle of attack weights,
+    stresses are linear in the bend force.
+    """
+
+    def __init__(self, geom_record, airfoil):
+        self.geom_record = geom_record
+        self.airfoil = airfoil
+        self.chord = geom_record["chord"]
+        self.length = geom_record["length"]
+        self.airfoil_section = RecordAirfoilSection(geom_record)
+
+    def compute_lift_force(self, alpha, fluid_props, load_factor=1.0, compute_weight_load=False):
+        reynolds = self.airfoil_section.eval_reynolds(fluid_props)
+        cl = self.airfoil.eval_cl(alpha, reynolds)
+        lift_force = fluid_props.dynamic_pressure * cl * self.geom_record["lift_area"] * load_factor
+
+        return lift_force, self.geom_record["lift_force_arm"]
 
+    def compute_drag_force(self, alpha, fluid_props):
+        reynolds = self.airfoil_section.eval_reynolds(fluid_props)
+        cd = self.airfoil.eval_cd(alpha, reynolds)
+
+        return fluid_props.dynamic_pressure * cd * self.geom_record["drag_area"]
+
+    def compute_bend_force(self, alpha, lift_force, drag_force, total_mass):
+        return _eval_trig_weights(
+            self.geom_record, "bend_force", BEND_FORCE_INPUTS, (lift_force, drag_force, total_mass), alpha
+        )
+
+    def compute_bend_coefficient(self, alpha, cl, cd):
+        return _eval_trig_weights(self.geom_record, "bend_coef", BEND_COEFFICIENT_INPUTS, (cl, cd), alpha)
 
-def hex_to_rgb(hex_color):
-    h = hex_color.lstrip('#')
-    return [int(h[i:i+2], 16)/255 for i in (0, 2, 4)]
+    def get_max_bend_stress(self, bend_force):
+        return self.geom_record["unit_bend_stress"] * bend_force
+
+    def get_max_shear_stress(self, bend_force):
+        return self.geom_record["unit_shear_stress"] * bend_force
+
+
+class CadModelRequired(Exception):
+    """
+    Raised when some of the model artifacts are missing in cache, 
+    while CAD model generation is not allowed
+    """
+
+    def __init__(self, model_hash, props_hash):
+        super().__init__(f"CAD model required for wing-console-{model_hash}")
+        self.model_hash = model_hash
+        self.props_hash = props_hash
 
 
 class WingModelManager:
     """
     Interface for generating wing console CAD model, 
     caching and retreiving model and its properties from cache
+
+    CAD and export libraries (see `cad` and `exports` modules) are imported 
+    only when artifacts have to be built, so cache hits don't load OCC.
+
+    In the `fast` mode geometry record is derived from the cross-section record 
+    scaled to the console span (see `_cache_section_record`), and properties are 
+    evaluated without caching. CAD model is built only for STL and STEP artifacts.
+
+    Resolved designs are kept in memory (see `design_cache`), so the same parameters 
+    requested by any session again are served without touching the disk.
     """
 
-    def __init__(self, airfoils_data, geom_params, phys_params, dyn_params, render_type, colors):
-        self.airfoils_data = airfoils_data
+    def __init__(self, airfoil_catalog, geom_params, phys_params, dyn_params, render_type, colors,
+                 generate_cad=True, progress=None, artifacts=MODEL_ARTIFACTS, track_access=True, fast=False):
+        self.generate_cad = generate_cad
+        self.fast = fast
         self.input_params = {**geom_params, **phys_params, **dyn_params}
 
-        airfoil_group = geom_params["airfoil_group"]
-        airfoil_type = geom_params["airfoil_type"]
-        self.airfoil = Airfoil(self.airfoils_data[airfoil_group][airfoil_type])
+        self.airfoil_group = geom_params["airfoil_group"]
+        self.airfoil_type = geom_params["airfoil_type"]
+        self.airfoil_catalog = airfoil_catalog
+        self._fluid_props = None
 
-        velocity = dyn_params['velocity']
-        self.fluid_props = FluidProperties(AIR_DENSITY, velocity, AIR_KINEMATIC_VISCOSITY)
+        use_memory = USE_CACHED_RESULTS and not fast
+        design_key = get_design_key(self.input_params, render_type, colors, artifacts)
+        design = get_design_cache().get(design_key) if use_memory else None
 
-        hash_keys = [
-            slugify(geom_params["airfoil_type"]),
-            geom_params["chord"], 
-            geom_params["span"], 
-            geom_params["shell_thickness"],
-            str(int(geom_params["lattice"]))
-        ]
+        if design:
+            self.model_hash = design["model_hash"]
+            self.props_hash = design["props_hash"]
+            self.section_hash = design["section_hash"]
+        else:
+            self.model_hash = get_model_hash(geom_params)
+            self.props_hash = get_params_hash(self.input_params)
+            self.section_hash = get_section_hash(geom_params)
 
-        self.model_hash = "-".join(map(str, hash_keys))
         self.stl_path = os.path.join(STL_MODELS_DIR, f"wing-console-{self.model_hash}")
-        if not os.path.isdir(self.stl_path):
-            os.makedirs(self.stl_path)
-
-        if not os.path.isdir(CACHE_DIR):
-            os.makedirs(CACHE_DIR)
-
-        self.stl_zip_path = os.path.join(CACHE_DIR, f"wing-console-{self.model_hash}-stl.zip")
-        self.step_path = os.path.join(CACHE_DIR, f"wing-console-{self.model_hash}.step")
-        self.props_hash = sha256(self.input_params)
-        self.props_path = os.path.join(CACHE_DIR, f"wing-console-{self.model_hash}-{self.props_hash}.csv")
-
-        models_data = self.get_cached_stl_models(render_type, colors)
-        model_props = self.get_cached_props()
-        has_step_model = self.check_cached_step_model()
-
-        if not all([models_data, model_props, has_step_model]) or not USE_CACHED_RESULTS:
-            cad_model = self.generate_cad_model(geom_params)
-            geom_props = self.eval_geom_props(cad_model)
-            static_props = self.eval_static_props(cad_model)
-            dynamic_props = self.eval_dynamic_props(cad_model, static_props["total_mass"])
-            strength_props = self.eval_strength_props(cad_model, dynamic_props['bend_force'])
-            
-            models_data = self._cache_stl_models(cad_model, render_type, colors)
-            model_props = self._cache_model_props(geom_props, static_props, dynamic_props, strength_props)
-            self._cache_stl_zipfile(models_data)
-            self._cache_step_model(cad_model)
-
-        self.models_data = models_data
-        self.model_props = model_props
-
-    def _cache_model_props(self, geom_props, static_props, dynamic_props, strength_props):
-        model_props = {**self.input_params, **geom_props, **static_props, **dynamic_props, **strength_props}
-        with open(self.props_path, "w", newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=model_props.keys())
-            writer.writeheader()
-            writer.writerow(model_props)
+        ## download files are served from disk by the static file handler
+        self.stl_zip_path = os.path.join(STL_MODELS_DIR, f"wing-console-{self.model_hash}-stl.zip")
+        self.step_path = os.path.join(STL_MODELS_DIR, f"wing-console-{self.model_hash}.step")
+        self.geom_path = os.path.join(CACHE_DIR, f"wing-console-{self.model_hash}-geom.json")
+        self.root_section_path = os.path.join(CACHE_DIR, f"wing-console-{self.model_hash}-section.json")
+        self.props_csv_path = os.path.join(STL_MODELS_DIR, f"wing-console-{self.model_hash}-{self.props_hash}.csv")
+        self._bend_distributions = {}
+        self.section_path = os.path.join(CACHE_DIR, f"wing-section-{self.section_hash}.json")
+        self.mesh_lod_tolerances = get_mesh_lod_tolerances(geom_params["chord"], geom_params["span"])
+
+        ## key of the design entry kept in memory, files found later replace the entry (see `_is_cached_file`)
+        self._design_key = None
+        if design is None:
+            design = self._resolve_design(
+                geom_params, render_type, colors, progress, artifacts, track_access, fast
+            )
+            if use_memory:
+                get_design_cache().put(design_key, design)
+        elif track_access:
+            get_cache_manager().record_memory_hit(self.model_hash)
+
+        self._design = design
+        self._design_key = design_key if use_memory else None
+        self._cached_files = set(design["files"])
+        self.geom_record = design["geom_record"]
+        self.models_data = design["models_data"]
+        self.section_data = design["section_data"]
+        self.model_props = design["model_props"]
+
+    def _resolve_design(self, geom_params, render_type, colors, progress, artifacts, track_access, fast):
+        """Load the `artifacts` from the disk cache, building the missing ones"""
+        os.makedirs(STL_MODELS_DIR, exist_ok=True)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        ## files found on disk, checked once per design (see `_is_cached_file`)
+        self._cached_files = set()
+
+        nodes = {
+            "cad": ArtifactNode(lambda: self._require_cad_model(geom_params)),
+            "geom": ArtifactNode(self._cache_geom_record, self.get_cached_geom_record, inputs=["cad"]),
+            "section_2d": ArtifactNode(
+                lambda cad_model: self._cache_root_section(cad_model, render_type, colors),
+                lambda: self.get_cached_section_models(render_type, colors),
+                inputs=["cad"]
+            ),
+            "mesh": ArtifactNode(
+                lambda cad_model: self._cache_mesh_models(cad_model, render_type, colors),
+                lambda: self.get_cached_mesh_models(render_type, colors),
+                inputs=["cad"]
+            ),
+            "mesh_fine": ArtifactNode(self._cache_fine_meshes, self.check_cached_fine_meshes, inputs=["cad"]),
+            "stl": ArtifactNode(self._cache_stl_models, self.get_cached_stl_models, inputs=["cad"]),
+            "stl_zip": ArtifactNode(self._cache_stl_zipfile, self.check_cached_stl_zipfile, inputs=["stl"]),
+            "step": ArtifactNode(self._cache_step_model, self.check_cached_step_model, inputs=["cad"]),
+            "props": ArtifactNode(
+                lambda geom_record: self._cache_model_props(self.eval_model_props(geom_record)),
+                self.get_cached_props, inputs=["geom"]
+            ),
+        }
+
+        if fast:
+            nodes["section"] = ArtifactNode(
+                lambda: self._cache_section_record(geom_params), self.get_cached_section_record
+            )
+            nodes["geom"] = ArtifactNode(self.eval_fast_geom_record, inputs=["section"])
+            nodes["props"] = ArtifactNode(self.eval_model_props, inputs=["geom"])
+            ## model files are produced only for CAD artifacts
+            track_access = track_access and bool(set(artifacts) - {"geom", "props"})
+
+        nodes = {name: self._traced_node(name, node) for name, node in nodes.items()}
+        cache_manager = get_cache_manager()
+        built = []
+
+        def on_build(node_name):
+            built.append(node_name)
+            if progress:
+                progress(node_name)
+
+        try:
+            resolved = resolve_artifacts(
+                nodes, artifacts,
+                use_cache=USE_CACHED_RESULTS, on_build=on_build,
+                lock=model_lock(f"wing-console-{self.model_hash}") if self.generate_cad else None
+            )
+        except CadModelRequired:
+            if track_access:
+                cache_manager.record_access(self.model_hash, hit=False)
+            raise
+
+        if set(built) - {"section", "geom", "props"} or (built and not fast):
+            cache_manager.record_size(self.model_hash)
+        if track_access:
+            cache_manager.record_access(self.model_hash, hit=not built)
+
+        return {
+            "model_hash": self.model_hash,
+            "props_hash": self.props_hash,
+            "section_hash": self.section_hash,
+            "geom_record": resolved.get("geom"),
+            "models_data": resolved.get("mesh"),
+            "section_data": resolved.get("section_2d"),
+            "model_props": resolved.get("props"),
+            "files": frozenset(self._cached_files),
+        }
 
+    @property
+    def airfoil(self):
+        return self.airfoil_catalog.get_airfoil(self.airfoil_group, self.airfoil_type)
+
+    @property
+    def fluid_props(self):
+        if self._fluid_props is None:
+            from cquav.materials import FluidProperties
+            velocity = self.input_params['velocity']
+            self._fluid_props = FluidProperties(AIR_DENSITY, velocity, AIR_KINEMATIC_VISCOSITY)
+
+        return self._fluid_props
+
+    def _traced_node(self, name, node):
+        """Wrap node load and build into timing spans tagged with the model hash and cache hit/miss"""
+        def build(*inputs):
+            with span(f"build.{name}", model_hash=self.model_hash):
+                return node.build(*inputs)
+
+        def load():
+            with span(f"lookup.{name}", model_hash=self.model_hash) as tags:
+                value = node.load()
+                tags["cache"] = "hit" if value else "miss"
+            return value
+
+        return ArtifactNode(build, load if node.load else None, node.inputs)
+
+    def eval_model_props(self, geom_record, cad_model=None):
+        """
+        Model properties evaluated from the geometry record. 
+        With `cad_model`, masses, loads and stresses are computed by the CAD model itself (see `validate_geom_record`).
+        """
+        with span("props.geom", model_hash=self.model_hash):
+            geom_props = self.eval_geom_props(geom_record)
+        with span("props.static", model_hash=self.model_hash):
+            static_props = self.eval_static_props(geom_record, cad_model)
+        with span("props.dynamic", model_hash=self.model_hash):
+            dynamic_props = self.eval_dynamic_props(geom_record, static_props["total_mass"], cad_model)
+        with span("props.strength", model_hash=self.model_hash):
+            strength_props = self.eval_strength_props(geom_record, dynamic_props['bend_force'], cad_model)
+
+        return {**self.input_params, **geom_props, **static_props, **dynamic_props, **strength_props}
+
+    def _cache_model_props(self, model_props):
+        get_props_store().put(self.model_hash, self.props_hash, model_props)
         return model_props
 
-    def _cache_stl_models(self, cad_model, render_type, colors):
-        airfoil_body = cad_model.build_airfoil_body()
-        models = [
+    def get_stl_parts(self, cad_model):
+        return [
             { 
                 "model": cad_model.foam,
                 "name": f"foam__{self.model_hash}",
@@ -115,98 +412,351 @@ class WingModelManager:
                 "name": f"shell__{self.model_hash}",
                 "part": "shell",
             },
-            { 
-                "model": airfoil_body,
-                "name": f"airfoil__{self.model_hash}",
-                "part": "airfoil",
-            },
         ]
 
+    def _cache_root_section(self, cad_model, render_type, colors):
+        from .cad import extract_root_section
+
+        section = extract_root_section(self.get_stl_parts(cad_model), self.input_params["chord"])
+        with atomic_path(self.root_section_path) as section_path, open(section_path, "w") as section_file:
+            json.dump(section, section_file, separators=(",", ":"))
+
+        return self.get_cached_section_models(render_type, colors)
+
+    def get_cached_section_models(self, render_type, colors):
+        """Root section parts (see `cad.extract_root_section`) with display options for the 2D viewers"""
+        if not os.path.isfile(self.root_section_path):
+            return []
+
+        with open(self.root_section_path) as section_file:
+            section = json.load(section_file)
+
+        return [
+            {
+                **part,
+                "color": colors.get(part["part"]) or colors['shell'],
+                "rendr_type": render_type.get(part["part"], "shaded"),
+            }
+            for part in section
+        ]
+
+    def get_mesh_lod_path(self, lod):
+        return f"{self.stl_path}-lod{lod}"
+
+    def _export_mesh_lod(self, parts, lod):
+        """Export preview meshes of all parts at the level of detail `lod` in parallel"""
+        from .exports import get_export_executor, export_part_mesh
+
+        tolerance, angular_tolerance = self.mesh_lod_tolerances[lod]
+        executor = get_export_executor()
+
+        with atomic_dir(self.get_mesh_lod_path(lod)) as lod_path:
+            exports = [
+                executor.submit(
+                    export_part_mesh, part["shape"], os.path.join(lod_path, f'{part["name"]}{MESH_FILE_EXT}'),
+                    tolerance, angular_tolerance, lod=lod, model_hash=self.model_hash
+                )
+                for part in parts
+            ]
+            for export in exports:
+                export.result()
+
+    def _get_part_shapes(self, cad_model):
+        from .exports import as_shape
+        return [{**part, "shape": as_shape(part["model"])} for part in self.get_stl_parts(cad_model)]
+
+    def _cache_mesh_models(self, cad_model, render_type, colors):
+        """Export the coarsest preview meshes only, finer ones are exported afterwards (see `_cache_fine_meshes`)"""
+        self._export_mesh_lod(self._get_part_shapes(cad_model), 0)
+        return self.get_cached_mesh_models(render_type, colors)
+
+    def get_cached_mesh_models(self, render_type, colors):
+        """
+        Preview models data with mesh paths of all levels of detail from coarse to fine.
+        Finer meshes may be still missing, viewers load them once they are exported.
+        """
         models_data = []
-        for model in models:
-            stl_model_path = os.path.join(self.stl_path, f'{model["name"]}.stl')
-            cq.exporters.export(model['model'], stl_model_path, tolerance=1e-4)
+        lod_path = self.get_mesh_lod_path(0)
+
+        for file_name in sorted(list_complete_dir(lod_path)):
+            if not file_name.endswith(MESH_FILE_EXT):
+                continue
+
+            name = file_name[:-len(MESH_FILE_EXT)]
+            part_type = name.split("__")[0].split("_")[0]
             models_data.append(
                 {
-                    "path": stl_model_path, 
-                    "color": colors[model["part"]], 
-                    "name": model["name"],
-                    "rendr_type": render_type[model["part"]],
-                    "part": model["part"],
+                    "mesh_paths": [
+                        os.path.join(self.get_mesh_lod_path(lod), file_name) for lod in range(len(MESH_LODS))
+                    ],
+                    "color": colors.get(part_type) or colors['shell'], 
+                    "name": name,
+                    "rendr_type": render_type.get(part_type, "shaded"),
+                    "part": part_type
                 }
             )
 
         return models_data
 
-    def get_cached_stl_models(self, render_type, colors):
-        models_data = []
+    def _cache_fine_meshes(self, cad_model):
+        parts = self._get_part_shapes(cad_model)
+        for lod in range(1, len(MESH_LODS)):
+            self._export_mesh_lod(parts, lod)
 
-        if os.path.isdir(self.stl_path):
-            for part_name in os.listdir(self.stl_path):
-                part_type = part_name.split("__")[0].split("_")[0]
-                stl_model_path = os.path.join(self.stl_path, part_name)
-                models_data.append(
+        return True
+
+    def check_cached_fine_meshes(self):
+        return all(
+            self._is_cached_file(self.get_mesh_lod_path(lod), check=is_complete_dir) for lod in range(1, len(MESH_LODS))
+        )
+
+    def _cache_stl_models(self, cad_model):
+        """Export STL models for download at the fine tolerance, zipping them as soon as they are exported"""
+        from .exports import get_export_executor, export_part_stl
+
+        parts = [part for part in self._get_part_shapes(cad_model) if part["part"] != "airfoil"]
+        executor = get_export_executor()
+        stl_models = []
+
+        with atomic_dir(self.stl_path) as stl_path, atomic_path(self.stl_zip_path) as zip_path, \
+                zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zipf:
+            exports = {
+                executor.submit(
+                    export_part_stl, part["shape"], os.path.join(stl_path, f'{part["name"]}.stl'),
+                    model_hash=self.model_hash
+                ): part for part in parts
+            }
+
+            for export in as_completed(exports):
+                part = exports[export]
+                file_path = export.result()
+                zipf.write(file_path, os.path.basename(file_path))
+
+                stl_models.append(
                     {
-                        "path": stl_model_path, 
-                        "color": colors.get(part_type) or colors['shell'], 
-                        "name": part_name.split(".")[0],
-                        "rendr_type": render_type.get(part_type, "shaded"),
-                        "part": part_type
+                        "path": os.path.join(self.stl_path, os.path.basename(file_path)), 
+                        "name": part["name"],
+                        "part": part["part"],
                     }
                 )
+
+        return stl_models
+
+    def get_cached_stl_models(self):
+        stl_models = []
+
+        for part_name in list_complete_dir(self.stl_path):
+            if not part_name.endswith(".stl"):
+                continue
+
+            stl_models.append(
+                {
+                    "path": os.path.join(self.stl_path, part_name), 
+                    "name": part_name.split(".")[0],
+                    "part": part_name.split("__")[0].split("_")[0]
+                }
+            )
         
-        return models_data
+        return stl_models
+
+    def _require_cad_model(self, geom_params):
+        if not self.generate_cad:
+            raise CadModelRequired(self.model_hash, self.props_hash)
+
+        return self.generate_cad_model(geom_params)
 
     def generate_cad_model(self, geom_params):
-        chord = self.input_params["chord"]
-        span = self.input_params["span"]
-        shell_thickness = self.input_params["shell_thickness"]
-        lattice = self.input_params["lattice"]
-        airfoil_section = AirfoilSection(self.airfoil, chord=chord)
-        cad_model = RectangularWingConsole(airfoil_section, length=span,
-            min_length=SPAN_MIN, max_length=SPAN_MAX, min_chord=CHORD_MIN, max_chord=CHORD_MAX,
-            shell_thickness=shell_thickness, make_lattice=lattice
-        )
+        from .cad import build_wing_console
+        return build_wing_console(self.airfoil, geom_params)
+
+    def _cache_geom_record(self, cad_model):
+        geom_record = self.eval_geom_record(cad_model)
+
+        with atomic_path(self.geom_path) as geom_path, open(geom_path, "w") as geom_file:
+            json.dump(geom_record, geom_file)
 
-        return cad_model
+        return geom_record
+
+    def eval_geom_record(self, cad_model):
+        """
+        Extract everything the property evaluation needs from the CAD model,
+        so that material and flight condition changes don't require rebuilding it.
+        Masses and stresses are linear in density and bend force respectively,
+        hence volumes and stresses are stored for unit density and unit force.
+        """
+        from .cad import assign_unit_materials
 
-    def eval_geom_props(self, cad_model):
         Ixx, Iyy, Izz = cad_model.box_section.inertia_moments
+        assign_unit_materials(cad_model)
 
-        geom_props = {
-            "area": cad_model.length * cad_model.chord * 1e-6, # [m^2]
-            "aspect_ratio": cad_model.length / cad_model.chord,
+        geom_record = {
+            "version": GEOM_RECORD_VERSION,
+            "chord": cad_model.chord,
+            "length": cad_model.length,
             "shell_thickness": cad_model.shell_thickness,
             "box_thickness": cad_model.box_thickness,
             "profile_height": cad_model.airfoil_section.profile_max_height,
             "box_Ixx": Ixx,
             "box_Iyy": Iyy,
+            "box_Izz": Izz,
+            "box_volume": cad_model.get_box_mass(), # [m^3]
+            "foam_volume": cad_model.get_foam_mass(), # [m^3]
+            "shell_volume": cad_model.get_shell_mass(), # [m^3]
+            "unit_bend_stress": cad_model.get_max_bend_stress(1.0), # [Pa/N]
+            "unit_shear_stress": cad_model.get_max_shear_stress(1.0), # [Pa/N]
+            **self.eval_load_record(cad_model),
         }
 
-        return geom_props
+        return geom_record
 
-    def eval_static_props(self, cad_model):
-        shell_density = self.input_params["shell_density"]
-        foam_density = self.input_params["foam_density"]
-        box_density = self.input_params["box_density"]
-        box_tensile_strength = self.input_params["box_tensile_strength"]
-        box_tensile_modulus = self.input_params["box_tensile_modulus"]
-        
-        shell_material = IsotropicMaterial(shell_density)
-        foam_material = IsotropicMaterial(foam_density)
-        box_material = IsotropicMaterial(box_density, box_tensile_strength*1e6, box_tensile_modulus*1e9)
-
-        materials = {
-            "box": box_material, 
-            "shell": shell_material, 
-            "foam": foam_material
+    def eval_load_record(self, cad_model):
+        """
+        Factors of the console loads computed by cquav (see `GeomRecordConsole`), 
+        probed on the CAD model: Reynolds number per unit velocity, lift and drag per unit 
+        dynamic pressure and coefficient, and the cos and sin of the angle of attack weights 
+        of the bend force and bend coefficient inputs.
+        """
+        fluid_props = self.fluid_props
+        reynolds = cad_model.airfoil_section.eval_reynolds(fluid_props)
+        alpha = self.get_polar(reynolds).alpha_max_lift()
+
+        lift_force, lift_force_arm = cad_model.compute_lift_force(
+            alpha, fluid_props, load_factor=LOAD_FACTOR, compute_weight_load=False
+        )
+        drag_force = cad_model.compute_drag_force(alpha, fluid_props)
+        dynamic_pressure = fluid_props.dynamic_pressure
+
+        load_record = {
+            "reynolds_per_velocity": reynolds / fluid_props.velocity, # [s/m]
+            "lift_area": lift_force / (dynamic_pressure * self.airfoil.eval_cl(alpha, reynolds) * LOAD_FACTOR), # [m^2]
+            "drag_area": drag_force / (dynamic_pressure * self.airfoil.eval_cd(alpha, reynolds)), # [m^2]
+            "lift_force_arm": lift_force_arm,
         }
 
-        cad_model.assign_materials(materials)
+        probes = [
+            ("bend_force", BEND_FORCE_INPUTS, cad_model.compute_bend_force),
+            ("bend_coef", BEND_COEFFICIENT_INPUTS, cad_model.compute_bend_coefficient),
+        ]
+        for prefix, inputs, compute in probes:
+            zeros = [0.0] * len(inputs)
+            for basis, probe_alpha in TRIG_PROBES.items():
+                offset = compute(probe_alpha, *zeros)
+                load_record[f"{prefix}_offset_{basis}"] = offset
+                for name, values in inputs.items():
+                    load_record[f"{prefix}_{name}_{basis}"] = compute(probe_alpha, *values) - offset
+
+        return load_record
+
+    def get_cached_geom_record(self):
+        if not os.path.isfile(self.geom_path):
+            return
 
-        box_mass = cad_model.get_box_mass()
-        foam_mass = cad_model.get_foam_mass()
-        shell_mass = cad_model.get_shell_mass()
+        with open(self.geom_path) as geom_file:
+            geom_record = json.load(geom_file)
+
+        if geom_record.get("version") == GEOM_RECORD_VERSION:
+            return geom_record
+
+    def _cache_section_record(self, geom_params):
+        """
+        Console is a prismatic extrusion of its cross-section, so every geometry record value 
+        is affine in span: volumes, load arm and bend stress grow with it, while section 
+        dimensions and inertia moments stay constant (end caps contribute the intercept). 
+        Coefficients are fitted to the geometry records of two models with the cross-section:
+        cached records of any span are reused, and only the missing short reference models are built.
+        """
+        span_records = self._find_section_geom_records(geom_params)
+        spans = sorted(span_records)
+        spans = [spans[0], spans[-1]] if len(spans) > 1 else spans
+        spans += [span for span in SECTION_REFERENCE_SPANS if span not in spans][:2 - len(spans)]
+
+        for span in spans:
+            if span not in span_records:
+                span_records[span] = self._cache_reference_geom_record({**geom_params, "span": span})
+
+        (span_1, record_1), (span_2, record_2) = sorted((span, span_records[span]) for span in spans)
+        section_record = {}
+        for key, value_1 in record_1.items():
+            slope = (record_2[key] - value_1) / (span_2 - span_1)
+            section_record[key] = [value_1 - slope*span_1, slope] ## [intercept, slope per mm]
+
+        with atomic_path(self.section_path) as section_path, open(section_path, "w") as section_file:
+            json.dump(section_record, section_file)
+
+        return section_record
+
+    def _find_section_geom_records(self, geom_params):
+        """Cached geometry records of the models with the console cross-section by span"""
+        any_span_hash = get_model_hash({**geom_params, "span": "*"})
+        span_pattern = re.escape(any_span_hash).replace(r"\*", r"(\d+)")
+        path_pattern = re.compile(rf"wing-console-{span_pattern}-geom\.json$")
+        records = {}
+
+        for path in glob.glob(os.path.join(CACHE_DIR, f"wing-console-{any_span_hash}-geom.json")):
+            match = path_pattern.search(path)
+            if not match:
+                continue
+            with open(path) as geom_file:
+                geom_record = json.load(geom_file)
+            if geom_record.get("version") == GEOM_RECORD_VERSION:
+                records[int(match.group(1))] = geom_record
+
+        return records
+
+    def _cache_reference_geom_record(self, geom_params):
+        """Build the model of the cross-section and cache its geometry record for the models of that span"""
+        if not self.generate_cad:
+            raise CadModelRequired(self.model_hash, self.props_hash)
+
+        model_hash = get_model_hash(geom_params)
+        geom_record = self.eval_geom_record(self.generate_cad_model(geom_params))
+
+        geom_path = os.path.join(CACHE_DIR, f"wing-console-{model_hash}-geom.json")
+        with atomic_path(geom_path) as record_path, open(record_path, "w") as geom_file:
+            json.dump(geom_record, geom_file)
+        get_cache_manager().record_size(model_hash)
+
+        return geom_record
+
+    def get_cached_section_record(self):
+        if not os.path.isfile(self.section_path):
+            return
+
+        with open(self.section_path) as section_file:
+            section_record = json.load(section_file)
+
+        if section_record.get("version") == [GEOM_RECORD_VERSION, 0]:
+            return section_record
+
+    def eval_fast_geom_record(self, section_record):
+        span = self.input_params["span"]
+        return {key: intercept + slope*span for key, (intercept, slope) in section_record.items()}
+
+    def eval_geom_props(self, geom_record):
+        geom_props = {
+            "area": geom_record["length"] * geom_record["chord"] * 1e-6, # [m^2]
+            "aspect_ratio": geom_record["length"] / geom_record["chord"],
+            "shell_thickness": geom_record["shell_thickness"],
+            "box_thickness": geom_record["box_thickness"],
+            "profile_height": geom_record["profile_height"],
+            "box_Ixx": geom_record["box_Ixx"],
+            "box_Iyy": geom_record["box_Iyy"],
+        }
+
+        return geom_props
+
+    def eval_static_props(self, geom_record, cad_model=None):
+        if cad_model is None:
+            box_mass = self.input_params["box_density"] * geom_record["box_volume"]
+            foam_mass = self.input_params["foam_density"] * geom_record["foam_volume"]
+            shell_mass = self.input_params["shell_density"] * geom_record["shell_volume"]
+        else:
+            from .cad import assign_materials
+            assign_materials(cad_model, self.input_params)
+
+            box_mass = cad_model.get_box_mass()
+            foam_mass = cad_model.get_foam_mass()
+            shell_mass = cad_model.get_shell_mass()
 
         total_mass = box_mass + foam_mass + shell_mass
 
@@ -219,39 +769,39 @@ class WingModelManager:
 
         return static_props
 
-    def eval_dynamic_props(self, cad_model, total_mass):
-
-        velocity = self.input_params["velocity"]
+    def eval_dynamic_props(self, geom_record, total_mass, cad_model=None):
+        console = GeomRecordConsole(geom_record, self.airfoil) if cad_model is None else cad_model
 
-        reynolds = cad_model.airfoil_section.eval_reynolds(self.fluid_props)
+        reynolds = console.airfoil_section.eval_reynolds(self.fluid_props)
+        polar = self.get_polar(reynolds)
 
         if self.input_params["aoa_type"] == "Max Quality":
-            alpha = self.airfoil.alpha_optimal(reynolds)
+            alpha = polar.alpha_optimal()
         elif self.input_params["aoa_type"] == "Max Lift":
-            alpha = self.airfoil.alpha_max_lift(reynolds)
+            alpha = polar.alpha_max_lift()
         elif self.input_params["aoa_type"] == "Min Drag":
-            alpha = self.airfoil.alpha_min_drag(reynolds)
+            alpha = polar.alpha_min_drag()
         
         cl = self.airfoil.eval_cl(alpha, reynolds)
         cd = self.airfoil.eval_cd(alpha, reynolds)
         cm = self.airfoil.eval_cm(alpha, reynolds)
 
-        lift_force, lift_force_arm = cad_model.compute_lift_force(
+        lift_force, lift_force_arm = console.compute_lift_force(
             alpha, self.fluid_props, load_factor=LOAD_FACTOR, compute_weight_load=False
         )
-        center_of_pressure = (0.25*cad_model.chord, lift_force_arm)
-        drag_force = cad_model.compute_drag_force(alpha, self.fluid_props)
+        center_of_pressure = (0.25*console.chord, lift_force_arm)
+        drag_force = console.compute_drag_force(alpha, self.fluid_props)
 
-        bend_force = cad_model.compute_bend_force(alpha, lift_force, drag_force, total_mass)
+        bend_force = console.compute_bend_force(alpha, lift_force, drag_force, total_mass)
 
         console_weight = G * total_mass
         lift_to_weight = lift_force / console_weight
 
         alpha_rad = alpha * math.pi / 180
-        specific_weight = console_weight * math.cos(alpha_rad) * LOAD_FACTOR / (cad_model.length*1e-3)
+        specific_weight = console_weight * math.cos(alpha_rad) * LOAD_FACTOR / (console.length*1e-3)
 
-        cb = cad_model.compute_bend_coefficient(alpha, cl, cd)
-        specific_aerodynamic_load = self.fluid_props.dynamic_pressure * cb * (cad_model.chord*1e-3)
+        cb = console.compute_bend_coefficient(alpha, cl, cd)
+        specific_aerodynamic_load = self.fluid_props.dynamic_pressure * cb * (console.chord*1e-3)
 
         dynamic_props = {
             "alpha": alpha,
@@ -271,9 +821,15 @@ class WingModelManager:
 
         return dynamic_props
 
-    def eval_strength_props(self, cad_model, bend_force):
-        bend_stress = cad_model.get_max_bend_stress(bend_force)
-        shear_stress = cad_model.get_max_shear_stress(bend_force)
+    def get_polar(self, reynolds):
+        """Airfoil polar tabulated over POLAR_ALPHAS, shared by models with the same airfoil"""
+        return get_airfoil_polar(self.airfoil_catalog, self.airfoil_group, self.airfoil_type, reynolds)
+
+    def eval_strength_props(self, geom_record, bend_force, cad_model=None):
+        console = GeomRecordConsole(geom_record, self.airfoil) if cad_model is None else cad_model
+
+        bend_stress = console.get_max_bend_stress(bend_force)
+        shear_stress = console.get_max_shear_stress(bend_force)
         von_mises_stress = math.sqrt(bend_stress**2 + 3*shear_stress**2)
 
         strength_props = {
@@ -285,53 +841,139 @@ class WingModelManager:
         return strength_props
 
     def _cache_step_model(self, cad_model):
-        cq_color = lambda part: cq.Color(*hex_to_rgb(MODEL_COLORS[part]), 1)
+        from .cad import save_step_model
 
-        assy = cq.Assembly()
-        assy.add(cad_model.foam, name="foam", color=cq_color("foam"))
-        assy.add(cad_model.front_box, name="left_box", color=cq_color("box"))
-        assy.add(cad_model.central_box, name="central_box", color=cq_color("box"))
-        assy.add(cad_model.rear_box, name="right_box", color=cq_color("box"))
-        assy.add(cad_model.shell, name="shell", color=cq_color("shell"))
+        with atomic_path(self.step_path) as step_path:
+            save_step_model(cad_model, step_path)
 
-        assy.save(self.step_path)
+        return self.step_path
 
-    def _cache_stl_zipfile(self, models_data):
-        with zipfile.ZipFile(self.stl_zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zipf:
-            for model in models_data:
+    def _cache_stl_zipfile(self, stl_models):
+        with atomic_path(self.stl_zip_path) as zip_path, \
+                zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zipf:
+            for model in stl_models:
                 if model["part"] == "airfoil":
                     continue
                 file_path = model["path"]
                 zipf.write(file_path, os.path.basename(file_path))
 
+        return self.stl_zip_path
+
+    def check_cached_stl_zipfile(self):
+        return os.path.isfile(self.stl_zip_path)
+
     def check_cached_step_model(self):
         return os.path.isfile(self.step_path)
 
+    def get_download_path(self, kind):
+        """Path of the download file of `kind` (see DOWNLOAD_ARTIFACTS)"""
+        return {"stl": self.stl_zip_path, "step": self.step_path}[kind]
+
+    def check_cached_download(self, kind):
+        return self._is_cached_file(self.get_download_path(kind))
+
+    def _is_cached_file(self, path, check=os.path.isfile):
+        """
+        Check the file once per design kept in memory, files are removed only with the whole model 
+        (see `design_cache.forget_model`). Missing files of the design served from memory 
+        are checked again at most once per MISSING_FILE_RECHECK_SECONDS (see `design_cache.check_missing_file`).
+        """
+        if path in self._cached_files:
+            return True
+
+        found = check(path) if self._design_key is None else check_missing_file(path, check)
+        if found:
+            self._add_cached_file(path)
+
+        return found
+
+    def _add_cached_file(self, path):
+        self._cached_files.add(path)
+        if self._design_key is not None:
+            ## entries are immutable, so that the design cache accounts for the new size
+            self._design = {**self._design, "files": frozenset(self._cached_files)}
+            get_design_cache().put(self._design_key, self._design)
+
     def get_cached_props(self):
-        if not os.path.isfile(self.props_path):
-            return
+        return get_props_store().get(self.model_hash, self.props_hash)
 
-        df = pd.read_csv(self.props_path)
+    def get_props_csv(self):
+        return props_to_csv([self.model_props])
 
-        return df.to_dict(orient='records')[0]
+    def check_cached_props_csv(self):
+        return self._is_cached_file(self.props_csv_path)
 
-    def get_max_bend_displacement(self):
-        Ixx = self.model_props["box_Ixx"] * (1e-3)**4 # [m^4]
-        span = self.model_props["span"] * 1e-3
-        load = self.model_props["specific_load"]
-        E = self.model_props["box_tensile_modulus"] * 1e9
+    def cache_props_csv(self):
+        """Write the properties CSV for download once, returning its path"""
+        if not self.check_cached_props_csv():
+            with atomic_path(self.props_csv_path) as csv_path, open(csv_path, "w") as csv_file:
+                csv_file.write(self.get_props_csv())
+            self._add_cached_file(self.props_csv_path)
 
-        nu_max = (load * span**4) / (8 * E * Ixx )
-        
-        return nu_max * 1e3 ## [mm]
+        return self.props_csv_path
+
+    def get_bend_distribution(self, dists):
+        """Bend distribution of the console (see `eval_bend_distribution`) cached per stations array"""
+        dists = np.asarray(dists, dtype=float)
+        cache_key = dists.tobytes()
+        if cache_key in self._bend_distributions:
+            return self._bend_distributions[cache_key]
+
+        distribution = eval_bend_distribution(self.model_props, dists)
+        self._bend_distributions[cache_key] = distribution
+
+        return distribution
+
+    def get_max_bend_displacement(self):
+        span = self.model_props["span"]
+        return float(self.get_bend_distribution([span])["displacement"][0]) ## [mm]
 
     def get_bend_displacement(self, dist):
-        Ixx = self.model_props["box_Ixx"] * (1e-3)**4 # [m^4]
-        span = self.model_props["span"] * 1e-3
-        load = self.model_props["specific_load"]
-        E = self.model_props["box_tensile_modulus"] * 1e9
+        return float(self.get_bend_distribution([dist])["displacement"][0]) ## [mm]
 
-        d = dist * 1e-3 # [m]
-        nu = load * (2*span*d**3 - 3*(span**2)*(d**2) - (d**4)/2) / (12 * E * Ixx)
-        
-        return -nu * 1e3 ## [mm]
+
+def _relative_errors(expected_props, props, rtol):
+    """Relative errors of the numeric `props` against `expected_props` exceeding `rtol`"""
+    errors = {}
+    for key, expected in expected_props.items():
+        values = zip(expected, props[key]) if isinstance(expected, (tuple, list)) else [(expected, props[key])]
+        for expected_value, value in values:
+            if isinstance(expected_value, bool) or not isinstance(expected_value, (int, float)):
+                continue
+
+            error = abs(value - expected_value) / max(abs(expected_value), 1e-12)
+            if error > rtol:
+                errors[key] = max(error, errors.get(key, 0))
+
+    return errors
+
+
+def validate_geom_record(airfoil_catalog, geom_params, phys_params, dyn_params, rtol=GEOM_RECORD_RTOL):
+    """
+    Compare model properties evaluated from the geometry record against the properties 
+    computed by the CAD model itself, with real materials and cquav load methods.
+    Returns relative errors of the numeric properties exceeding `rtol` (empty if within tolerance).
+    """
+    wing_console = WingModelManager(
+        airfoil_catalog, geom_params, phys_params, dyn_params, {}, {}, artifacts=[], track_access=False
+    )
+    cad_model = wing_console.generate_cad_model(geom_params)
+    geom_record = wing_console.eval_geom_record(cad_model)
+
+    record_props = wing_console.eval_model_props(geom_record)
+    cad_props = wing_console.eval_model_props(geom_record, cad_model)
+
+    return _relative_errors(cad_props, record_props, rtol)
+
+
+def validate_fast_mode(airfoil_catalog, geom_params, phys_params, dyn_params, rtol=FAST_MODE_RTOL):
+    """
+    Compare model properties evaluated in the fast mode against the full CAD evaluation.
+    Returns relative errors of the numeric properties exceeding `rtol` (empty if within tolerance).
+    """
+    model_args = (airfoil_catalog, geom_params, phys_params, dyn_params, {}, {})
+    ## fast mode goes first, so that the cross-section isn't fitted to the model record itself
+    fast_props = WingModelManager(*model_args, artifacts=["props"], fast=True).model_props
+    full_props = WingModelManager(*model_args, artifacts=["props"], track_access=False).model_props
+
+    return _relative_errors(full_props, fast_props, rtol)
@@ -0,0 +1,223 @@
+"""
+Benchmarks of the wing model generation pipeline and the cache hit path.
+
+Every stage is timed separately for a small matrix of chords, spans and lattice on/off,
+using the airfoil data bundled with cq-uav (no network). Models are generated into
+a temporary working directory, so the app cache is neither used nor polluted.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_pipeline.py --out benchmarks/results/baseline.json
+    python benchmarks/bench_pipeline.py --quick --out current.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/baseline.json current.json
+
+Compare mode prints per-stage ratios and exits with code 1 if any stage
+is slower than the baseline by more than `--threshold`.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import itertools
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "app"))
+
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog, get_default_geom_params
+from wingmodel.exports import get_export_executor, as_shape, export_stl, export_mesh
+from wingmodel.polars import AirfoilPolar
+from wingmodel.wing_model import WingModelManager, eval_bend_distribution
+
+
+CHORDS = [150, 260]
+SPANS = [300, 900]
+LATTICE = [False, True]
+REPEATS = 20 ## repeats of the fast stages
+
+
+def _timed(func, repeats=1):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    stats = {"mean": statistics.mean(timings), "min": min(timings), "runs": repeats}
+    return result, stats
+
+
+def _bench_case(airfoil_catalog, geom_params, repeats):
+    render_type = {part: "shaded" for part in MODEL_COLORS}
+    colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+    ## no artifacts requested, so the manager doesn't run the pipeline
+    wing_console = WingModelManager(
+        airfoil_catalog, geom_params, PHYS_PARAMS_DEFAULT, DYN_PARAMS_DEFAULT, render_type, colors,
+        artifacts=[], track_access=False
+    )
+    results = {}
+
+    cad_model, results["generate_cad_model"] = _timed(lambda: wing_console.generate_cad_model(geom_params))
+    geom_record, results["eval_geom_record"] = _timed(lambda: wing_console.eval_geom_record(cad_model))
+
+    _, results["eval_geom_props"] = _timed(lambda: wing_console.eval_geom_props(geom_record), repeats)
+    static_props, results["eval_static_props"] = _timed(
+        lambda: wing_console.eval_static_props(geom_record), repeats
+    )
+    dynamic_props, results["eval_dynamic_props"] = _timed(
+        lambda: wing_console.eval_dynamic_props(geom_record, static_props["total_mass"]), repeats
+    )
+    _, results["eval_strength_props"] = _timed(
+        lambda: wing_console.eval_strength_props(geom_record, dynamic_props["bend_force"]), repeats
+    )
+
+    ## every part exported in this process, one by one
+    parts_dir = tempfile.mkdtemp(dir=os.getcwd())
+    for part in wing_console.get_stl_parts(cad_model):
+        name = part["name"].split("__")[0]
+        shape = as_shape(part["model"])
+        _, results[f"export_stl_{name}"] = _timed(
+            lambda: export_stl(shape, os.path.join(parts_dir, f"{name}.stl"))
+        )
+        for lod, (tolerance, angular_tolerance) in enumerate(wing_console.mesh_lod_tolerances):
+            _, results[f"export_mesh_lod{lod}_{name}"] = _timed(lambda: export_mesh(
+                shape, os.path.join(parts_dir, f"{name}-lod{lod}{MESH_FILE_EXT}"), tolerance, angular_tolerance
+            ))
+    shutil.rmtree(parts_dir)
+
+    _, results["cache_root_section"] = _timed(
+        lambda: wing_console._cache_root_section(cad_model, render_type, colors)
+    )
+    _, results["cache_mesh_models"] = _timed(
+        lambda: wing_console._cache_mesh_models(cad_model, render_type, colors)
+    )
+    _, results["cache_fine_meshes"] = _timed(lambda: wing_console._cache_fine_meshes(cad_model))
+    stl_models, results["cache_stl_models"] = _timed(lambda: wing_console._cache_stl_models(cad_model))
+    _, results["cache_stl_zipfile"] = _timed(lambda: wing_console._cache_stl_zipfile(stl_models))
+    _, results["cache_step_model"] = _timed(lambda: wing_console._cache_step_model(cad_model))
+
+    model_props = wing_console._cache_model_props(wing_console.eval_model_props(geom_record))
+    _, results["warm_cache"] = _timed(
+        lambda: (wing_console.get_cached_mesh_models(render_type, colors), wing_console.get_cached_props()),
+        repeats
+    )
+
+    ## data prep of the aerodynamics and structural mechanics tabs
+    _, results["aerodynamics_view_data"] = _timed(
+        lambda: AirfoilPolar(wing_console.airfoil, model_props["reynolds"]), repeats
+    )
+    dists = np.linspace(0, model_props["span"], BEND_STATIONS)
+    _, results["structmech_view_data"] = _timed(lambda: eval_bend_distribution(model_props, dists), repeats)
+
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(quick=False, repeats=REPEATS):
+    airfoil_catalog = get_airfoil_catalog()
+    default_geom_params = get_default_geom_params(airfoil_catalog)
+    matrix = [(CHORDS[-1], SPANS[-1], False)] if quick else list(itertools.product(CHORDS, SPANS, LATTICE))
+
+    work_dir = os.getcwd()
+    temp_dir = tempfile.mkdtemp(prefix="wing-bench-")
+    os.chdir(temp_dir)
+
+    try:
+        ## start export workers, so that the first case doesn't pay for it
+        executor = get_export_executor()
+        list(executor.map(abs, range(EXPORT_WORKERS)))
+
+        cases = {}
+        for chord, span, lattice in matrix:
+            case_name = f"chord={chord},span={span},lattice={int(lattice)}"
+            print(f"Benchmarking {case_name}..")
+            geom_params = {**default_geom_params, "chord": chord, "span": span, "lattice": lattice}
+            cases[case_name] = _bench_case(airfoil_catalog, geom_params, repeats)
+    finally:
+        os.chdir(work_dir)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": cases,
+    }
+
+
+def compare_results(baseline, current, threshold):
+    """Print ratios of mean stage timings, returning stages slower than `threshold`"""
+    regressions = []
+
+    for case_name, stages in current["cases"].items():
+        baseline_stages = baseline["cases"].get(case_name)
+        if baseline_stages is None:
+            continue
+
+        print(case_name)
+        for stage, stats in stages.items():
+            if stage not in baseline_stages:
+                continue
+
+            ratio = stats["mean"] / baseline_stages[stage]["mean"]
+            regressed = ratio > 1 + threshold
+            if regressed:
+                regressions.append((case_name, stage, ratio))
+
+            flag = "  REGRESSION" if regressed else ""
+            print(f"    {stage:<28} {1e3*baseline_stages[stage]['mean']:>10.2f} ms "
+                  f"-> {1e3*stats['mean']:>10.2f} ms  x{ratio:.2f}{flag}")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark wing model pipeline")
+    parser.add_argument("--out", help="JSON file to save results to")
+    parser.add_argument("--quick", action="store_true", help="benchmark a single case of the matrix")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="repeats of the fast stages")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as baseline_file, open(args.compare[1]) as current_file:
+            baseline, current = json.load(baseline_file), json.load(current_file)
+
+        regressions = compare_results(baseline, current, args.threshold)
+        return 1 if regressions else 0
+
+    results = run_benchmarks(quick=args.quick, repeats=args.repeats)
+    output = json.dumps(results, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as out_file:
+            out_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Load test of the Streamlit app with concurrent simulated sessions.
+
+Every session drives `app/app.py` with Streamlit's AppTest in its own thread of this
+process, so sessions share the model jobs pool, the in-memory design cache and
+the disk cache as they do on the server. Sessions replay interaction traces
+generated from the seed: slider drags (a rerun per intermediate value), material
+edits, tab switches (plain reruns, all tabs are rendered server-side) and
+download requests (waiting for the STL or STEP export).
+
+Reported are rerun latency percentiles per interaction, throughput, cache hit rate
+(disk index and in-memory tier), CPU utilization, peak RSS of the server process and peak total RSS of the model
+worker processes (all descendants of the server, sampled every RSS_SAMPLE_SECONDS
+from /proc, None where it isn't available).
+
+The app cache in `app/cache` and `app/static` is used as is: clear it (or keep it)
+to measure the cold (or warm) cache.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_sessions.py --sessions 8 --steps 20 --out benchmarks/results/sessions.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/sessions.json current.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import statistics
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(REPO_DIR, "app")
+sys.path.insert(0, APP_DIR)
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from wingmodel.constants import *
+from wingmodel.cache_manager import get_cache_manager
+from wingmodel.design_cache import get_design_cache
+from wingmodel.jobs import shutdown_jobs
+
+
+SESSIONS = 4
+STEPS = 20
+THINK_SECONDS = 0.5 ## mean pause between interactions
+RERUN_TIMEOUT_SECONDS = 600
+RSS_SAMPLE_SECONDS = 0.5
+## relative frequencies of the interactions after the first page load
+INTERACTIONS = {
+    "drag_chord": 3,
+    "drag_span": 3,
+    "edit_material": 2,
+    "switch_tab": 2,
+    "download": 1,
+}
+
+
+def make_trace(rng, steps):
+    """Interactions of a session: the page load followed by `steps` random interactions"""
+    names = list(INTERACTIONS)
+    weights = list(INTERACTIONS.values())
+    trace = [("open", None)]
+
+    for _ in range(steps):
+        name = rng.choices(names, weights)[0]
+        if name == "drag_chord":
+            trace.append((name, rng.randrange(CHORD_MIN, CHORD_MAX // 2, 5)))
+        elif name == "drag_span":
+            trace.append((name, rng.randrange(SPAN_MIN, SPAN_MAX // 2, 5)))
+        elif name == "edit_material":
+            trace.append((name, float(rng.choice([25, 50, 1500, 1600, 2700]))))
+        elif name == "download":
+            trace.append((name, rng.choice(["stl", "step"])))
+        else:
+            trace.append((name, None))
+
+    return trace
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+def _drag_values(start, target, step, max_values=6):
+    """Intermediate values sent while the slider is dragged, a few per drag as the frontend debounces"""
+    values = list(range(start, target, step if target > start else -step))[1:] + [target]
+    stride = max(1, len(values) // max_values)
+    return values[::-stride][::-1]
+
+
+class SimulatedSession:
+    def __init__(self, app_path, trace, think_seconds, rng):
+        self.app = AppTest.from_file(app_path, default_timeout=RERUN_TIMEOUT_SECONDS)
+        self.trace = trace
+        self.think_seconds = think_seconds
+        self.rng = rng
+        self.latencies = {}
+        self.errors = []
+
+    def _rerun(self, name, widget=None, value=None):
+        start = time.perf_counter()
+        if widget is None:
+            self.app.run()
+        else:
+            widget.set_value(value).run()
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        self.errors += [exc.value for exc in self.app.exception]
+
+    def _download(self, kind):
+        buttons = [button for button in self.app.button if button.key == f"prepare_{kind}"]
+        start = time.perf_counter()
+        if buttons:
+            ## the rerun waits for the export (see `finalize_model_view`)
+            buttons[0].click().run()
+        self.latencies.setdefault("download", []).append(time.perf_counter() - start)
+        self.errors += [exc.value for exc in self.app.exception]
+
+    def run(self):
+        for name, value in self.trace:
+            if name == "open":
+                self._rerun(name)
+            elif name in ("drag_chord", "drag_span"):
+                slider = _widget(self.app.slider, "Chord" if name == "drag_chord" else "Span")
+                for drag_value in _drag_values(slider.value, value, 5):
+                    self._rerun(name, _widget(self.app.slider, slider.label), drag_value)
+            elif name == "edit_material":
+                ## box density is the first of the material density inputs
+                self._rerun(name, _widget(self.app.number_input, "Density, [kg/m^3]"), value)
+            elif name == "download":
+                self._download(value)
+            else:
+                self._rerun(name)
+
+            time.sleep(self.rng.expovariate(1 / self.think_seconds) if self.think_seconds else 0)
+
+
+@contextmanager
+def _shared_runtime():
+    """
+    AppTest sets up the global runtime stand-in before every run and removes it afterwards,
+    which breaks runs of the other sessions in progress. Keep one stand-in for all of them instead.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    with patch.object(Runtime, "instance", return_value=runtime), patch.object(Runtime, "exists", return_value=True):
+        yield
+
+
+def _descendant_pids(pid):
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as children_file:
+            for child_pid in map(int, children_file.read().split()):
+                pids += [child_pid, *_descendant_pids(child_pid)]
+
+    return pids
+
+
+def _rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status_file:
+        for line in status_file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+    return 0
+
+
+def _workers_rss_kb():
+    """Total RSS of the worker processes (descendants of this process)"""
+    total = 0
+    for pid in _descendant_pids(os.getpid()):
+        try:
+            total += _rss_kb(pid)
+        except OSError:
+            pass ## exited meanwhile
+
+    return total
+
+
+@contextmanager
+def _sample_workers_rss():
+    """Yield dict with the peak total RSS of the worker processes [kB], None without /proc"""
+    peak = {"rss_kb": None}
+    if not os.path.isdir(f"/proc/{os.getpid()}/task"):
+        yield peak
+        return
+
+    stop = threading.Event()
+
+    def sample():
+        while True:
+            try:
+                peak["rss_kb"] = max(peak["rss_kb"] or 0, _workers_rss_kb())
+            except OSError:
+                pass ## process tree changed while it was listed
+            if stop.wait(RSS_SAMPLE_SECONDS):
+                break
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+    try:
+        yield peak
+    finally:
+        stop.set()
+        sampler.join()
+
+
+def _percentiles(timings):
+    stats = {"mean": statistics.mean(timings), "min": min(timings), "max": max(timings), "runs": len(timings)}
+    if len(timings) > 1:
+        quantiles = statistics.quantiles(timings, n=100, method="inclusive")
+        stats.update({"p50": quantiles[49], "p90": quantiles[89], "p99": quantiles[98]})
+    else:
+        stats.update({"p50": timings[0], "p90": timings[0], "p99": timings[0]})
+
+    return stats
+
+
+def _hit_rate(hits, misses):
+    return hits / (hits + misses) if hits + misses else None
+
+
+def run_benchmarks(n_sessions=SESSIONS, steps=STEPS, think_seconds=THINK_SECONDS, seed=0, app_path=None):
+    app_path = os.path.abspath(app_path or os.path.join(APP_DIR, "app.py"))
+    rng = random.Random(seed)
+    sessions = [
+        SimulatedSession(app_path, make_trace(rng, steps), think_seconds, random.Random(rng.random()))
+        for _ in range(n_sessions)
+    ]
+
+    ## the app reads its assets and cache relative to the repository root
+    work_dir = os.getcwd()
+    os.chdir(REPO_DIR)
+
+    cache_manager = get_cache_manager()
+    cache_before = cache_manager.stats()
+    memory_before = get_design_cache().stats()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    failures = []
+
+    def run_session(session):
+        try:
+            session.run()
+        except Exception as exc:
+            failures.append(exc)
+
+    try:
+        with _shared_runtime(), _sample_workers_rss() as workers_rss:
+            start = time.perf_counter()
+            threads = [threading.Thread(target=run_session, args=(session,)) for session in sessions]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - start
+
+        ## worker processes are accounted in children usage once they exit
+        shutdown_jobs()
+    finally:
+        os.chdir(work_dir)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cache_after = cache_manager.stats()
+    memory_after = get_design_cache().stats()
+
+    latencies = {}
+    for session in sessions:
+        for name, timings in session.latencies.items():
+            latencies.setdefault(name, []).extend(timings)
+    reruns = sum(len(timings) for timings in latencies.values())
+
+    cpu_seconds = (usage.ru_utime + usage.ru_stime - usage_before.ru_utime - usage_before.ru_stime
+                   + children_usage.ru_utime + children_usage.ru_stime)
+    disk_hits = cache_after["hits"] - cache_before["hits"]
+    disk_misses = cache_after["misses"] - cache_before["misses"]
+
+    summary = {
+        "sessions": n_sessions,
+        "duration": duration,
+        "reruns": reruns,
+        "throughput": reruns / duration, ## [reruns/s]
+        "errors": sum(len(session.errors) for session in sessions) + len(failures),
+        "cache_hit_rate": _hit_rate(disk_hits, disk_misses),
+        "memory_hit_rate": _hit_rate(
+            memory_after["hits"] - memory_before["hits"], memory_after["misses"] - memory_before["misses"]
+        ),
+        "evictions": cache_after["evictions"] - cache_before["evictions"],
+        "cpu_utilization": cpu_seconds / (duration * (os.cpu_count() or 1)),
+        ## ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "peak_worker_rss_mb": None if workers_rss["rss_kb"] is None else workers_rss["rss_kb"] / 1024,
+    }
+    for exc in failures:
+        print(f"Session failed: {exc!r}")
+    for error in sorted({error for session in sessions for error in session.errors}):
+        print(f"App exception: {error}")
+
+    ## imported afterwards, so that the pipeline benchmark modules don't count in the peak RSS
+    from bench_pipeline import _git_commit
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "steps": steps,
+            "think_seconds": think_seconds,
+        },
+        "cases": {
+            f"sessions={n_sessions}": {
+                name: _percentiles(timings) for name, timings in sorted(latencies.items())
+            },
+        },
+        "summary": summary,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the app with concurrent simulated sessions")
+    parser.add_argument("--out", help="JSON file to save results to")
+    parser.add_argument("--sessions", type=int, default=SESSIONS, help="number of concurrent sessions")
+    parser.add_argument("--steps", type=int, default=STEPS, help="interactions per session after the page load")
+    parser.add_argument("--think", type=float, default=THINK_SECONDS, help="mean pause between interactions [s]")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the interaction traces")
+    parser.add_argument("--app", help="app script (app/app.py by default)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        n_sessions=args.sessions, steps=args.steps, think_seconds=args.think, seed=args.seed, app_path=args.app
+    )
+    output = json.dumps(results, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as out_file:
+            out_file.write(output)
+    else:
+        print(output)
+
+    if results["summary"]["errors"]:
+        print(f"{results['summary']['errors']} errors in the simulated sessions")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
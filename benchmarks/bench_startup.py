@@ -0,0 +1,160 @@
+"""
+Benchmarks of the app startup and the cache hit rerun.
+
+Every probe runs in a fresh interpreter, so the import cost is measured as a new
+session (or a restarted server) pays it. The cache hit probe loads the preview
+artifacts, properties and airfoil polar (see `polars.POLARS_DIR`) of a model generated
+beforehand in a temporary working directory.
+Both probes report heavy modules (CadQuery, OCC, cq-uav, pyarrow, scipy) found
+loaded afterwards: a cache hit should never need them.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_startup.py --out benchmarks/results/startup.json
+    python benchmarks/bench_startup.py --check
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/startup.json current.json
+
+Check mode exits with code 1 if the cache hit probe loaded any heavy module.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(REPO_DIR, "app")
+sys.path.insert(0, APP_DIR)
+
+from bench_pipeline import _git_commit
+
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog, get_default_geom_params
+from wingmodel.wing_model import WingModelManager, PREVIEW_ARTIFACTS
+
+
+HEAVY_MODULES = ["cadquery", "OCP", "cquav", "pyarrow", "scipy"]
+REPEATS = 5
+
+_PROBE_HEADER = """
+import sys, json, time
+start = time.perf_counter()
+"""
+
+_PROBE_FOOTER = """
+duration = time.perf_counter() - start
+heavy = sorted({name.split(".")[0] for name in sys.modules} & set(HEAVY_MODULES))
+print(json.dumps({"duration": duration, "heavy_modules": heavy}))
+"""
+
+## modules imported by app.py and the views, without streamlit itself
+PROBES = {
+    "import_modules": """
+import wingmodel, wingmodel.catalog, wingmodel.jobs, wingmodel.optimizer, wingmodel.telemetry
+""",
+    "cache_hit_load": """
+from wingmodel.constants import *
+from wingmodel.catalog import get_airfoil_catalog
+from wingmodel.wing_model import WingModelManager, PREVIEW_ARTIFACTS
+
+render_type = {part: "shaded" for part in MODEL_COLORS}
+colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+wing_console = WingModelManager(
+    get_airfoil_catalog(), GEOM_PARAMS, PHYS_PARAMS_DEFAULT, DYN_PARAMS_DEFAULT, render_type, colors,
+    generate_cad=False, artifacts=PREVIEW_ARTIFACTS, track_access=False
+)
+wing_console.get_cached_props()
+wing_console.get_polar(wing_console.model_props["reynolds"])
+""",
+}
+
+
+def _run_probe(name, geom_params, work_dir):
+    code = (f"HEAVY_MODULES = {HEAVY_MODULES!r}\nGEOM_PARAMS = {geom_params!r}\n"
+            + _PROBE_HEADER + PROBES[name] + _PROBE_FOOTER)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [APP_DIR, os.environ.get("PYTHONPATH")]))}
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=work_dir, env=env, text=True)
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _bench_probe(name, geom_params, work_dir, repeats):
+    runs = [_run_probe(name, geom_params, work_dir) for _ in range(repeats)]
+    timings = [run["duration"] for run in runs]
+
+    return {
+        "mean": statistics.mean(timings),
+        "min": min(timings),
+        "runs": repeats,
+        "heavy_modules": sorted(set().union(*(run["heavy_modules"] for run in runs))),
+    }
+
+
+def run_benchmarks(repeats=REPEATS):
+    airfoil_catalog = get_airfoil_catalog()
+    geom_params = get_default_geom_params(airfoil_catalog)
+
+    work_dir = os.getcwd()
+    temp_dir = tempfile.mkdtemp(prefix="wing-bench-")
+    os.chdir(temp_dir)
+
+    try:
+        print("Generating model for the cache hit probe..")
+        render_type = {part: "shaded" for part in MODEL_COLORS}
+        colors = {**MODEL_COLORS, "airfoil": MODEL_COLORS["shell"]}
+        WingModelManager(
+            airfoil_catalog, geom_params, PHYS_PARAMS_DEFAULT, DYN_PARAMS_DEFAULT, render_type, colors,
+            artifacts=PREVIEW_ARTIFACTS, track_access=False
+        )
+
+        stages = {}
+        for name in PROBES:
+            print(f"Benchmarking {name}..")
+            stages[name] = _bench_probe(name, geom_params, temp_dir, repeats)
+    finally:
+        os.chdir(work_dir)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": {"startup": stages},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark app startup and cache hit rerun")
+    parser.add_argument("--out", help="JSON file to save results to")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="fresh interpreter runs of each probe")
+    parser.add_argument("--check", action="store_true", help="fail if the cache hit loads heavy modules")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeats=args.repeats)
+    output = json.dumps(results, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as out_file:
+            out_file.write(output)
+    else:
+        print(output)
+
+    heavy_modules = results["cases"]["startup"]["cache_hit_load"]["heavy_modules"]
+    if heavy_modules:
+        print(f"Cache hit loaded heavy modules: {', '.join(heavy_modules)}")
+        if args.check:
+            return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+( function () {
+
+	/**
+ * Description: A THREE loader for compact binary wing meshes (.wmsh.gz) exported by the wing model manager.
+ *
+ * Format (little-endian, gzip-compressed):
+ *  - header: magic "WMSH", uint32 version, uint32 vertex count, uint32 index count,
+ *    float32[3] bounding box min, float32[3] bounding box max;
+ *  - uint16[3] vertex positions quantized within the bounding box;
+ *  - padding to 4 bytes;
+ *  - triangle indices, uint16 if vertex count fits into it, otherwise uint32.
+ *
+ * The loader returns an indexed buffer geometry with normals recomputed from faces.
+ * Levels of detail exported in background are loaded with `loadLevels`, polling the missing ones.
+ *
+ * Usage:
+ *  const loader = new THREE.WingMeshLoader();
+ *  loader.loadAsync( './models/part.wmsh.gz' ).then( ( geometry ) => {
+ *    scene.add( new THREE.Mesh( geometry ) );
+ *  });
+ */
+
+	const HEADER_SIZE = 40;
+	const QUANTIZATION_STEPS = 0xFFFF;
+	const LEVEL_RETRY_INTERVAL = 2000; // [ms]
+	const LEVEL_MAX_RETRIES = 300;
+
+	class WingMeshLoader extends THREE.Loader {
+
+		constructor( manager ) {
+
+			super( manager );
+
+		}
+
+		load( url, onLoad, onProgress, onError ) {
+
+			const scope = this;
+			const loader = new THREE.FileLoader( this.manager );
+			loader.setPath( this.path );
+			loader.setResponseType( 'arraybuffer' );
+			loader.setRequestHeader( this.requestHeader );
+			loader.setWithCredentials( this.withCredentials );
+			loader.load( url, function ( data ) {
+
+				scope.decompress( data ).then( ( buffer ) => {
+
+					onLoad( scope.parse( buffer ) );
+
+				} ).catch( ( e ) => {
+
+					if ( onError ) {
+
+						onError( e );
+
+					} else {
+
+						console.error( e );
+
+					}
+
+					scope.manager.itemError( url );
+
+				} );
+
+			}, onProgress, onError );
+
+		}
+
+		loadLevels( urls, onLevel, isActive ) {
+
+			// levels are loaded from coarse to fine, each one waits until it is exported
+			const scope = this;
+			let level = 0;
+			let retries = 0;
+
+			function next() {
+
+				if ( level >= urls.length || ! isActive() ) return;
+
+				scope.loadAsync( urls[ level ] ).then( ( geometry ) => {
+
+					if ( ! isActive() ) return;
+
+					onLevel( geometry, level );
+					level ++;
+					retries = 0;
+					next();
+
+				} ).catch( () => {
+
+					if ( ++ retries < LEVEL_MAX_RETRIES ) setTimeout( next, LEVEL_RETRY_INTERVAL );
+
+				} );
+
+			}
+
+			next();
+
+		}
+
+		decompress( data ) {
+
+			const bytes = new Uint8Array( data, 0, 2 );
+
+			// the response may be already decoded if it was served with gzip content encoding
+			if ( bytes[ 0 ] !== 0x1f || bytes[ 1 ] !== 0x8b ) {
+
+				return Promise.resolve( data );
+
+			}
+
+			const stream = new Blob( [ data ] ).stream().pipeThrough( new DecompressionStream( 'gzip' ) );
+			return new Response( stream ).arrayBuffer();
+
+		}
+
+		parse( data ) {
+
+			const reader = new DataView( data );
+			const magic = String.fromCharCode( ...new Uint8Array( data, 0, 4 ) );
+
+			if ( magic !== 'WMSH' ) {
+
+				throw new Error( 'THREE.WingMeshLoader: Unknown mesh format.' );
+
+			}
+
+			const vertexCount = reader.getUint32( 8, true );
+			const indexCount = reader.getUint32( 12, true );
+			const min = [ 0, 1, 2 ].map( ( i ) => reader.getFloat32( 16 + i * 4, true ) );
+			const max = [ 0, 1, 2 ].map( ( i ) => reader.getFloat32( 28 + i * 4, true ) );
+			const range = [ 0, 1, 2 ].map( ( i ) => ( max[ i ] - min[ i ] ) / QUANTIZATION_STEPS );
+
+			const quantized = new Uint16Array( data, HEADER_SIZE, vertexCount * 3 );
+			const positions = new Float32Array( vertexCount * 3 );
+
+			for ( let i = 0; i < positions.length; i ++ ) {
+
+				positions[ i ] = min[ i % 3 ] + quantized[ i ] * range[ i % 3 ];
+
+			}
+
+			let offset = HEADER_SIZE + quantized.byteLength;
+			offset += ( 4 - offset % 4 ) % 4;
+
+			const indices = vertexCount <= 0xFFFF ?
+				new Uint16Array( data, offset, indexCount ) :
+				new Uint32Array( data, offset, indexCount );
+
+			const geometry = new THREE.BufferGeometry();
+			geometry.setAttribute( 'position', new THREE.BufferAttribute( positions, 3 ) );
+			geometry.setIndex( new THREE.BufferAttribute( indices, 1 ) );
+			geometry.computeVertexNormals();
+
+			return geometry;
+
+		}
+
+	}
+
+	THREE.WingMeshLoader = WingMeshLoader;
+
+} )();
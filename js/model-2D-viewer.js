@@ -4,23 +4,23 @@ var frustumSize = 400;
 THREE.Cache.enabled = false;
 
 
+// section faces are flat, so they are drawn unlit and from both sides
 function get_material(color, render_type) {
 
   let materials = {
-    "shaded": new THREE.MeshPhongMaterial({
+    "shaded": new THREE.MeshBasicMaterial({
       color: color,
-      specular: 1,
-      shininess: 10,
+      side: THREE.DoubleSide,
     }),
-    "transparent": new THREE.MeshPhongMaterial({
+    "transparent": new THREE.MeshBasicMaterial({
       color: color,
-      specular: 1,
-      shininess: 10,
+      side: THREE.DoubleSide,
       transparent: true,
       opacity: 0.5
     }),
     "wireframe": new THREE.MeshBasicMaterial({
       color: color,
+      side: THREE.DoubleSide,
       wireframe: true, 
       wireframeLinewidth: 40 
     })
@@ -30,6 +30,23 @@ function get_material(color, render_type) {
 
 }
 
+// root section part: flat vertices [x0, y0, x1, y1, ...] and triangle indices
+function section_geometry(model) {
+    let vertices = model["vertices"];
+    let positions = new Float32Array(vertices.length / 2 * 3);
+
+    for (let i = 0; i < vertices.length / 2; i++) {
+        positions[3*i] = vertices[2*i];
+        positions[3*i + 1] = vertices[2*i + 1];
+    }
+
+    let geometry = new THREE.BufferGeometry();
+    geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3));
+    geometry.setIndex(model["triangles"]);
+
+    return geometry;
+}
+
 function onWindowResize() {
     let aspect = container.clientWidth / container.clientHeight;
 
@@ -59,8 +76,8 @@ class STLViewer extends HTMLElement {
 
     shadowRoot.appendChild(container);
 
-    const models = {__MODELS__};
-    const alpha = {__ALPHA__};
+    const models = this.models;
+    const alpha = this.alpha;
 
     renderer = new THREE.WebGLRenderer({ antialias: true, alpha: true });
     renderer.setSize(container.clientWidth, container.clientHeight);
@@ -70,69 +87,43 @@ class STLViewer extends HTMLElement {
     scene.add(new THREE.HemisphereLight(0xffffff,0x222222,0.8));
     scene.add(new THREE.AmbientLight(0x404040));
 
-    let loader = new THREE.STLLoader();
-    
-    async function loadModels() {
+    function loadModels() {
 
-        let meshes = [],
-            lines = [],
-            bbox = {
-                "xmin": 0, "xmax": 0,
-                "ymin": 0, "ymax": 0,
-                "zmin": 0, "zmax": 0
-            };
+        let bbox = new THREE.Box3();
 
         for (let i in models) {
-            await loader.loadAsync(models[i]["path"]).then(( geometry ) => {
-                if (models[i]["rendr_type"] === "hidden") { return; }
-
-                let material = get_material(models[i]["color"], models[i]["rendr_type"]);
-                let mesh = new THREE.Mesh(geometry, material);
-                mesh.rotation.x = -Math.PI/2
-                mesh.rotation.z = -Math.PI * alpha / 180;
-                scene.add(mesh);
-                meshes.push(mesh);
-
-                let edges = new THREE.EdgesGeometry(geometry, 29); 
-                let line = new THREE.LineSegments(edges, new THREE.LineBasicMaterial( { color: "#555555" } ) ); 
-                line.rotation.x = -Math.PI/2
-                line.rotation.z = -Math.PI * alpha / 180;
-                scene.add(line);
-                lines.push(line);
-
-                geometry.computeBoundingBox();
-
-                bbox.xmin = Math.min(geometry.boundingBox.min.x, bbox.xmin);
-                bbox.xmax = Math.max(geometry.boundingBox.max.x, bbox.xmax);
-
-                bbox.ymin = Math.min(geometry.boundingBox.min.y, bbox.ymin);
-                bbox.ymax = Math.max(geometry.boundingBox.max.y, bbox.ymax);
-
-                bbox.zmin = Math.min(geometry.boundingBox.min.z, bbox.zmin);
-                bbox.zmax = Math.max(geometry.boundingBox.max.z, bbox.zmax);
-            });
-        }
+            if (models[i]["rendr_type"] === "hidden") { continue; }
 
-        bbox.center = new THREE.Vector3(
-            (bbox.xmin + bbox.xmax) / 2.0,
-            (bbox.ymin + bbox.ymax) / 2.0,
-            (bbox.zmin + bbox.zmax) / 2.0,
-        )
+            let geometry = section_geometry(models[i]);
+            let material = get_material(models[i]["color"], models[i]["rendr_type"]);
+            let mesh = new THREE.Mesh(geometry, material);
+            mesh.rotation.z = -Math.PI * alpha / 180;
+            scene.add(mesh);
 
-        bbox.xsize = bbox.xmax - bbox.xmin,
-        bbox.ysize = bbox.ymax - bbox.ymin,
-        bbox.zsize = bbox.zmax - bbox.zmin;
+            let edges = new THREE.EdgesGeometry(geometry, 29); 
+            let line = new THREE.LineSegments(edges, new THREE.LineBasicMaterial( { color: "#555555" } ) ); 
+            line.rotation.z = -Math.PI * alpha / 180;
+            scene.add(line);
 
-        // shift all objects to the common center
-        for (let i in meshes) {
-            meshes[i].geometry.applyMatrix4(new THREE.Matrix4().makeTranslation(-bbox.center.x, -bbox.center.y, -bbox.center.z));
-            lines[i].geometry.applyMatrix4(new THREE.Matrix4().makeTranslation(-bbox.center.x, -bbox.center.y, -bbox.center.z));
+            geometry.computeBoundingBox();
+            bbox.union(geometry.boundingBox);
         }
 
-        return bbox;
+        // shift all objects to the common center
+        let center = bbox.getCenter(new THREE.Vector3());
+        scene.traverse((object) => {
+            if (object.geometry) {
+                object.geometry.translate(-center.x, -center.y, 0);
+            }
+        });
+
+        let size = bbox.getSize(new THREE.Vector3());
+        return Promise.resolve({ "xsize": size.x, "ysize": size.y, "zsize": size.z });
     }
 
     loadModels().then((bbox) => {
+        if (!viewer.connected) { return; }
+
         let bbox_max_size = Math.max(bbox.ysize, bbox.xsize, bbox.zsize);
 
         // scene.add(new THREE.GridHelper(1000, 160, "#DCDCDC", "#DCDCDC"));
@@ -148,9 +139,10 @@ class STLViewer extends HTMLElement {
             0.1, Math.max(bbox.ysize, bbox.xsize, bbox.zsize)*4
         );
     
+        // section lies in the XY plane, chord along X
         camera.position.x = 0;
-        camera.position.y = bbox_max_size*1.2;
-        camera.position.z = 0;
+        camera.position.y = 0;
+        camera.position.z = bbox_max_size*1.2 + 1;
     
         let controls = new THREE.OrbitControls(camera, renderer.domElement);
         controls.enableZoom = true;
@@ -173,6 +165,9 @@ class STLViewer extends HTMLElement {
 
   disconnectedCallback() {
     this.connected = false;
+    // release WebGL context of the replaced viewer
+    renderer.dispose();
+    renderer.forceContextLoss();
   }
 }
 
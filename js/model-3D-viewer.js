@@ -30,6 +30,13 @@ function get_material(color, render_type) {
 
 }
 
+function replace_geometry(mesh, line, geometry) {
+    mesh.geometry.dispose();
+    mesh.geometry = geometry;
+    line.geometry.dispose();
+    line.geometry = new THREE.EdgesGeometry(geometry, 29);
+}
+
 function onWindowResize() {
     renderer.setSize(container.clientWidth, container.clientHeight);
     camera.aspect = container.clientWidth / container.clientHeight;
@@ -53,7 +60,7 @@ class STLViewer extends HTMLElement {
 
     shadowRoot.appendChild(container);
 
-    const models = {__MODELS__};
+    const models = this.models;
 
     renderer = new THREE.WebGLRenderer({ antialias: true, alpha: true });
     renderer.setSize(container.clientWidth, container.clientHeight);
@@ -63,7 +70,8 @@ class STLViewer extends HTMLElement {
     scene.add(new THREE.HemisphereLight(0xffffff,0x222222,0.8));
     scene.add(new THREE.AmbientLight(0x404040));
 
-    let loader = new THREE.STLLoader();
+    let stlLoader = new THREE.STLLoader();
+    let meshLoader = new THREE.WingMeshLoader();
     
     async function loadModels() {
 
@@ -76,11 +84,19 @@ class STLViewer extends HTMLElement {
             };
 
         for (let i in models) {
-            await loader.loadAsync(models[i]["path"]).then(( geometry ) => {
+            // compact meshes are preferred for preview, coarse level of detail is shown first
+            let mesh_paths = models[i]["mesh_paths"];
+            let loader = mesh_paths ? meshLoader : stlLoader;
+            let model_path = mesh_paths ? mesh_paths[0] : models[i]["path"];
+
+            await loader.loadAsync(model_path).then(( geometry ) => {
+                // viewer may be replaced while models are loading
+                if (!viewer.connected) { return; }
                 if (models[i]["rendr_type"] === "hidden") { return; }
 
                 let material = get_material(models[i]["color"], models[i]["rendr_type"]);
                 let mesh = new THREE.Mesh(geometry, material);
+                mesh.userData.finer_paths = mesh_paths ? mesh_paths.slice(1) : [];
                 scene.add(mesh);
                 meshes.push(mesh);
 
@@ -118,10 +134,20 @@ class STLViewer extends HTMLElement {
             lines[i].geometry.applyMatrix4(new THREE.Matrix4().makeTranslation(-bbox.center.x, -bbox.center.y, -bbox.center.z));
         }
 
+        // finer levels of detail replace the coarse meshes once they are exported
+        for (let i in meshes) {
+            meshLoader.loadLevels(meshes[i].userData.finer_paths, ( geometry ) => {
+                geometry.applyMatrix4(new THREE.Matrix4().makeTranslation(-bbox.center.x, -bbox.center.y, -bbox.center.z));
+                replace_geometry(meshes[i], lines[i], geometry);
+            }, () => viewer.connected);
+        }
+
         return bbox;
     }
 
     loadModels().then((bbox) => {
+        if (!viewer.connected) { return; }
+
         let bbox_max_size = Math.max(bbox.ysize, bbox.xsize, bbox.zsize);
 
         camera = new THREE.PerspectiveCamera(
@@ -156,6 +182,9 @@ class STLViewer extends HTMLElement {
 
   disconnectedCallback() {
     this.connected = false;
+    // release WebGL context of the replaced viewer
+    renderer.dispose();
+    renderer.forceContextLoss();
   }
 }
 
@@ -0,0 +1,60 @@
+( function () {
+
+  // Streamlit component wrapping model viewers. Libraries are loaded once per iframe
+  // and cached by the browser, while reruns only send the models manifest as component args.
+
+  let currentArgs = null;
+  let viewerScript = null;
+
+  function sendMessage(type, data) {
+    window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, data), "*");
+  }
+
+  function loadScript(src) {
+    return new Promise((resolve, reject) => {
+      let script = document.createElement("script");
+      script.src = src;
+      script.onload = resolve;
+      script.onerror = reject;
+      document.head.appendChild(script);
+    });
+  }
+
+  // model paths are relative to the app url, not to the component iframe
+  function resolveUrl(path) {
+    let streamlitUrl = new URLSearchParams(window.location.search).get("streamlitUrl");
+    return new URL(path, streamlitUrl || window.location.href).href;
+  }
+
+  function render(args) {
+    let argsKey = JSON.stringify(args);
+    if (argsKey === currentArgs) { return; }
+    currentArgs = argsKey;
+
+    sendMessage("streamlit:setFrameHeight", { height: args.height });
+
+    // both viewers define the same globals, so only one of them is loaded into the iframe
+    if (!viewerScript) {
+      viewerScript = loadScript(`model-${args.viewer}-viewer.js`);
+    }
+
+    viewerScript.then(() => {
+      let viewer = document.createElement("stl-viewer");
+      viewer.models = args.models.map((model) => Object.assign({}, model, {
+        path: model.path ? resolveUrl(model.path) : null,
+        mesh_paths: model.mesh_paths ? model.mesh_paths.map(resolveUrl) : null,
+      }));
+      viewer.alpha = args.alpha;
+      document.body.replaceChildren(viewer);
+    });
+  }
+
+  window.addEventListener("message", (event) => {
+    if (event.data.type === "streamlit:render") {
+      render(event.data.args);
+    }
+  });
+
+  sendMessage("streamlit:componentReady", { apiVersion: 1 });
+
+} )();
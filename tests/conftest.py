@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_DIR, "app"))
+## spans are not logged by the tests (see `telemetry.span`), also in spawned workers
+os.environ["WINGMODEL_TELEMETRY"] = "0"
+
+from wingmodel.constants import *
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """The app keeps its cache relative to the working directory, run every test in a fresh one"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def airfoil_catalog():
+    pytest.importorskip("cadquery")
+    pytest.importorskip("cquav")
+    from wingmodel.catalog import get_airfoil_catalog
+    return get_airfoil_catalog()
+
+
+@pytest.fixture
+def design_params(airfoil_catalog):
+    """Build geometry, material and flight parameters of a design from the defaults and overrides"""
+    from wingmodel.catalog import get_default_geom_params
+
+    def make_params(**overrides):
+        geom_params = get_default_geom_params(airfoil_catalog)
+        phys_params = dict(PHYS_PARAMS_DEFAULT)
+        dyn_params = dict(DYN_PARAMS_DEFAULT)
+        for params in (geom_params, phys_params, dyn_params):
+            params.update({key: value for key, value in overrides.items() if key in params})
+
+        return geom_params, phys_params, dyn_params
+
+    return make_params
@@ -0,0 +1,48 @@
+from wingmodel.artifacts import ArtifactNode, resolve_artifacts
+
+
+def _pipeline(cache, calls):
+    """cad -> geom -> props and cad -> mesh, `cache` holds the loaded artifacts"""
+    def node(name, inputs=(), cached=True):
+        def build(*values):
+            calls.append(name)
+            return f"{name}({', '.join(values)})"
+
+        return ArtifactNode(build, (lambda: cache.get(name)) if cached else None, inputs=inputs)
+
+    return {
+        "cad": node("cad", cached=False),
+        "geom": node("geom", ["cad"]),
+        "props": node("props", ["geom"]),
+        "mesh": node("mesh", ["cad"]),
+    }
+
+
+def test_builds_dependencies_once_in_order():
+    calls, built = [], []
+    resolved = resolve_artifacts(_pipeline({}, calls), ["props", "mesh"], on_build=built.append)
+
+    assert calls == ["cad", "geom", "props", "mesh"]
+    assert built == calls
+    assert resolved == {"props": "props(geom(cad()))", "mesh": "mesh(cad())"}
+
+
+def test_cached_artifacts_skip_their_dependencies():
+    calls = []
+    cache = {"geom": "geom-cached", "props": "props-cached"}
+    resolved = resolve_artifacts(_pipeline(cache, calls), ["props", "mesh"])
+
+    assert calls == ["cad", "mesh"]
+    assert resolved == {"props": "props-cached", "mesh": "mesh(cad())"}
+
+    calls.clear()
+    resolved = resolve_artifacts(_pipeline(cache, calls), ["props"])
+    assert calls == [] and resolved == {"props": "props-cached"}
+
+
+def test_use_cache_false_rebuilds_everything():
+    calls = []
+    cache = {"geom": "geom-cached", "props": "props-cached"}
+    resolve_artifacts(_pipeline(cache, calls), ["props"], use_cache=False)
+
+    assert calls == ["cad", "geom", "props"]
@@ -0,0 +1,66 @@
+import os
+import shutil
+
+from wingmodel.constants import *
+from wingmodel.cache_manager import CacheManager, _model_paths
+
+MODEL_HASH = "naca-2412-260-900-1-0"
+PROPS_HASH = "0" * 64
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as cache_file:
+        cache_file.write(b"\0" * size)
+
+
+def _cache_model(model_hash, size=100):
+    _write(os.path.join(STL_MODELS_DIR, f"wing-console-{model_hash}-lod0", "shell__x.wmsh.gz"), size)
+    _write(os.path.join(STL_MODELS_DIR, f"wing-console-{model_hash}.step"), size)
+    _write(os.path.join(STL_MODELS_DIR, f"wing-console-{model_hash}-{PROPS_HASH}.csv"), size)
+    _write(os.path.join(CACHE_DIR, f"wing-console-{model_hash}-geom.json"), size)
+
+
+def test_record_size_counts_only_model_files():
+    _cache_model(MODEL_HASH)
+    ## same prefix, different model
+    _cache_model(f"{MODEL_HASH}-1", size=1000)
+    cache_manager = CacheManager(max_bytes=10**6)
+
+    cache_manager.record_size(MODEL_HASH)
+
+    assert len(_model_paths(MODEL_HASH)) == 4
+    assert cache_manager.stats()["total_bytes"] == 400
+
+
+def test_eviction_keeps_request_counts_and_removes_sections():
+    _cache_model(MODEL_HASH)
+    _write(os.path.join(CACHE_DIR, "wing-section-naca-2412-260-1-0.json"), 100)
+    cache_manager = CacheManager(max_bytes=0)
+    for _ in range(3):
+        cache_manager.record_access(MODEL_HASH, hit=True)
+
+    cache_manager.evict()
+
+    assert _model_paths(MODEL_HASH) == []
+    assert not os.path.exists(os.path.join(CACHE_DIR, "wing-section-naca-2412-260-1-0.json"))
+    assert cache_manager.most_requested(10) == [MODEL_HASH]
+    stats = cache_manager.stats()
+    assert (stats["models"], stats["total_bytes"], stats["evictions"]) == (0, 0, 2)
+
+
+def test_reconcile_keeps_request_counts_of_removed_models():
+    _cache_model(MODEL_HASH)
+    cache_manager = CacheManager(max_bytes=10**6)
+    cache_manager.record_access(MODEL_HASH, hit=False)
+    cache_manager.record_size(MODEL_HASH)
+    for path in _model_paths(MODEL_HASH):
+        if os.path.isfile(path):
+            os.remove(path)
+        else:
+            shutil.rmtree(path)
+
+    cache_manager.evict()
+
+    assert cache_manager.most_requested(10) == [MODEL_HASH]
+    assert cache_manager.stats()["models"] == 0
@@ -0,0 +1,36 @@
+import os
+
+from wingmodel import design_cache
+from wingmodel.design_cache import check_missing_file, forget_missing_files
+from wingmodel.lru import LRUCache
+
+MODEL_HASH = "naca-2412-260-900-1-0"
+
+
+def test_missing_files_are_rechecked_after_interval_or_job(monkeypatch):
+    monkeypatch.setattr(design_cache, "_missing_files", LRUCache(8))
+    now = [100.0]
+    monkeypatch.setattr(design_cache.time, "monotonic", lambda: now[0])
+    checks = []
+
+    def check(path):
+        checks.append(path)
+        return os.path.isfile(path)
+
+    path = f"wing-console-{MODEL_HASH}.step"
+    assert not check_missing_file(path, check)
+    assert not check_missing_file(path, check)
+    assert len(checks) == 1
+
+    open(path, "w").close()
+    assert not check_missing_file(path, check)
+    now[0] += design_cache.MISSING_FILE_RECHECK_SECONDS
+    assert check_missing_file(path, check)
+    assert len(checks) == 2
+
+    os.remove(path)
+    assert not check_missing_file(path, check)
+    open(path, "w").close()
+    forget_missing_files(MODEL_HASH)
+    assert check_missing_file(path, check)
+    assert len(checks) == 4
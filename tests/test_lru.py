@@ -0,0 +1,44 @@
+from wingmodel.lru import LRUCache
+
+
+def _size(value):
+    return len(value)
+
+
+def test_evicts_least_recently_used_items():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (3, 1)
+
+
+def test_byte_accounting_and_eviction():
+    cache = LRUCache(10, max_bytes=10, sizeof=_size)
+    cache.put("a", "x" * 4)
+    cache.put("b", "x" * 4)
+    assert cache.nbytes == 8
+
+    ## replacing an item accounts only for its new size
+    cache.put("a", "x" * 2)
+    assert cache.nbytes == 6
+
+    ## "b" is the least recently used one now
+    cache.put("c", "x" * 6)
+    assert cache.get("b") is None
+    assert cache.nbytes == 8 and len(cache) == 2
+
+    cache.discard_if(lambda key, value: key == "a")
+    assert cache.nbytes == 6 and cache.stats()["items"] == 1
+
+
+def test_item_larger_than_budget_is_not_kept():
+    cache = LRUCache(10, max_bytes=10, sizeof=_size)
+    cache.put("a", "x" * 4)
+    cache.put("b", "x" * 20)
+
+    assert len(cache) == 0 and cache.nbytes == 0
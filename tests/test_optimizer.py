@@ -0,0 +1,22 @@
+from wingmodel.constants import *
+from wingmodel.optimizer import pareto_front
+
+
+def _design(name, total_mass, excess_lift):
+    return {"name": name, "total_mass": total_mass, "lift_force": excess_lift + G * total_mass}
+
+
+def test_pareto_front():
+    designs = [
+        _design("light", 1.0, 5.0),
+        _design("dominated", 1.5, 4.0),
+        _design("heavy", 2.0, 20.0),
+        _design("same mass, less lift", 2.0, 10.0),
+        _design("medium", 1.5, 12.0),
+        _design("no gain", 3.0, 20.0),
+    ]
+
+    front = pareto_front(designs)
+
+    assert [design["name"] for design in front] == ["light", "medium", "heavy"]
+    assert pareto_front([]) == []
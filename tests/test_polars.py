@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from wingmodel import polars
+from wingmodel.lru import LRUCache
+
+
+class ParabolicAirfoil:
+    def eval_cl(self, alpha, reynolds):
+        return 0.1 * np.asarray(alpha) + 0.2
+
+    def eval_cd(self, alpha, reynolds):
+        return 0.01 + 1e-4 * np.asarray(alpha)**2
+
+    def eval_cm(self, alpha, reynolds):
+        return -0.05 + 0 * np.asarray(alpha)
+
+
+class CountingCatalog:
+    def __init__(self):
+        self.loaded = 0
+
+    def get_airfoil(self, airfoil_group, airfoil_type):
+        self.loaded += 1
+        return ParabolicAirfoil()
+
+
+@pytest.fixture(autouse=True)
+def polars_cache(monkeypatch):
+    monkeypatch.setattr(polars, "_polars_cache", LRUCache(8))
+
+
+def test_polar_is_loaded_from_disk_without_airfoil(monkeypatch):
+    catalog = CountingCatalog()
+    polar = polars.get_airfoil_polar(catalog, "NACA", "NACA 2412", 123456.7)
+    assert catalog.loaded == 1
+    assert polar.reynolds == 123000.0
+
+    ## new process: empty memory cache
+    monkeypatch.setattr(polars, "_polars_cache", LRUCache(8))
+    loaded = polars.get_airfoil_polar(catalog, "NACA", "NACA 2412", 123456.7)
+
+    assert catalog.loaded == 1
+    assert loaded is not polar and loaded.reynolds == polar.reynolds
+    for name in ["alpha", "cl", "cd", "cm", "cl_to_cd"]:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(polar, name))
+    assert loaded.alpha_optimal() == polar.alpha_optimal()
+    assert loaded.alpha_min_drag() == pytest.approx(0)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from wingmodel.props_store import PropsStore, PROPS_COLUMNS
+
+MODEL_HASH = "naca-2412-260-900-1-0"
+
+
+def _model_props(**overrides):
+    model_props = {
+        "airfoil_group": "NACA",
+        "airfoil_type": "NACA 2412",
+        "chord": np.int64(260),
+        "span": 900,
+        "shell_thickness": 1.0,
+        "lattice": np.bool_(False),
+        "total_mass": np.float64(1.25),
+        "cl": np.array(0.5),
+        "center_of_pressure": np.array([65.0, 12.5]),
+        "mesh_vertices": 1000,
+    }
+    return {**model_props, **overrides}
+
+
+def test_put_get_round_trip():
+    props_store = PropsStore()
+    props_store.put(MODEL_HASH, "a", _model_props())
+
+    model_props = props_store.get(MODEL_HASH, "a")
+
+    assert set(PROPS_COLUMNS) <= set(model_props)
+    assert model_props["chord"] == 260 and type(model_props["chord"]) is int
+    assert model_props["shell_thickness"] == 1 and type(model_props["shell_thickness"]) is int
+    assert model_props["lattice"] is False
+    assert model_props["total_mass"] == 1.25 and type(model_props["total_mass"]) is float
+    assert model_props["cl"] == 0.5 and type(model_props["cl"]) is float
+    assert model_props["center_of_pressure"] == (65.0, 12.5)
+    ## properties without a column are kept in the extra JSON
+    assert model_props["mesh_vertices"] == 1000
+    assert model_props["area"] is None
+    assert props_store.get(MODEL_HASH, "b") is None
+
+
+def test_query_and_delete():
+    props_store = PropsStore()
+    props_store.put(MODEL_HASH, "a", _model_props())
+    props_store.put(MODEL_HASH, "b", _model_props(shell_thickness=3, center_of_pressure=(70, 10)))
+    props_store.put("other", "a", _model_props(airfoil_type="NACA 0012"))
+
+    rows = props_store.query(model_hash=MODEL_HASH, shell_thickness=3)
+    assert [(row["props_hash"], row["center_of_pressure"]) for row in rows] == [("b", (70.0, 10.0))]
+    assert len(props_store.query(airfoil_type="NACA 0012")) == 1
+
+    props_store.delete(MODEL_HASH)
+    assert props_store.query(model_hash=MODEL_HASH) == []
+    assert props_store.get("other", "a") is not None
@@ -0,0 +1,81 @@
+from concurrent.futures import Future
+from http import HTTPStatus
+
+import pytest
+
+from wingmodel import service
+from wingmodel.catalog import AirfoilCatalog
+from wingmodel.service import ModelService, ApiError
+from wingmodel.wing_model import CadModelRequired
+
+CATALOG = AirfoilCatalog({"NACA": {"NACA 2412": {}}})
+
+
+@pytest.mark.parametrize("design", [
+    {"chord": 260.5},
+    {"span": 10},
+    {"lattice": "yes"},
+    {"lattice": 1},
+    {"aoa_type": "Max Speed"},
+    {"velocity": 0},
+    {"velocity": "fast"},
+    {"box_density": True},
+    {"shell_density": 1e6},
+    {"airfoil_type": "NACA 0012"},
+    {"unknown": 1},
+])
+def test_invalid_designs_are_rejected(design):
+    with pytest.raises(ApiError) as exc_info:
+        ModelService(CATALOG)._parse_design(design)
+
+    assert exc_info.value.status == HTTPStatus.BAD_REQUEST
+
+
+def test_numbers_are_parsed_as_floats():
+    _, phys_params, dyn_params = ModelService(CATALOG)._parse_design({"velocity": 35, "foam_density": 30})
+
+    assert dyn_params["velocity"] == 35.0 and type(dyn_params["velocity"]) is float
+    assert type(phys_params["foam_density"]) is float
+
+
+@pytest.fixture
+def model_jobs(monkeypatch):
+    """Model jobs submitted by the service, with futures completed by the test"""
+    jobs, released = [], []
+
+    class FakeModelJob:
+        def __init__(self):
+            self.future = Future()
+
+    def submit_model_job(key, *args, **kwargs):
+        jobs.append(FakeModelJob())
+        return jobs[-1]
+
+    def load_cached(self, api_job):
+        raise CadModelRequired(api_job.model_hash, api_job.job_id)
+
+    monkeypatch.setattr(service, "submit_model_job", submit_model_job)
+    monkeypatch.setattr(service, "release_job", lambda key, subscriber: released.append(key))
+    monkeypatch.setattr(ModelService, "_load_cached", load_cached)
+
+    return jobs, released
+
+
+def test_cancelled_job_is_not_shared_with_new_requests(model_jobs):
+    jobs, released = model_jobs
+    model_service = ModelService(CATALOG)
+
+    api_job = model_service.submit({})
+    assert model_service.submit({}) is api_job
+
+    model_service.cancel(api_job.job_id)
+    assert model_service.status(api_job)["status"] == "cancelled"
+    assert released == [api_job.job_id]
+
+    new_job = model_service.submit({})
+    assert new_job is not api_job and len(jobs) == 2
+
+    ## the cancelled job stops later, without releasing the new one
+    jobs[0].future.set_result(None)
+    assert released == [api_job.job_id]
+    assert model_service.stats()["active_jobs"] == 1
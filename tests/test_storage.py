@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from wingmodel.constants import *
+from wingmodel.storage import atomic_dir, atomic_path, list_complete_dir
+
+
+def test_atomic_dir_replaces_complete_dir(work_dir):
+    path = os.path.join(work_dir, "model")
+    for name in ["old.stl", "new.stl"]:
+        with atomic_dir(path) as temp_dir:
+            assert list_complete_dir(path) == ([] if name == "old.stl" else ["old.stl"])
+            open(os.path.join(temp_dir, name), "w").close()
+
+    assert list_complete_dir(path) == ["new.stl"]
+    assert os.listdir(work_dir) == ["model"]
+
+
+def test_atomic_dir_keeps_previous_dir_on_failure(work_dir):
+    path = os.path.join(work_dir, "model")
+    with atomic_dir(path) as temp_dir:
+        open(os.path.join(temp_dir, "old.stl"), "w").close()
+
+    with pytest.raises(RuntimeError), atomic_dir(path) as temp_dir:
+        open(os.path.join(temp_dir, "new.stl"), "w").close()
+        raise RuntimeError("export failed")
+
+    assert list_complete_dir(path) == ["old.stl"]
+    assert os.listdir(work_dir) == ["model"]
+
+
+def test_list_complete_dir_skips_incomplete_and_missing(work_dir):
+    os.makedirs("partial")
+    open(os.path.join("partial", "part.stl"), "w").close()
+
+    assert list_complete_dir("partial") == []
+    assert list_complete_dir("missing") == []
+
+
+def test_atomic_path(work_dir):
+    with atomic_path("props.csv") as temp_path:
+        with open(temp_path, "w") as csv_file:
+            csv_file.write("mass\n1.0\n")
+        assert not os.path.exists("props.csv")
+
+    with open("props.csv") as csv_file:
+        assert csv_file.read() == "mass\n1.0\n"
+    assert os.listdir(work_dir) == ["props.csv"]
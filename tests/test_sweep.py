@@ -0,0 +1,71 @@
+import pytest
+
+import sweep as sweep_cli
+from wingmodel import sweep
+from wingmodel.catalog import AirfoilCatalog
+from wingmodel.exports import InProcessExecutor
+from wingmodel.sweep import run_sweep, completed_designs, split_design, get_design_hash
+
+CATALOG = AirfoilCatalog({"NACA": {"NACA 2412": {}}})
+FAILING_CHORD = 200
+
+
+class FakeWingModel:
+    """Model manager evaluating designs without CAD, failing for FAILING_CHORD"""
+
+    def __init__(self, airfoil_catalog, geom_params, phys_params, dyn_params, *args, fast=False, **kwargs):
+        if geom_params["chord"] == FAILING_CHORD:
+            raise RuntimeError("section build failed")
+
+        self.model_hash = sweep.get_model_hash(geom_params)
+        self.props_hash = get_design_hash(geom_params, phys_params, dyn_params)
+        self.fast = fast
+        self.model_props = {**geom_params, **phys_params, **dyn_params, "total_mass": 1.0}
+        self.geom_record = {"lift_force_arm": 0.3}
+
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    monkeypatch.setattr(sweep, "WingModelManager", FakeWingModel)
+    monkeypatch.setattr(sweep, "get_sweep_executor", lambda workers: InProcessExecutor())
+
+
+def _design_hash(design):
+    return get_design_hash(*split_design(design, sweep.get_default_geom_params(CATALOG)))
+
+
+def test_failed_designs_are_reported_and_not_written(tmp_path):
+    out_dir = str(tmp_path / "sweep")
+    designs = [{"chord": FAILING_CHORD}, {"chord": FAILING_CHORD, "velocity": 30.0}, {"chord": 260}]
+
+    evaluated, failed = run_sweep(CATALOG, designs, out_dir=out_dir, fast=True)
+
+    assert evaluated == 1
+    assert set(failed) == {_design_hash(design) for design in designs[:2]}
+    assert all("section build failed" in error for error in failed.values())
+    assert completed_designs(out_dir, fast=True) == {_design_hash(designs[2])}
+
+
+def test_cli_lists_failed_designs_and_exits_non_zero(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sweep_cli, "get_airfoil_catalog", lambda: CATALOG)
+    designs_path = tmp_path / "designs.json"
+    designs_path.write_text('{"chord": [200, 260]}')
+
+    assert sweep_cli.main([str(designs_path), "--out", str(tmp_path / "failing")]) == 1
+    output = capsys.readouterr().out
+    assert "1 new designs evaluated, 1 failed" in output
+    assert _design_hash({"chord": FAILING_CHORD}) in output
+
+    designs_path.write_text('{"chord": [260, 300]}')
+    assert sweep_cli.main([str(designs_path), "--out", str(tmp_path / "passing")]) == 0
+
+
+def test_integer_valued_geometry_is_converted():
+    geom_params, _, _ = split_design({"chord": 260.0, "span": 900.0}, sweep.get_default_geom_params(CATALOG))
+
+    assert (geom_params["chord"], geom_params["span"]) == (260, 900)
+    assert type(geom_params["chord"]) is int
+    assert sweep.get_model_hash(geom_params) == sweep.get_model_hash({**geom_params, "chord": 260, "span": 900})
+
+    with pytest.raises(ValueError):
+        split_design({"chord": 260.5}, sweep.get_default_geom_params(CATALOG))
@@ -0,0 +1,44 @@
+import json
+
+from wingmodel import telemetry
+from wingmodel.constants import *
+from wingmodel.telemetry import MetricsAggregator
+
+
+def test_cache_counters_are_exported_as_totals():
+    metrics = MetricsAggregator().render({"hits": 3, "evictions": 1, "memory_misses": 2, "total_bytes": 100})
+
+    assert "# TYPE wingmodel_cache_hits_total counter\nwingmodel_cache_hits_total 3" in metrics
+    assert "# TYPE wingmodel_cache_evictions_total counter" in metrics
+    assert "# TYPE wingmodel_cache_memory_misses_total counter" in metrics
+    assert "# TYPE wingmodel_cache_total_bytes gauge\nwingmodel_cache_total_bytes 100" in metrics
+
+
+def test_spans_are_flushed_to_the_log_of_their_working_directory(work_dir, monkeypatch):
+    telemetry._buffer_span({"name": "geom", "duration": 0.1})
+    monkeypatch.chdir(work_dir / "..")
+    telemetry.flush_spans()
+
+    with open(work_dir / SPANS_LOG_PATH) as log_file:
+        assert [json.loads(line)["name"] for line in log_file] == ["geom"]
+
+
+def test_log_is_rotated_on_flush_and_read_to_the_end(work_dir, monkeypatch):
+    monkeypatch.setattr(telemetry, "SPANS_LOG_MAX_BYTES", 200)
+    aggregator = MetricsAggregator()
+
+    for i in range(3):
+        telemetry._buffer_span({"name": "geom", "duration": 0.1})
+    telemetry.flush_spans()
+    aggregator.update()
+    assert not os.path.exists(f"{SPANS_LOG_PATH}.1")
+
+    for i in range(3):
+        telemetry._buffer_span({"name": "geom", "duration": 0.1})
+    telemetry.flush_spans()
+    assert os.path.exists(f"{SPANS_LOG_PATH}.1") and not os.path.exists(SPANS_LOG_PATH)
+
+    telemetry._buffer_span({"name": "geom", "duration": 0.1})
+    telemetry.flush_spans()
+    aggregator.update()
+    assert aggregator._histograms[("geom", "")]["count"] == 7
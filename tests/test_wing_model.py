@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from wingmodel.constants import *
+
+
+## designs covering the section dimensions, lattice and angle of attack choices
+DESIGNS = [
+    {},
+    {"chord": 150, "span": 600, "shell_thickness": 2, "aoa_type": "Max Lift"},
+    {"chord": 400, "span": 2000, "lattice": True, "velocity": 20.0, "aoa_type": "Min Drag"},
+]
+
+
+@pytest.mark.parametrize("overrides", DESIGNS)
+def test_geom_record_matches_cad_model(airfoil_catalog, design_params, overrides):
+    from wingmodel.wing_model import validate_geom_record
+
+    errors = validate_geom_record(airfoil_catalog, *design_params(**overrides))
+
+    assert errors == {}
+
+
+## fast mode designs, spans away from the reference spans the cross-section is fitted to
+FAST_MODE_DESIGNS = [
+    {"chord": chord, "span": span, "shell_thickness": shell_thickness, "lattice": lattice}
+    for chord, span in [(CHORD_DEFAULT, SPAN_DEFAULT), (150, 2500)]
+    for shell_thickness in [1, 3]
+    for lattice in [False, True]
+]
+
+
+@pytest.mark.parametrize("overrides", FAST_MODE_DESIGNS)
+def test_fast_mode_matches_cad_model(airfoil_catalog, design_params, overrides):
+    from wingmodel.wing_model import validate_fast_mode
+
+    errors = validate_fast_mode(airfoil_catalog, *design_params(**overrides))
+
+    assert errors == {}
+
+
+BEAM_PROPS = {"box_Ixx": 2.0e4, "span": 900, "specific_load": 50.0, "box_tensile_modulus": 70.0}
+
+
+def test_bend_distribution_matches_cantilever_beam():
+    from wingmodel.wing_model import eval_bend_distribution, get_tip_deflection
+
+    span, load = BEAM_PROPS["span"] * 1e-3, BEAM_PROPS["specific_load"]
+    EI = BEAM_PROPS["box_tensile_modulus"] * 1e9 * BEAM_PROPS["box_Ixx"] * 1e-12
+    distribution = eval_bend_distribution(BEAM_PROPS, [0, BEAM_PROPS["span"]])
+
+    root, tip = ({name: values[i] for name, values in distribution.items()} for i in range(2))
+    assert root["displacement"] == pytest.approx(0) and root["slope"] == pytest.approx(0)
+    assert root["moment"] == pytest.approx(load * span**2 / 2)
+    assert root["shear"] == pytest.approx(load * span)
+    assert tip["displacement"] == pytest.approx(load * span**4 / (8 * EI) * 1e3)
+    assert tip["slope"] == pytest.approx(load * span**3 / (6 * EI))
+    assert tip["moment"] == pytest.approx(0) and tip["shear"] == pytest.approx(0)
+    assert get_tip_deflection(BEAM_PROPS) == pytest.approx(tip["displacement"] / BEAM_PROPS["span"])
+
+
+def test_bend_distribution_is_monotonic_along_span():
+    from wingmodel.wing_model import eval_bend_distribution
+
+    distribution = eval_bend_distribution(BEAM_PROPS, np.linspace(0, BEAM_PROPS["span"], 50))
+
+    assert np.all(np.diff(distribution["displacement"]) > 0)
+    assert np.all(np.diff(distribution["moment"]) < 0)